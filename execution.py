@@ -0,0 +1,135 @@
+"""Shared command execution for the PowerWSL scripts
+
+Commands are built as argv lists with the quoting each layer needs, run
+without shell=True, and their output is streamed line by line with only a
+bounded tail kept in memory.
+"""
+import os
+import time
+import base64
+import shlex
+import threading
+import subprocess
+from collections import deque
+
+POWERSHELL = "/mnt/c/Windows/System32/WindowsPowerShell/v1.0/powershell.exe"
+WSL_DISTRO = "Ubuntu"
+TAIL_LINES = 1000
+# How long to wait for output after a timeout kill; a grandchild outside the group can hold the pipes open
+DRAIN_SECONDS = 2.0
+
+def bash_quote(value):
+    return shlex.quote(str(value))
+
+def powershell_quote(value):
+    """PowerShell single-quoted literal: nothing inside is expanded, ' is doubled"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+def format_argv(argv):
+    """Readable, copy-pasteable form of an argv list for logs"""
+    return " ".join(bash_quote(arg) for arg in argv)
+
+def bash_script(cmd, cwd=None):
+    """cmd prefixed with a cd into cwd, for running under a single bash -c"""
+    return f"cd -- {bash_quote(cwd)} && {cmd}" if cwd else cmd
+
+def bash_argv(cmd, cwd=None):
+    return ["bash", "-c", bash_script(cmd, cwd)]
+
+def powershell_argv(script, powershell=POWERSHELL):
+    """Run a PowerShell script; -EncodedCommand keeps it away from command-line quoting entirely"""
+    encoded = base64.b64encode(script.encode("utf-16-le")).decode()
+    return [powershell, "-NoProfile", "-NonInteractive", "-EncodedCommand", encoded]
+
+def wsl_via_powershell_argv(cmd, cwd=None, distro=WSL_DISTRO, powershell=POWERSHELL):
+    """powershell.exe -> wsl.exe -> bash argv for cmd, with no quoting hazards in any layer
+
+    Windows PowerShell mangles embedded double quotes when it passes
+    arguments to native programs, so the bash script travels base64-encoded
+    and only [A-Za-z0-9+/=] crosses that boundary. wsl.exe -e runs bash
+    directly instead of through another login shell.
+    """
+    payload = base64.b64encode(bash_script(cmd, cwd).encode()).decode()
+    inner = f"source <(printf %s {payload} | base64 -d)"
+    script = f"& wsl.exe -d {powershell_quote(distro)} -e bash -c {powershell_quote(inner)}"
+    return powershell_argv(script, powershell)
+
+def gui_env(display=":0"):
+    """Environment for GUI programs: DISPLAY set and Python output unbuffered"""
+    return {**os.environ, "DISPLAY": display, "PYTHONUNBUFFERED": "1"}
+
+class CommandResult:
+    """Exit code plus the last TAIL_LINES lines of each stream"""
+
+    def __init__(self, argv, returncode, stdout, stderr, dropped_lines):
+        self.argv = argv
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.dropped_lines = dropped_lines
+
+    @property
+    def ok(self):
+        return self.returncode == 0
+
+def run(argv, cwd=None, env=None, input=None, on_stdout=None, on_stderr=None, tail_lines=TAIL_LINES, timeout=None):
+    """Run argv without a shell, streaming output line by line
+
+    on_stdout/on_stderr are called with each line as it arrives; only the
+    last tail_lines of each stream are kept for the result, so a command
+    printing gigabytes costs a fixed amount of memory. A timeout kills the
+    command and raises subprocess.TimeoutExpired.
+    """
+    process = subprocess.Popen(
+        argv, cwd=cwd, env=env,
+        stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True, encoding="utf-8", errors="replace", bufsize=1
+    )
+
+    tails = {"stdout": deque(maxlen=tail_lines), "stderr": deque(maxlen=tail_lines)}
+    counts = {"stdout": 0, "stderr": 0}
+
+    def pump(stream, name, callback):
+        for line in stream:
+            counts[name] += 1
+            tails[name].append(line)
+            if callback:
+                callback(line)
+        stream.close()
+
+    pumps = [
+        threading.Thread(target=pump, args=(process.stdout, "stdout", on_stdout), daemon=True),
+        threading.Thread(target=pump, args=(process.stderr, "stderr", on_stderr), daemon=True)
+    ]
+    for thread in pumps:
+        thread.start()
+
+    if input is not None:
+        try:
+            process.stdin.write(input)
+            process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+    try:
+        returncode = process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        # A pump still blocked after this is left behind as a daemon thread and closes its
+        # pipe when the grandchild does; closing it from here would block on the reader's lock
+        deadline = time.monotonic() + DRAIN_SECONDS
+        for thread in pumps:
+            thread.join(max(deadline - time.monotonic(), 0))
+        raise
+    for thread in pumps:
+        thread.join()
+
+    dropped = sum(counts[name] - len(tails[name]) for name in tails)
+    return CommandResult(argv, returncode, "".join(tails["stdout"]), "".join(tails["stderr"]), dropped)
+
+def run_attached(argv, cwd=None, env=None):
+    """Run argv with the terminal's stdin/stdout/stderr; nothing is buffered here"""
+    return subprocess.run(argv, cwd=cwd, env=env).returncode
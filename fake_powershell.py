@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""Stand-in for powershell.exe running window_manager.ps1, for Linux hosts
+
+Point WindowController(powershell_path=...) at this file to exercise the
+spawn, persistent-host and batch paths without Windows. It accepts the same
+arguments and speaks the same output formats and serve protocol as
+window_manager.ps1, and sleeps to simulate the costs of the real thing:
+
+    FAKE_PS_STARTUP_MS     process startup before the script runs (200)
+    FAKE_PS_INTEROP_MS     Win32 Add-Type load, once per process (100)
+    FAKE_PS_ENUM_MS        one window enumeration (5)
+    FAKE_PS_ACTION_MS      one Win32 window call (1)
+    FAKE_PS_WINDOWS        number of simulated windows (30)
+"""
+import sys
+import os
+import json
+import time
+
+def env_ms(name, default):
+    return float(os.environ.get(name, default)) / 1000.0
+
+STARTUP = env_ms("FAKE_PS_STARTUP_MS", 200)
+INTEROP = env_ms("FAKE_PS_INTEROP_MS", 100)
+ENUMERATE = env_ms("FAKE_PS_ENUM_MS", 5)
+ACTION = env_ms("FAKE_PS_ACTION_MS", 1)
+WINDOW_COUNT = int(os.environ.get("FAKE_PS_WINDOWS", 30))
+
+ACTION_VERBS = {
+    "minimize": "Minimized",
+    "maximize": "Maximized",
+    "restore": "Restored",
+    "show": "Showed",
+    "close": "Sent close message to",
+    "focus": "Focused",
+    "toggle": "Maximized"
+}
+
+class FakeWindowManager:
+    def __init__(self):
+        self.phases = {}
+        self.windows = [
+            {
+                "Index": i + 1,
+                "Title": f"Simulated window {i + 1}",
+                "ProcessName": f"app{i % 7}",
+                "ProcessId": 4000 + i,
+                "Handle": 65536 + i * 16,
+                "State": "Normal"
+            }
+            for i in range(WINDOW_COUNT)
+        ]
+        self.by_handle = {window["Handle"]: window for window in self.windows}
+        self.timed("interop", INTEROP)
+
+    def timed(self, phase, seconds):
+        time.sleep(seconds)
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds * 1000
+
+    def take_timings(self, started):
+        timings = {phase: round(ms, 3) for phase, ms in self.phases.items()}
+        timings["total"] = round((time.perf_counter() - started) * 1000, 3)
+        self.phases = {}
+        return timings
+
+    def enumerate(self):
+        self.timed("enumerate", ENUMERATE)
+        return self.windows
+
+    def act(self, action, window):
+        if action not in ACTION_VERBS:
+            message = f"ERROR: Unknown action '{action}'. Supported actions: list, {', '.join(ACTION_VERBS)}"
+            return {"Action": action, "Index": window["Index"], "Handle": window["Handle"], "Success": False, "Message": message}
+
+        self.timed("action", ACTION)
+        state = {"minimize": "Minimized", "maximize": "Maximized", "restore": "Normal"}.get(action)
+        if state:
+            window["State"] = state
+        return {
+            "Action": action,
+            "Index": window["Index"],
+            "Handle": window["Handle"],
+            "Success": True,
+            "Message": f"SUCCESS: {ACTION_VERBS[action]} '{window['Title']}'"
+        }
+
+    def resolve(self, target, windows):
+        if target.startswith(("h", "H")):
+            window = self.by_handle.get(int(target[1:]))
+            return window or f"ERROR: Window gone (handle {target[1:]} no longer exists)."
+        if target.startswith(("p", "P")):
+            pid = int(target[1:])
+            window = next((w for w in self.windows if w["ProcessId"] == pid), None)
+            return window or f"ERROR: Window gone (process {pid} has no main window)."
+
+        index = int(target)
+        if windows is None:
+            windows = self.enumerate()
+        if 0 < index <= len(windows):
+            return windows[index - 1]
+        return f"ERROR: Window index {index} is out of range (1-{len(windows)})."
+
+    def run(self, action, window_index=0, output_format="text", actions=None, handle=0, pid=0, iterations=10):
+        action = (action or "").lower()
+
+        if action == "list":
+            windows = self.enumerate()
+            if output_format == "json":
+                return json.dumps(windows)
+            return "\n".join(f"{w['Index']:<3} {w['Title']:<50} {w['ProcessName']:<20} {w['State']:<12}" for w in windows)
+
+        if action == "batch":
+            windows = None
+            results = []
+            for spec in ",".join(actions or []).split(","):
+                spec = spec.strip()
+                if not spec:
+                    continue
+                name, _, target = spec.partition(":")
+                if windows is None and target.isdigit():
+                    windows = self.enumerate()
+                try:
+                    window = self.resolve(target, windows)
+                except ValueError:
+                    window = f"ERROR: Invalid batch entry '{spec}'. Use <action>:<index>, <action>:h<handle> or <action>:p<pid>"
+                if isinstance(window, str):
+                    results.append({"Action": name, "Index": 0, "Handle": 0, "Success": False, "Message": window})
+                else:
+                    results.append(self.act(name, window))
+            if output_format == "json":
+                return json.dumps(results)
+            return "\n".join(result["Message"] for result in results)
+
+        if action == "diag":
+            return json.dumps({
+                "InteropSource": "cache",
+                "InteropMs": INTEROP * 1000,
+                "AssemblyPath": None,
+                "PSVersion": "fake",
+                "ProcessId": os.getpid()
+            })
+
+        if action == "bench-enum":
+            for _ in range(iterations):
+                self.enumerate()
+            results = [
+                {"Enumerator": "Get-ActiveWindows", "Windows": WINDOW_COUNT, "Iterations": iterations, "MeanMs": ENUMERATE * 1000},
+                {"Enumerator": "Get-ActiveWindowsLegacy", "Windows": WINDOW_COUNT, "Iterations": iterations, "MeanMs": ENUMERATE * 1000}
+            ]
+            return json.dumps(results)
+
+        if action in ACTION_VERBS:
+            if handle:
+                window = self.resolve(f"h{handle}", None)
+            elif pid:
+                window = self.resolve(f"p{pid}", None)
+            else:
+                window = self.resolve(str(window_index or 0), None)
+            return window if isinstance(window, str) else self.act(action, window)["Message"]
+
+        return f"ERROR: Unknown action '{action}'"
+
+    def watch(self, interval_ms):
+        for window in self.enumerate():
+            print(json.dumps(dict(window, Event="created")), flush=True)
+        print('{"Event":"ready"}', flush=True)
+        while True:
+            time.sleep(interval_ms / 1000.0)
+
+    def serve(self):
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            started = time.perf_counter()
+            response = {"id": None, "stdout": "", "stderr": "", "returncode": 0}
+            try:
+                request = json.loads(line)
+                response["id"] = request.get("id")
+                response["stdout"] = self.run(
+                    request.get("action"),
+                    request.get("window_index") or 0,
+                    request.get("format") or "text",
+                    request.get("actions"),
+                    request.get("handle") or 0,
+                    request.get("pid") or 0,
+                    request.get("iterations") or 10
+                ) + "\n"
+            except Exception as e:
+                response["stderr"] = str(e)
+                response["returncode"] = 1
+            response["timings"] = self.take_timings(started)
+            sys.stdout.write(json.dumps(response) + "\n")
+            sys.stdout.flush()
+
+def parse_args(argv):
+    """Pick window_manager.ps1 parameters out of a powershell.exe command line"""
+    params = {}
+    switches = {"-timings", "-noprofile"}
+    i = 0
+    while i < len(argv):
+        name = argv[i].lower()
+        if name in switches:
+            params[name] = True
+            i += 1
+        elif name.startswith("-") and i + 1 < len(argv):
+            params[name] = argv[i + 1]
+            i += 2
+        else:
+            i += 1
+    return params
+
+def main():
+    time.sleep(STARTUP)
+    started = time.perf_counter()
+    params = parse_args(sys.argv[1:])
+    manager = FakeWindowManager()
+    action = params.get("-action", "")
+
+    if action.lower() == "serve":
+        manager.serve()
+        return
+    if action.lower() == "watch":
+        manager.watch(int(params.get("-intervalms", 250)))
+        return
+
+    output = manager.run(
+        action,
+        int(params.get("-windowindex", 0)),
+        params.get("-format", "text"),
+        [params["-actions"]] if "-actions" in params else None,
+        int(params.get("-handle", 0)),
+        int(params.get("-processid", 0)),
+        int(params.get("-iterations", 10))
+    )
+    print(output)
+    if params.get("-timings"):
+        print("__TIMINGS__ " + json.dumps(manager.take_timings(started)))
+
+if __name__ == "__main__":
+    main()
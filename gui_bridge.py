@@ -0,0 +1,290 @@
+"""Resident command bridge into the interactive desktop session
+
+Start `python3 gui_bridge.py serve` once from the desktop (for example a
+Windows logon task running `wsl.exe -d Ubuntu -- python3 gui_bridge.py
+serve`). Commands sent from SSH sessions then run as children of that
+agent, so they inherit its GUI context instead of paying for a fresh
+powershell.exe -> wsl.exe launch each time.
+
+Protocol: one JSON request line per connection ({"cmd", "cwd", "env"}),
+answered with JSON lines {"pid"}, {"stream": "stdout"|"stderr", "data"}
+and finally {"exit": code}. While the command runs the client may send
+{"signal": "INT"|"TERM"|...}; closing the connection kills it.
+"""
+import os
+import sys
+import json
+import stat
+import signal
+import socket
+import argparse
+import threading
+import subprocess
+import socketserver
+
+CONNECT_TIMEOUT = 2.0
+
+class BridgeUnavailable(Exception):
+    """No agent is listening on the bridge socket"""
+
+class UnsafeSocketDirectory(BridgeUnavailable):
+    """The socket's directory is not private to this user"""
+
+def socket_dir():
+    """Private directory for the PowerWSL sockets: $XDG_RUNTIME_DIR/powerwsl, else /tmp/powerwsl-<uid>"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "powerwsl")
+    return f"/tmp/powerwsl-{os.getuid()}"
+
+def default_socket_path():
+    return os.environ.get("POWERWSL_GUI_SOCKET") or os.path.join(socket_dir(), "gui.sock")
+
+def check_socket_dir(directory):
+    """Refuse a socket directory another user could have created or can write into
+
+    These sockets run arbitrary commands, and /tmp/powerwsl-<uid> is a
+    predictable name anyone can create first.
+    """
+    try:
+        info = os.lstat(directory)
+    except FileNotFoundError:
+        raise BridgeUnavailable(f"{directory} does not exist")
+    if (stat.S_ISLNK(info.st_mode) or not stat.S_ISDIR(info.st_mode)
+            or info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) & 0o077):
+        raise UnsafeSocketDirectory(
+            f"refusing {directory}: it must be a real directory owned by uid {os.getuid()} with mode 0700")
+
+def prepare_socket(socket_path):
+    """Create and verify the socket's private directory and clear a stale socket file"""
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    check_socket_dir(directory)
+    if os.path.lexists(socket_path):
+        os.unlink(socket_path)
+
+def encode_data(data):
+    # surrogateescape keeps arbitrary bytes intact through JSON
+    return data.decode("utf-8", "surrogateescape")
+
+def decode_data(text):
+    return text.encode("utf-8", "surrogateescape")
+
+class BridgeHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.send_lock = threading.Lock()
+
+    def send(self, message):
+        with self.send_lock:
+            self.wfile.write((json.dumps(message) + "\n").encode())
+            self.wfile.flush()
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline() or b"{}")
+        except ValueError as e:
+            self.send({"error": f"bad request: {e}"})
+            return
+
+        if request.get("ping"):
+            self.send({"pong": True, "pid": os.getpid()})
+            return
+        if not request.get("cmd"):
+            self.send({"error": "request has no cmd"})
+            return
+
+        env = dict(os.environ)
+        env.update(request.get("env") or {})
+        try:
+            process = subprocess.Popen(
+                ["bash", "-c", request["cmd"]],
+                cwd=request.get("cwd") or None,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                start_new_session=True
+            )
+        except OSError as e:
+            self.send({"stream": "stderr", "data": f"{e}\n"})
+            self.send({"exit": 127})
+            return
+
+        self.send({"pid": process.pid})
+        pumps = [
+            threading.Thread(target=self.pump, args=(process.stdout, "stdout"), daemon=True),
+            threading.Thread(target=self.pump, args=(process.stderr, "stderr"), daemon=True)
+        ]
+        for pump in pumps:
+            pump.start()
+        threading.Thread(target=self.follow_client, args=(process,), daemon=True).start()
+
+        for pump in pumps:
+            pump.join()
+        returncode = process.wait()
+        try:
+            self.send({"exit": returncode})
+            # Wake follow_client out of its blocking read so the connection can close
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def pump(self, stream, name):
+        for chunk in iter(lambda: stream.read1(65536), b""):
+            try:
+                self.send({"stream": name, "data": encode_data(chunk)})
+            except OSError:
+                # Client is gone; keep draining so the child never blocks on a full pipe
+                continue
+
+    def follow_client(self, process):
+        """Forward signal requests to the command's process group; EOF from the client kills it"""
+        for line in self.rfile:
+            try:
+                name = json.loads(line).get("signal", "")
+                signum = getattr(signal, f"SIG{name.upper()}")
+            except (ValueError, AttributeError):
+                continue
+            self.signal_group(process, signum)
+        self.signal_group(process, signal.SIGKILL)
+
+    def signal_group(self, process, signum):
+        if process.poll() is None:
+            try:
+                os.killpg(process.pid, signum)
+            except ProcessLookupError:
+                pass
+
+class BridgeServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # Bursts of clients (a job runner, several SSH sessions) must queue, not get EAGAIN
+    request_queue_size = 128
+
+def serve(socket_path=None):
+    """Run the agent in the foreground until interrupted"""
+    socket_path = socket_path or default_socket_path()
+    if ping(socket_path):
+        print(f"Error: an agent is already listening on {socket_path}")
+        return 1
+    try:
+        prepare_socket(socket_path)
+    except (BridgeUnavailable, OSError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    server = BridgeServer(socket_path, BridgeHandler)
+    os.chmod(socket_path, 0o600)
+    # Logoff/stop sends SIGTERM; unwind through the cleanup below like Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"GUI bridge listening on {socket_path} (pid {os.getpid()}, DISPLAY={os.environ.get('DISPLAY', '')})")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+    return 0
+
+def connect(socket_path=None, timeout=CONNECT_TIMEOUT):
+    socket_path = socket_path or default_socket_path()
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    if not os.path.lexists(directory):
+        raise BridgeUnavailable(f"no GUI bridge at {socket_path}: {directory} does not exist")
+    # Never talk to a socket someone else could have planted
+    check_socket_dir(directory)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError as e:
+        sock.close()
+        raise BridgeUnavailable(f"no GUI bridge at {socket_path}: {e}")
+    sock.settimeout(None)
+    return sock
+
+def ping(socket_path=None):
+    """True if an agent answers on the socket"""
+    try:
+        sock = connect(socket_path)
+    except BridgeUnavailable:
+        return False
+    with sock, sock.makefile("rb") as reader:
+        sock.sendall(b'{"ping": true}\n')
+        try:
+            return bool(json.loads(reader.readline() or b"{}").get("pong"))
+        except ValueError:
+            return False
+
+def run_command(cmd, cwd=None, env=None, socket_path=None, stdout=None, stderr=None):
+    """Run cmd through the agent, streaming its output; returns its exit code
+
+    Raises BridgeUnavailable if no agent is listening. The first Ctrl+C is
+    forwarded to the command as SIGINT, a second one abandons it. A relative
+    cwd is resolved here, against the caller's directory, not the agent's.
+    """
+    if cwd:
+        cwd = os.path.abspath(os.path.expanduser(cwd))
+    stdout = stdout or sys.stdout.buffer
+    stderr = stderr or sys.stderr.buffer
+    sock = connect(socket_path)
+
+    with sock, sock.makefile("rb") as reader:
+        sock.sendall((json.dumps({"cmd": cmd, "cwd": cwd, "env": env or {}}) + "\n").encode())
+        interrupted = False
+        while True:
+            try:
+                line = reader.readline()
+                if not line:
+                    stderr.write(b"GUI bridge closed the connection\n")
+                    return 255
+                message = json.loads(line)
+                if "stream" in message:
+                    target = stdout if message["stream"] == "stdout" else stderr
+                    target.write(decode_data(message["data"]))
+                    target.flush()
+                elif "exit" in message:
+                    return message["exit"]
+                elif "error" in message:
+                    stderr.write(f"GUI bridge: {message['error']}\n".encode())
+                    return 255
+            except KeyboardInterrupt:
+                if interrupted:
+                    return 130
+                interrupted = True
+                sock.sendall(b'{"signal": "INT"}\n')
+
+def main():
+    parser = argparse.ArgumentParser(description="Run commands inside the desktop session through a resident agent")
+    parser.add_argument("--socket", default=None, help="Bridge socket path (default: $POWERWSL_GUI_SOCKET or gui.sock in $XDG_RUNTIME_DIR/powerwsl or /tmp/powerwsl-<uid>)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("serve", help="Start the agent (run this from the desktop session)")
+    subparsers.add_parser("ping", help="Check whether an agent is running")
+    run_parser = subparsers.add_parser("run", help="Run a command through the agent")
+    run_parser.add_argument("--cwd", default=None, help="Working directory for the command")
+    run_parser.add_argument("cmd", nargs=argparse.REMAINDER, help="Command line, passed to bash -c")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        sys.exit(serve(args.socket))
+    if args.command == "ping":
+        alive = ping(args.socket)
+        print("GUI bridge is running." if alive else "GUI bridge is not running.")
+        sys.exit(0 if alive else 1)
+
+    cmd = " ".join(args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd)
+    if not cmd:
+        parser.error("run needs a command")
+    try:
+        sys.exit(run_command(cmd, cwd=args.cwd, socket_path=args.socket))
+    except BridgeUnavailable as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import sys
+import os
+import json
+import time
+import signal
+import asyncio
+import argparse
+from datetime import datetime
+
+from execution import bash_argv, wsl_via_powershell_argv, gui_env
+
+GUI_BRIDGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gui_bridge.py")
+SHELL_POOL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shell_pool.py")
+VIA = ("subprocess", "powershell", "bridge", "pool")
+DEFAULT_CONCURRENCY = 4
+
+class Job:
+    """One working directory + command, and what happened when it ran"""
+
+    def __init__(self, index, cwd, cmd, name=None, timeout=None):
+        self.index = index
+        # Absolute here: the bridge and the pool would resolve a relative cwd against their own directory
+        self.cwd = os.path.abspath(os.path.expanduser(cwd or "."))
+        self.cmd = cmd
+        self.name = name or f"{index:02d}-{os.path.basename(cmd.split()[0]) if cmd.strip() else 'job'}"
+        self.timeout = timeout
+        self.status = "pending"
+        self.returncode = None
+        self.seconds = 0.0
+        self.log_path = None
+
+def parse_jobs(lines):
+    """Jobs from lines of JSON ({"cwd", "cmd", "name", "timeout"}) or "<cwd><TAB><cmd>"
+
+    Blank lines and lines starting with # are skipped. Names become log file
+    names, so path separators are replaced and a repeated name gets the job's
+    index in front.
+    """
+    jobs = []
+    names = set()
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            try:
+                spec = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"line {number}: invalid JSON: {e}")
+            cwd, cmd = spec.get("cwd"), spec.get("cmd")
+            name, timeout = spec.get("name"), spec.get("timeout")
+        else:
+            cwd, separator, cmd = line.partition("\t")
+            if not separator:
+                raise ValueError(f"line {number}: expected '<directory><TAB><command>' or a JSON object")
+            name = timeout = None
+        if not cmd:
+            raise ValueError(f"line {number}: missing command")
+        if name is not None:
+            name = str(name)
+            for separator in filter(None, (os.sep, os.altsep)):
+                name = name.replace(separator, "_")
+            if name in ("", ".", "..") or "\0" in name:
+                raise ValueError(f"line {number}: invalid job name {name!r}")
+        job = Job(len(jobs) + 1, cwd, cmd, name, timeout)
+        while job.name in names:
+            job.name = f"{job.index:02d}-{job.name}"
+        names.add(job.name)
+        jobs.append(job)
+    return jobs
+
+def build_argv(job, via):
+    """argv, cwd and env that run a job the way the matching run_via_* script does"""
+    env = gui_env()
+    if via == "subprocess":
+        return bash_argv(job.cmd), job.cwd, env
+    if via == "bridge":
+        return [sys.executable, GUI_BRIDGE, "run", "--cwd", job.cwd, "--", job.cmd], None, env
+    if via == "pool":
+        return [sys.executable, SHELL_POOL, "run", "--cwd", job.cwd, "--", job.cmd], None, env
+    return wsl_via_powershell_argv(job.cmd, cwd=job.cwd), None, env
+
+class JobRunner:
+    """Run jobs concurrently with a limit, per-job timeouts and cancellation
+
+    Every job runs in its own session so a timeout or cancel kills the whole
+    process tree. Output lines go to the job's log file as they arrive and,
+    unless quiet, to the console prefixed with the job name.
+    """
+
+    def __init__(self, via="subprocess", concurrency=DEFAULT_CONCURRENCY, timeout=None, log_dir=None, quiet=False):
+        self.via = via
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.log_dir = log_dir or os.path.join("job-logs", datetime.now().strftime("%Y%m%d-%H%M%S"))
+        self.quiet = quiet
+        self.width = 0
+
+    def _kill(self, process):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def emit(self, job, label, log, line):
+        text = line.decode(errors="replace").rstrip("\n")
+        log.write(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} {label}| {text}\n")
+        if not self.quiet:
+            marker = "!" if label == "err" else " "
+            print(f"[{job.name:<{self.width}}]{marker} {text}", flush=True)
+
+    async def pump(self, job, stream, label, log):
+        # Chunked reads split into lines here: StreamReader.readline() fails on lines over 64 KiB
+        pending = b""
+        while True:
+            chunk = await stream.read(65536)
+            if not chunk:
+                if pending:
+                    self.emit(job, label, log, pending)
+                return
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                self.emit(job, label, log, line)
+
+    async def run_job(self, job, semaphore):
+        async with semaphore:
+            job.log_path = os.path.join(self.log_dir, f"{job.name}.log")
+            argv, cwd, env = build_argv(job, self.via)
+            started = time.monotonic()
+            try:
+                # Line buffered: every line is on disk as soon as it is read
+                log = open(job.log_path, "w", buffering=1)
+            except OSError as e:
+                print(f"[{job.name:<{self.width}}]! cannot open log: {e}", flush=True)
+                job.log_path = None
+                job.status = "error"
+                return job
+            job.status = "running"
+
+            with log:
+                log.write(f"# cwd: {job.cwd}\n# cmd: {job.cmd}\n# via: {self.via}\n")
+                try:
+                    process = await asyncio.create_subprocess_exec(
+                        *argv, cwd=cwd, env=env,
+                        stdin=asyncio.subprocess.DEVNULL,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE,
+                        start_new_session=True
+                    )
+                except OSError as e:
+                    log.write(f"# failed to start: {e}\n")
+                    job.status = "error"
+                    job.seconds = time.monotonic() - started
+                    return job
+
+                timeout = job.timeout if job.timeout is not None else self.timeout
+                try:
+                    await asyncio.wait_for(asyncio.gather(
+                        self.pump(job, process.stdout, "out", log),
+                        self.pump(job, process.stderr, "err", log),
+                        process.wait()
+                    ), timeout)
+                    job.status = "ok" if process.returncode == 0 else "failed"
+                except asyncio.TimeoutError:
+                    self._kill(process)
+                    job.status = "timeout"
+                except asyncio.CancelledError:
+                    self._kill(process)
+                    job.status = "cancelled"
+                except Exception as e:
+                    self._kill(process)
+                    log.write(f"# runner error: {type(e).__name__}: {e}\n")
+                    job.status = "error"
+                await process.wait()
+
+                job.returncode = process.returncode
+                job.seconds = time.monotonic() - started
+                log.write(f"# {job.status}, exit {job.returncode}, {job.seconds:.2f}s\n")
+            return job
+
+    async def run(self, jobs):
+        """Run every job; Ctrl+C or SIGTERM cancels whatever is still queued or running"""
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.width = max((len(job.name) for job in jobs), default=0)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [asyncio.ensure_future(self.run_job(job, semaphore)) for job in jobs]
+
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, lambda: [task.cancel() for task in tasks])
+        try:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(signum)
+
+        for job in jobs:
+            if job.status == "pending":
+                job.status = "cancelled"
+        return jobs
+
+def print_summary(jobs):
+    print("\n{0:<4} {1:<24} {2:<10} {3:>5} {4:>9}  {5}".format("#", "Job", "Status", "Exit", "Wall s", "Log"))
+    print("-" * 80)
+    for job in jobs:
+        returncode = "" if job.returncode is None else job.returncode
+        print("{0:<4} {1:<24} {2:<10} {3:>5} {4:>9.2f}  {5}".format(
+            job.index, job.name[:24], job.status, returncode, job.seconds, job.log_path or ""))
+    counts = {}
+    for job in jobs:
+        counts[job.status] = counts.get(job.status, 0) + 1
+    print("-" * 80)
+    print(", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+
+def main(argv=None, via="subprocess"):
+    parser = argparse.ArgumentParser(description="Run many directory + command jobs concurrently")
+    parser.add_argument("jobs", help="Job file ('-' for stdin): JSON lines or '<directory><TAB><command>' lines")
+    parser.add_argument("--via", choices=VIA, default=via, help=f"How to launch each job (default {via})")
+    parser.add_argument("-j", "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Jobs running at once")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds before a job is killed (per job override: \"timeout\")")
+    parser.add_argument("--log-dir", default=None, help="Directory for per-job logs (default job-logs/<timestamp>)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only write logs and the summary, not live output")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.jobs == "-":
+            jobs = parse_jobs(sys.stdin)
+        else:
+            with open(args.jobs, "r") as f:
+                jobs = parse_jobs(f)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 2
+
+    if not jobs:
+        print("No jobs to run.")
+        return 0
+
+    runner = JobRunner(args.via, max(args.concurrency, 1), args.timeout, args.log_dir, args.quiet)
+    asyncio.run(runner.run(jobs))
+    print_summary(jobs)
+    return 0 if all(job.status == "ok" for job in jobs) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+"""Resident powerwsl daemon: windows, commands, transfers and portproxy behind one socket
+
+`python3 powerwsl.py serve` keeps a persistent PowerShell window host, a
+shell pool and the transfer engine warm in one process, so SSH sessions
+ask it over a Unix socket (powerwsl.sock in gui_bridge.socket_dir(), or
+POWERWSL_SOCKET) instead of cold-starting Python and PowerShell per action.
+
+Protocol: one JSON request line per connection, {"op": ..., params}, and
+one JSON reply line, {"ok": true, ...} or {"ok": false, "error": ...}.
+
+    windows.list      {"refresh": true}
+    windows.act       {"action", "index" | "handle" | "pid"} or {"operations": [[action, target], ...]}
+    run               {"cmd", "cwd", "env"}; streamed like gui_bridge.py
+    transfer.start    {"args": scp_file_transfer.py CLI arguments, "cwd": client's directory}
+    transfer.status   {"id"}, or no id for every transfer
+    transfer.cancel   {"id"}
+    portproxy.status  {}
+
+A request with "cmd" and no "op" is a run, so gui_bridge.run_command and
+shell_pool.py work as clients unchanged.
+"""
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+import subprocess
+from collections import deque
+
+import gui_bridge
+import shell_pool
+import wsl_ssh
+from window_manager import WindowController, format_windows_table
+
+SCP_TRANSFER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scp_file_transfer.py")
+MAX_FINISHED_TRANSFERS = 50
+
+def default_socket_path():
+    return os.environ.get("POWERWSL_SOCKET") or os.path.join(gui_bridge.socket_dir(), "powerwsl.sock")
+
+class TransferJob:
+    """One scp_file_transfer.py run in its own process, with progress read from its metrics file
+
+    Transfers run out of process: the transfer engine prints progress to
+    the process-wide stdout, and a crash in one transfer must not take the
+    daemon down with it.
+    """
+
+    def __init__(self, transfer_id, args, directory, cwd=None):
+        self.id = transfer_id
+        self.args = list(args)
+        self.cwd = cwd
+        self.metrics_path = os.path.join(directory, f"{transfer_id}.jsonl")
+        self.started = time.time()
+        self.finished = None
+        self.state = "running"
+        self.returncode = None
+        self.result = None
+        self.stderr_tail = deque(maxlen=20)
+        self.cancelled = False
+        self.process = subprocess.Popen(
+            [sys.executable, SCP_TRANSFER] + self.args + ["--json", "--metrics", self.metrics_path],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            text=True, encoding="utf-8", errors="replace",
+            start_new_session=True
+        )
+        threading.Thread(target=self.wait, daemon=True).start()
+
+    def wait(self):
+        stdout, stderr = self.process.communicate()
+        self.stderr_tail.extend(stderr.splitlines())
+        lines = stdout.strip().splitlines()
+        try:
+            self.result = json.loads(lines[-1]) if lines else None
+        except ValueError:
+            self.stderr_tail.extend(lines[-5:])
+        self.returncode = self.process.returncode
+        self.finished = time.time()
+        self.state = "cancelled" if self.cancelled else ("ok" if self.returncode == 0 else "failed")
+
+    def progress(self):
+        """The last metrics record the transfer wrote, or None before its first one"""
+        try:
+            with open(self.metrics_path, "rb") as f:
+                f.seek(max(os.path.getsize(self.metrics_path) - 4096, 0))
+                lines = f.read().splitlines()
+        except OSError:
+            return None
+        for line in reversed(lines):
+            try:
+                return json.loads(line)
+            except ValueError:
+                continue
+        return None
+
+    def cancel(self):
+        if self.state == "running":
+            self.cancelled = True
+            try:
+                os.killpg(self.process.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def discard(self):
+        try:
+            os.remove(self.metrics_path)
+        except OSError:
+            pass
+
+    def status(self):
+        return {
+            "id": self.id,
+            "args": self.args,
+            "cwd": self.cwd,
+            "state": self.state,
+            "returncode": self.returncode,
+            "seconds": round((self.finished or time.time()) - self.started, 3),
+            "progress": self.progress(),
+            "result": self.result,
+            "stderr": list(self.stderr_tail)
+        }
+
+class PowerWSLDaemon:
+    """Warm state shared by every connection: window host, shell pool and transfers"""
+
+    def __init__(self, socket_path, powershell_path=None, size=shell_pool.DEFAULT_SIZE,
+                 max_uses=shell_pool.DEFAULT_MAX_USES, env_file=".env"):
+        self.windows = WindowController(persistent=True, powershell_path=powershell_path)
+        self.window_lock = threading.Lock()
+        self.pool = shell_pool.ShellPool(size, max_uses, env_file)
+        # Absolute: transfers run in their client's directory, not the daemon's
+        self.transfer_dir = os.path.join(os.path.dirname(os.path.abspath(socket_path)), "transfers")
+        os.makedirs(self.transfer_dir, mode=0o700, exist_ok=True)
+        self.transfers = {}
+        self.transfer_lock = threading.Lock()
+        self.next_transfer = 1
+
+        # Pay for the PowerShell start and interop load now rather than on the first client
+        threading.Thread(target=self.windows_list, args=({},), daemon=True).start()
+
+    def close(self):
+        with self.transfer_lock:
+            for job in self.transfers.values():
+                job.cancel()
+        self.pool.close()
+        self.windows.close()
+
+    def dispatch(self, request):
+        """Reply for one non-streaming request; errors become {"ok": false} replies"""
+        handlers = {
+            "ping": lambda request: {"pong": True, "pid": os.getpid()},
+            "windows.list": self.windows_list,
+            "windows.act": self.windows_act,
+            "transfer.start": self.transfer_start,
+            "transfer.status": self.transfer_status,
+            "transfer.cancel": self.transfer_cancel,
+            "portproxy.status": self.portproxy_status
+        }
+        handler = handlers.get(request.get("op"))
+        if handler is None:
+            return {"ok": False, "error": f"unknown op '{request.get('op')}'; expected one of {', '.join(handlers)}, run"}
+        try:
+            return dict({"ok": True}, **handler(request))
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    def windows_list(self, request):
+        with self.window_lock:
+            return {"windows": self.windows.get_windows(refresh=request.get("refresh", True))}
+
+    def windows_act(self, request):
+        operations = request.get("operations")
+        if operations is None:
+            if not request.get("action"):
+                raise ValueError("windows.act needs an action or operations")
+            if request.get("handle") or request.get("pid"):
+                target = {"handle": request.get("handle"), "pid": request.get("pid")}
+            else:
+                target = int(request["index"])
+            operations = [(request["action"], target)]
+
+        with self.window_lock:
+            results = self.windows.apply([tuple(operation) for operation in operations], show=False)
+        return {"ok": bool(results) and all(result["success"] for result in results), "results": results}
+
+    def transfer_start(self, request):
+        args = request.get("args")
+        if not args or not isinstance(args, list):
+            raise ValueError("transfer.start needs args, e.g. [\"upload\", \"file\", \"user@host:/tmp\"]")
+        # Local paths in args are relative to the client, so the transfer runs where the client was
+        cwd = request.get("cwd")
+        if cwd is not None and not (isinstance(cwd, str) and os.path.isabs(cwd)):
+            raise ValueError("transfer.start cwd must be an absolute path")
+
+        with self.transfer_lock:
+            transfer_id = str(self.next_transfer)
+            self.next_transfer += 1
+            job = TransferJob(transfer_id, [str(arg) for arg in args], self.transfer_dir, cwd)
+            self.transfers[transfer_id] = job
+
+            finished = [j for j in self.transfers.values() if j.state != "running"]
+            for old in sorted(finished, key=lambda j: j.finished)[:max(len(finished) - MAX_FINISHED_TRANSFERS, 0)]:
+                old.discard()
+                del self.transfers[old.id]
+        return {"id": transfer_id}
+
+    def find_transfer(self, request):
+        job = self.transfers.get(str(request.get("id")))
+        if job is None:
+            raise ValueError(f"no transfer with id {request.get('id')}")
+        return job
+
+    def transfer_status(self, request):
+        if request.get("id") is None:
+            with self.transfer_lock:
+                jobs = list(self.transfers.values())
+            return {"transfers": [job.status() for job in jobs]}
+        return self.find_transfer(request).status()
+
+    def transfer_cancel(self, request):
+        job = self.find_transfer(request)
+        job.cancel()
+        return {"id": job.id, "state": job.state}
+
+    def portproxy_status(self, request):
+        """Current WSL IP, sshd reachability, the forwarded-port rules and what a rebind would change"""
+        ip = wsl_ssh.get_current_wsl_ip()
+        stored_ip = wsl_ssh.read_stored_ip()
+        ports = wsl_ssh.load_forwarded_ports()
+        current = wsl_ssh.show_portproxy()
+        desired = {(wsl_ssh.LISTEN_ADDRESS, listen): (ip, connect) for listen, connect in ports}
+        stale_ips = [stored_ip] if stored_ip and stored_ip != ip else []
+        return {
+            "ip": ip,
+            "stored_ip": stored_ip,
+            "ssh_reachable": bool(ip) and wsl_ssh.ssh_reachable(ip),
+            "forwarded": ports,
+            "rules": [
+                {"listen_address": address, "listen_port": port, "connect_address": connect_address, "connect_port": connect_port}
+                for (address, port), (connect_address, connect_port) in sorted(current.items())
+            ],
+            "pending": wsl_ssh.plan_portproxy(current, desired, wsl_ssh.read_managed_ports(), stale_ips) if ip else []
+        }
+
+class PowerWSLHandler(shell_pool.ShellPoolHandler):
+    """One connection: a streamed run on the shell pool, or a single request/reply op"""
+
+    daemon = None
+
+    def handle(self):
+        request = self.read_request()
+        if request is None:
+            return
+        op = request.get("op")
+        if op is None:
+            # gui_bridge clients: {"cmd": ...} runs, {"ping": true} pings
+            op = "run" if request.get("cmd") else "ping" if request.get("ping") else None
+        if op == "run":
+            self.run_request(request)
+            return
+        try:
+            self.send(self.daemon.dispatch(dict(request, op=op)))
+        except OSError:
+            pass
+
+def serve(socket_path=None, powershell_path=None, size=shell_pool.DEFAULT_SIZE,
+          max_uses=shell_pool.DEFAULT_MAX_USES, env_file=".env"):
+    """Run the daemon in the foreground until interrupted"""
+    socket_path = socket_path or default_socket_path()
+    if gui_bridge.ping(socket_path):
+        print(f"Error: a daemon is already listening on {socket_path}")
+        return 1
+    try:
+        gui_bridge.prepare_socket(socket_path)
+    except (gui_bridge.BridgeUnavailable, OSError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    daemon = PowerWSLDaemon(socket_path, powershell_path, size, max_uses, env_file)
+    handler = type("BoundPowerWSLHandler", (PowerWSLHandler,), {"pool": daemon.pool, "daemon": daemon})
+    server = gui_bridge.BridgeServer(socket_path, handler)
+    os.chmod(socket_path, 0o600)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"powerwsl daemon listening on {socket_path} (pid {os.getpid()})")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+    return 0
+
+def request(op, socket_path=None, **params):
+    """Send one op to the daemon and return its reply; raises BridgeUnavailable if it isn't running"""
+    sock = gui_bridge.connect(socket_path or default_socket_path())
+    with sock, sock.makefile("rb") as reader:
+        sock.sendall((json.dumps(dict(params, op=op)) + "\n").encode())
+        line = reader.readline()
+    if not line:
+        return {"ok": False, "error": "daemon closed the connection"}
+    return json.loads(line)
+
+def parse_target(text):
+    """Window target from the command line: 3, h<handle> or p<pid>"""
+    if text[:1] in ("h", "H"):
+        return {"handle": int(text[1:])}
+    if text[:1] in ("p", "P"):
+        return {"pid": int(text[1:])}
+    return {"index": int(text)}
+
+def print_reply(reply, as_json):
+    if as_json:
+        print(json.dumps(reply, indent=2))
+    elif "results" in reply:
+        for result in reply["results"]:
+            print(result["message"])
+    elif not reply.get("ok", False):
+        print(f"Error: {reply.get('error') or reply}")
+    elif "windows" in reply:
+        print(format_windows_table(reply["windows"]))
+    elif "transfers" in reply:
+        for status in reply["transfers"]:
+            print(f"{status['id']:>4}  {status['state']:<10} {status['seconds']:>8.1f}s  {' '.join(status['args'])}")
+    else:
+        print(json.dumps(reply, indent=2))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resident daemon for window control, commands, transfers and portproxy status")
+    parser.add_argument("--socket", default=None, help="Daemon socket path (default: $POWERWSL_SOCKET or powerwsl.sock in $XDG_RUNTIME_DIR/powerwsl or /tmp/powerwsl-<uid>)")
+    parser.add_argument("--json", action="store_true", help="Print the raw JSON reply")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Start the daemon")
+    serve_parser.add_argument("--powershell", default=None, help="powershell.exe to drive for window control")
+    serve_parser.add_argument("--size", type=int, default=shell_pool.DEFAULT_SIZE, help="Shells kept warm for run")
+    serve_parser.add_argument("--max-uses", type=int, default=shell_pool.DEFAULT_MAX_USES, help="Commands per shell before it is replaced")
+    serve_parser.add_argument("--env-file", default=".env", help="dotenv file applied to run commands")
+
+    subparsers.add_parser("ping", help="Check whether the daemon is running")
+    windows_parser = subparsers.add_parser("windows", help="List windows")
+    windows_parser.add_argument("--cached", action="store_true", help="Accept the daemon's cached window list")
+    act_parser = subparsers.add_parser("act", help="Apply a window action")
+    act_parser.add_argument("action", help="minimize, maximize, restore, show, close, focus or toggle")
+    act_parser.add_argument("target", help="Window index, h<handle> or p<pid>")
+
+    run_parser = subparsers.add_parser("run", help="Run a command on the daemon's shell pool")
+    run_parser.add_argument("--cwd", default=None, help="Working directory for the command")
+    run_parser.add_argument("cmd", nargs=argparse.REMAINDER, help="Command line")
+
+    transfer_parser = subparsers.add_parser("transfer", help="Start, check or cancel a transfer")
+    transfer_parser.add_argument("action", choices=("start", "status", "cancel"))
+    transfer_parser.add_argument("args", nargs=argparse.REMAINDER,
+                                 help="start: scp_file_transfer.py arguments; status/cancel: transfer id")
+    subparsers.add_parser("portproxy", help="Show WSL IP, sshd reachability and portproxy rules")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        return serve(args.socket, args.powershell, max(args.size, 1), max(args.max_uses, 1), args.env_file)
+
+    try:
+        if args.command == "run":
+            cmd = " ".join(args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd)
+            if not cmd:
+                parser.error("run needs a command")
+            return gui_bridge.run_command(cmd, cwd=args.cwd, socket_path=args.socket or default_socket_path())
+
+        if args.command == "ping":
+            reply = request("ping", args.socket)
+        elif args.command == "windows":
+            reply = request("windows.list", args.socket, refresh=not args.cached)
+        elif args.command == "act":
+            reply = request("windows.act", args.socket, action=args.action, **parse_target(args.target))
+        elif args.command == "portproxy":
+            reply = request("portproxy.status", args.socket)
+        else:
+            rest = args.args[1:] if args.args[:1] == ["--"] else args.args
+            if args.action == "start":
+                reply = request("transfer.start", args.socket, args=rest, cwd=os.getcwd())
+            elif args.action == "cancel":
+                reply = request("transfer.cancel", args.socket, id=rest[0] if rest else None)
+            else:
+                reply = request("transfer.status", args.socket, **({"id": rest[0]} if rest else {}))
+    except gui_bridge.BridgeUnavailable as e:
+        print(f"Error: {e}")
+        return 1
+    except ValueError as e:
+        parser.error(str(e))
+
+    print_reply(reply, args.json)
+    return 0 if reply.get("ok") else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,17 @@
 # run via powershell to get the GUI access for the program
-import subprocess
 import os
+import sys
 from dotenv import load_dotenv
+from gui_bridge import run_command, ping, BridgeUnavailable
+from execution import run_attached, bash_script, wsl_via_powershell_argv
 
 if os.path.exists(".env"):
     load_dotenv()
 
-POWERSHELL = "/mnt/c/Windows/System32/WindowsPowerShell/v1.0/powershell.exe"
+# Job-runner mode: python run_via_powershell.py jobs.txt [-j 8] [--timeout 60]
+if len(sys.argv) > 1:
+    from job_runner import main as run_jobs
+    sys.exit(run_jobs(sys.argv[1:], via="bridge" if ping() else "powershell"))
 
 directory = input("Enter working directory or enter quit to exit: ")
 if directory == "quit":
@@ -16,12 +21,13 @@ if directory == "quit":
 cmd = input("Enter full cmd to run: ")
 
 # Build full bash command to run inside WSL
-bash_cmd = f"cd '{directory}' && {cmd}"
+bash_cmd = bash_script(cmd, directory)
 print(bash_cmd)
 
-# Run it through PowerShell
-subprocess.run([
-    POWERSHELL,
-    "-Command",
-    f"wsl.exe -d Ubuntu -- bash -c \"{bash_cmd}\""
-])
+# Prefer the resident GUI bridge (gui_bridge.py serve in the desktop session):
+# milliseconds per command instead of a powershell.exe + wsl.exe launch
+try:
+    run_command(cmd, cwd=directory)
+except BridgeUnavailable:
+    # Run it through PowerShell
+    run_attached(wsl_via_powershell_argv(cmd, cwd=directory))
@@ -1,9 +1,28 @@
-import subprocess
 import os
+import sys
 from dotenv import load_dotenv
+from execution import run_attached, bash_argv, gui_env
+import gui_bridge
+import shell_pool
 
-if os.path.exists(".env"):
-    load_dotenv()
+# Server mode: python run_via_subprocess.py --serve [--size 4] [--max-uses 100]
+# keeps warm shells with .env and DISPLAY applied; later runs hand their command to it
+if sys.argv[1:2] == ["--serve"]:
+    sys.exit(shell_pool.main(sys.argv[2:] + ["serve"]))
+
+def load_env():
+    # Only needed without the pool: the pool's shells already carry .env
+    if os.path.exists(".env"):
+        load_dotenv()
+
+pool_running = gui_bridge.ping(shell_pool.default_socket_path())
+
+# Job-runner mode: python run_via_subprocess.py jobs.txt [-j 8] [--timeout 60]
+if len(sys.argv) > 1:
+    from job_runner import main as run_jobs
+    if not pool_running:
+        load_env()
+    sys.exit(run_jobs(sys.argv[1:], via="pool" if pool_running else "subprocess"))
 
 directory = input("Enter working directory or enter quit to exit: ")
 if directory.lower() == "quit":
@@ -12,10 +31,13 @@ if directory.lower() == "quit":
 
 cmd = input("Enter full cmd to run: ")
 
-# Force unbuffered output
-full_cmd = f"export DISPLAY=:0 && cd '{directory}' && {cmd}"
+if pool_running:
+    # A warm shell from the pool: no bash start or .env parse for this command
+    try:
+        sys.exit(gui_bridge.run_command(cmd, cwd=directory, socket_path=shell_pool.default_socket_path()))
+    except gui_bridge.BridgeUnavailable:
+        pass
 
-result = subprocess.run(
-    ["bash", "-c", full_cmd],
-    env={**os.environ, "PYTHONUNBUFFERED": "1"}
-)
+load_env()
+# One bash, DISPLAY=:0 and unbuffered output; the directory is quoted, so spaces and quotes are safe
+result = run_attached(bash_argv(cmd, cwd=directory), env=gui_env())
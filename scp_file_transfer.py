@@ -1,6 +1,22 @@
 import subprocess
 import sys
 import os
+import glob
+import time
+import shlex
+import tarfile
+import threading
+import atexit
+import hashlib
+import zlib
+import json
+import re
+import io
+import getpass
+import argparse
+import contextlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # ANSI color codes
 RESET = "\033[0m"
@@ -15,8 +31,10 @@ WHITE = "\033[37m"
 GRAY = "\033[90m"
 
 def clear_screen():
-    """Clear the terminal screen"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    """Clear the terminal screen with ANSI escapes instead of spawning clear/cls"""
+    if sys.stdout.isatty():
+        sys.stdout.write("\033[2J\033[H")
+        sys.stdout.flush()
 
 def print_ascii_banner():
     print(f"""
@@ -63,34 +81,1331 @@ def validate_file_path(file_path, check_exists=True):
         return confirm in ['y', 'yes']
     return True
 
-def run_scp_command(command):
-    """Execute SCP command with enhanced feedback"""
+def run_scp_command(command, total=0, label="scp", direction="upload"):
+    """Execute SCP command with live progress; returns its exit code
+
+    With total (the file size in bytes) scp runs on a pseudo-terminal so its
+    progress meter can be read, and progress goes to the terminal line and
+    the metrics stream.
+    """
     try:
         print(f"\n{CYAN}🔄 Starting file transfer...{RESET}")
         print(f"{GRAY}Command: {' '.join(command)}{RESET}")
         print_separator()
 
-        # Run with real-time output
-        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                                 universal_newlines=True, bufsize=1)
+        tracker = ProgressTracker(label, total, direction)
+        if total and os.name != "nt":
+            returncode = run_scp_with_meter(command, tracker)
+        else:
+            # Run with real-time output
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                     universal_newlines=True, bufsize=1)
 
-        # Print output in real-time
-        for line in process.stdout:
-            print(line.rstrip())
+            # Print output in real-time
+            for line in process.stdout:
+                print(line.rstrip())
 
-        process.wait()
+            returncode = process.wait()
 
-        if process.returncode == 0:
+        if returncode == 0:
+            tracker.update(total)
+        tracker.finish(returncode == 0)
+
+        if returncode == 0:
             print(f"\n{GREEN}✅ Transfer completed successfully!{RESET}")
             print(f"{GREEN}🎉 File has been transferred.{RESET}")
         else:
-            print(f"\n{RED}❌ Transfer failed with exit code {process.returncode}{RESET}")
+            print(f"\n{RED}❌ Transfer failed with exit code {returncode}{RESET}")
+        return returncode
 
     except KeyboardInterrupt:
         print(f"\n{YELLOW}⚠️  Transfer interrupted by user.{RESET}")
+        return 130
     except Exception as e:
         print(f"\n{RED}❌ Unexpected error occurred:{RESET}")
         print(f"{RED}{str(e)}{RESET}")
+        return 1
+
+# Shared SSH master connections (OpenSSH ControlMaster). Masters stay up for
+# CONTROL_PERSIST after their last use, then exit on their own.
+CONTROL_DIR = os.path.expanduser("~/.ssh/powerwsl")
+CONTROL_PERSIST = "10m"
+
+class ConnectionPool:
+    """One multiplexed SSH master connection per (user, host, port)
+
+    Every ssh/scp command gets ControlMaster options, so only the first
+    call to a host pays for TCP setup, key exchange and authentication;
+    later calls, from this process or any other using the same control
+    directory, ride the existing connection. Masters this process started
+    are shut down when it exits; idle ones expire after `persist`.
+    """
+
+    def __init__(self, control_dir=CONTROL_DIR, persist=CONTROL_PERSIST, enabled=None):
+        if enabled is None:
+            # Windows OpenSSH has no ControlMaster support
+            enabled = os.name != "nt" and os.environ.get("POWERWSL_SSH_MULTIPLEX", "1") != "0"
+        self.control_dir = control_dir
+        self.persist = persist
+        self.enabled = enabled
+        self.known = set()
+        self.owned = set()
+        self.lock = threading.Lock()
+
+    def control_path(self, username, host, port, compress=False):
+        # Hashed so the socket path stays under the ~104 byte AF_UNIX limit.
+        # Compression is fixed when a master connects, so compressed sessions get their own master.
+        digest = hashlib.sha1(f"{username}@{host}:{port}".encode()).hexdigest()[:16]
+        return os.path.join(self.control_dir, f"cm-{digest}{'-z' if compress else ''}")
+
+    def base_options(self, username, host, port, compress=False):
+        return ["-o", f"ControlPath={self.control_path(username, host, port, compress)}"]
+
+    def options(self, username, host, port, compress=False):
+        """ssh/scp -o options that create or reuse the master for this host"""
+        if not self.enabled:
+            return []
+
+        key = (username, host, str(port), compress)
+        with self.lock:
+            if key not in self.known:
+                os.makedirs(self.control_dir, mode=0o700, exist_ok=True)
+                # Remember whether a master already existed; only ours get closed at exit
+                check = subprocess.run(
+                    ["ssh", "-p", str(port)] + self.base_options(username, host, port, compress)
+                    + ["-O", "check", f"{username}@{host}"],
+                    capture_output=True
+                )
+                if check.returncode != 0:
+                    self.owned.add(key)
+                self.known.add(key)
+
+        return self.base_options(username, host, port, compress) + [
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPersist={self.persist}"
+        ]
+
+    def warm(self, username, host, port, compress=False):
+        """Open the master before parallel work so workers don't race to create it"""
+        if self.enabled:
+            subprocess.run(ssh_command(username, host, port, compress) + ["true"], capture_output=True)
+
+    def close(self, username, host, port, compress=False):
+        """Ask the master for this host to exit"""
+        subprocess.run(
+            ["ssh", "-p", str(port)] + self.base_options(username, host, port, compress) + ["-O", "exit", f"{username}@{host}"],
+            capture_output=True
+        )
+        with self.lock:
+            self.known.discard((username, host, str(port), compress))
+            self.owned.discard((username, host, str(port), compress))
+
+    def close_all(self):
+        """Shut down every master this process started"""
+        for username, host, port, compress in list(self.owned):
+            self.close(username, host, port, compress)
+
+CONNECTION_POOL = ConnectionPool()
+atexit.register(CONNECTION_POOL.close_all)
+
+# AEAD ciphers first: AES-GCM runs on AES-NI and ChaCha20-Poly1305 is fastest
+# without it; the CTR modes keep older servers reachable. POWERWSL_SSH_CIPHERS
+# overrides the list, and an empty value leaves the choice to ssh_config.
+SSH_CIPHERS = os.environ.get(
+    "POWERWSL_SSH_CIPHERS",
+    "aes128-gcm@openssh.com,chacha20-poly1305@openssh.com,aes256-gcm@openssh.com,aes128-ctr,aes256-ctr"
+)
+
+def link_options(compress=False):
+    """Cipher preference plus optional compression for a new connection"""
+    options = ["-c", SSH_CIPHERS] if SSH_CIPHERS else []
+    return options + (["-o", "Compression=yes"] if compress else [])
+
+def ssh_command(username, host, port, compress=False):
+    """Base ssh argv for a host; every remote shell call goes through here"""
+    return (["ssh", "-p", str(port)] + link_options(compress)
+            + CONNECTION_POOL.options(username, host, port, compress) + [f"{username}@{host}"])
+
+def scp_command(username, host, port, compress=False):
+    """Base scp argv for a host; every scp call goes through here"""
+    return ["scp", "-P", str(port)] + link_options(compress) + CONNECTION_POOL.options(username, host, port, compress)
+
+def format_size(num_bytes):
+    """Human readable byte count"""
+    size = float(num_bytes)
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024:
+            break
+        size /= 1024
+    return f"{size:.2f} {unit}"
+
+class MetricsStream:
+    """JSON-lines sink for transfer metrics, one object per line, shared by threads
+
+    target is a file path (appended to), "-" for stderr, or None to drop
+    everything. POWERWSL_METRICS sets the default for the module-level stream.
+    """
+
+    def __init__(self, target=None):
+        self.lock = threading.Lock()
+        self.owned = False
+        self.file = None
+        if target == "-":
+            self.file = sys.stderr
+        elif target:
+            self.file = open(target, "a", buffering=1)
+            self.owned = True
+
+    def emit(self, event, **fields):
+        if self.file is None:
+            return
+        record = {"ts": round(time.time(), 3), "event": event}
+        record.update(fields)
+        with self.lock:
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+
+    def close(self):
+        if self.owned:
+            self.file.close()
+        self.file = None
+
+METRICS = MetricsStream(os.environ.get("POWERWSL_METRICS"))
+
+def set_metrics_stream(target):
+    """Send metrics for every following transfer to target (see MetricsStream)"""
+    global METRICS
+    METRICS.close()
+    METRICS = MetricsStream(target)
+
+class ProgressTracker:
+    """Bytes done, instantaneous/average throughput and ETA for one transfer
+
+    Draws a single progress line on a terminal at most every RENDER_INTERVAL
+    seconds and emits the same numbers to METRICS. Callers that do their own
+    I/O wrap it in read()/write() so the time spent waiting on each side is
+    recorded: for an upload reads hit the disk and writes the network, for
+    a download the other way round, and whichever side waited longer is
+    reported as the bottleneck.
+    """
+
+    RENDER_INTERVAL = 0.2
+    RATE_WINDOW = 2.0
+
+    def __init__(self, label, total, direction="upload", done=0):
+        self.label = label
+        self.total = total
+        self.direction = direction
+        self.base = done
+        self.done = done
+        self.read_wait = 0.0
+        self.write_wait = 0.0
+        self.started = time.monotonic()
+        self.samples = deque([(self.started, done)])
+        self.last_render = 0.0
+        self.interactive = sys.stdout.isatty()
+        self.lock = threading.Lock()
+        METRICS.emit("start", label=label, total=total, direction=direction, resumed_from=done)
+
+    def read(self, func, *args):
+        started = time.monotonic()
+        data = func(*args)
+        self.read_wait += time.monotonic() - started
+        return data
+
+    def write(self, func, *args):
+        started = time.monotonic()
+        result = func(*args)
+        self.write_wait += time.monotonic() - started
+        return result
+
+    def advance(self, nbytes):
+        self.update(self.done + nbytes)
+
+    def update(self, done):
+        with self.lock:
+            self.done = done
+            now = time.monotonic()
+            self.samples.append((now, done))
+            while len(self.samples) > 2 and now - self.samples[0][0] > self.RATE_WINDOW:
+                self.samples.popleft()
+            if now - self.last_render < self.RENDER_INTERVAL:
+                return
+            self.last_render = now
+            snapshot = self.snapshot(now)
+        METRICS.emit("progress", **snapshot)
+        self.render(snapshot)
+
+    def snapshot(self, now=None):
+        now = now or time.monotonic()
+        elapsed = now - self.started
+        moved = self.done - self.base
+        average = moved / elapsed if elapsed > 0 else 0.0
+        first_time, first_done = self.samples[0]
+        window = now - first_time
+        rate = (self.done - first_done) / window if window > 0 else average
+        remaining = max(self.total - self.done, 0)
+        eta = remaining / rate if rate > 0 else None
+
+        network, disk = (self.write_wait, self.read_wait) if self.direction == "upload" else (self.read_wait, self.write_wait)
+        bound = None
+        if network or disk:
+            bound = "network" if network >= disk else "disk"
+
+        return {
+            "label": self.label,
+            "bytes": self.done,
+            "total": self.total,
+            "percent": round(100.0 * self.done / self.total, 1) if self.total else None,
+            "rate": round(rate, 1),
+            "avg_rate": round(average, 1),
+            "eta": round(eta, 1) if eta is not None else None,
+            "elapsed": round(elapsed, 3),
+            "read_wait": round(self.read_wait, 3),
+            "write_wait": round(self.write_wait, 3),
+            "bound": bound
+        }
+
+    def render(self, snapshot):
+        if not self.interactive:
+            return
+        percent = f"{snapshot['percent']:5.1f}% " if snapshot['percent'] is not None else ""
+        eta = snapshot['eta']
+        eta = f"ETA {int(eta) // 60}:{int(eta) % 60:02d}" if eta is not None else "ETA --:--"
+        line = (f"{CYAN}{self.label}{RESET} {percent}{format_size(snapshot['bytes'])} / {format_size(snapshot['total'])}  "
+                f"{format_size(snapshot['rate'])}/s {GRAY}(avg {format_size(snapshot['avg_rate'])}/s){RESET}  {eta}")
+        sys.stdout.write("\r\033[K" + line)
+        sys.stdout.flush()
+
+    def log(self, text):
+        """Print a message without tearing the progress line"""
+        if self.interactive:
+            sys.stdout.write("\r\033[K")
+        print(text)
+
+    def finish(self, ok):
+        snapshot = self.snapshot()
+        METRICS.emit("finish", ok=ok, **snapshot)
+        if self.interactive:
+            self.render(snapshot)
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+        return snapshot
+
+# scp draws "name  45%  17MB  5.6MB/s  00:03 ETA" with carriage returns, and only on a terminal
+SCP_METER = re.compile(r"(\d+)%\s+\S+\s+\S+/s")
+
+def run_scp_with_meter(command, tracker):
+    """Run scp on a pseudo-terminal and feed its progress meter into tracker"""
+    import pty
+
+    master, slave = pty.openpty()
+    process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=slave, stderr=slave)
+    os.close(slave)
+
+    pending = b""
+    try:
+        while True:
+            try:
+                data = os.read(master, 4096)
+            except OSError:
+                break
+            if not data:
+                break
+            pending += data
+            pieces = re.split(rb"[\r\n]", pending)
+            pending = pieces.pop()
+            for piece in pieces:
+                text = piece.decode(errors="replace").strip()
+                match = SCP_METER.search(text)
+                if match:
+                    tracker.update(tracker.total * int(match.group(1)) // 100)
+                elif text:
+                    tracker.log(text)
+    finally:
+        os.close(master)
+    return process.wait()
+
+# Adaptive compression: a sample of the data is deflated at level 1 and ssh
+# compression is only used when it shrinks well. For compressible data the
+# measured throughput with and without compression is kept per host, so a
+# fast link where compression costs more CPU than it saves turns it off.
+COMPRESS_SAMPLE = 1024 * 1024
+COMPRESSIBLE_RATIO = 0.7
+MIN_MEASURED_BYTES = 4 * 1024 * 1024
+HOST_PROFILE_PATH = os.path.expanduser("~/.cache/powerwsl/hosts.json")
+
+def compression_ratio(data):
+    """Compressed/original size of a sample; 1.0 means incompressible"""
+    if not data:
+        return 1.0
+    return len(zlib.compress(data, 1)) / len(data)
+
+def sample_local_files(paths, limit=COMPRESS_SAMPLE):
+    """Compression ratio of the first `limit` bytes across local files"""
+    data = b""
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                data += f.read(limit - len(data))
+        except OSError:
+            continue
+        if len(data) >= limit:
+            break
+    return compression_ratio(data)
+
+def sample_remote_files(username, host, port, paths, limit=COMPRESS_SAMPLE):
+    """Compression ratio of the first `limit` bytes across remote files, measured remotely"""
+    files = " ".join(shlex.quote(p) for p in paths)
+    script = (f"n=$(cat -- {files} 2>/dev/null | head -c {limit} | wc -c); "
+              f"z=$(cat -- {files} 2>/dev/null | head -c {limit} | gzip -1 | wc -c); echo $n $z")
+    result = subprocess.run(ssh_command(username, host, port) + [script], capture_output=True, text=True)
+    try:
+        original, compressed = (int(x) for x in result.stdout.split())
+    except ValueError:
+        return 1.0
+    return compressed / original if original else 1.0
+
+class HostProfiles:
+    """Per-host throughput with and without compression, persisted between runs"""
+
+    def __init__(self, path=HOST_PROFILE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            with open(path, "r") as f:
+                self.hosts = json.load(f)
+        except (OSError, ValueError):
+            self.hosts = {}
+
+    def should_compress(self, username, host, port, ratio):
+        """Decide compression for data whose sample compressed to `ratio`"""
+        if ratio >= COMPRESSIBLE_RATIO:
+            return False
+        entry = self.hosts.get(f"{username}@{host}:{port}", {})
+        compressed, plain = entry.get("compressed"), entry.get("plain")
+        if compressed is None or plain is None:
+            # Measure each setting once before trusting either
+            return compressed is None
+        return compressed >= plain
+
+    def record(self, username, host, port, ratio, compress, nbytes, seconds):
+        """Fold a finished transfer of compressible data into the host's throughput"""
+        if ratio >= COMPRESSIBLE_RATIO or nbytes < MIN_MEASURED_BYTES or seconds <= 0:
+            return
+        rate = nbytes / seconds
+        setting = "compressed" if compress else "plain"
+        with self.lock:
+            entry = self.hosts.setdefault(f"{username}@{host}:{port}", {})
+            previous = entry.get(setting)
+            entry[setting] = round(rate if previous is None else 0.7 * previous + 0.3 * rate, 1)
+            entry["updated"] = int(time.time())
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                temp_path = f"{self.path}.tmp"
+                with open(temp_path, "w") as f:
+                    json.dump(self.hosts, f, indent=2)
+                os.replace(temp_path, self.path)
+            except OSError:
+                pass
+
+HOST_PROFILES = HostProfiles()
+
+def describe_link(ratio, compress):
+    print(f"{GRAY}Link: compression {'on' if compress else 'off'} (sample ratio {ratio:.2f}), "
+          f"ciphers {SSH_CIPHERS.split(',')[0] if SSH_CIPHERS else 'ssh default'}…{RESET}")
+
+# Files below this size are bundled into tar streams instead of one scp each
+SMALL_FILE_THRESHOLD = 1024 * 1024
+DEFAULT_WORKERS = 4
+
+class TransferItem:
+    """One file in a batch: where it is, where it goes relative to the target, its size"""
+
+    def __init__(self, source, relative, size):
+        self.source = source
+        self.relative = relative
+        self.size = size
+
+def collect_local_files(paths):
+    """Expand local files, globs and directories into TransferItems
+
+    A directory keeps its own name at the destination (like scp -r); files
+    land directly in the destination directory.
+    """
+    items = []
+    for pattern in paths:
+        matches = sorted(glob.glob(expand_path(pattern), recursive=True))
+        if not matches:
+            print(f"{YELLOW}⚠️  Nothing matches '{pattern}'{RESET}")
+        for match in matches:
+            match = os.path.abspath(match)
+            if os.path.isdir(match):
+                parent = os.path.dirname(match.rstrip(os.sep))
+                for root, _, files in os.walk(match):
+                    for name in files:
+                        full = os.path.join(root, name)
+                        items.append(TransferItem(full, os.path.relpath(full, parent), os.path.getsize(full)))
+            elif os.path.isfile(match):
+                items.append(TransferItem(match, os.path.basename(match), os.path.getsize(match)))
+    return items
+
+def remote_glob_quote(path):
+    """Quote a remote path for the shell but leave glob characters and a leading ~ active"""
+    quoted = "".join(c if c.isalnum() or c in "*?[]/._-+=,@%" else "\\" + c for c in path)
+    if path.startswith("~/"):
+        quoted = "~/" + quoted[3:]
+    return quoted
+
+def collect_remote_files(username, host, port, paths):
+    """Expand remote files, globs and directories with a single ssh + find call"""
+    remote_cmd = "find " + " ".join(remote_glob_quote(p) for p in paths) + " -type f -printf '%s\\t%H\\t%P\\n'"
+    result = subprocess.run(ssh_command(username, host, port) + [remote_cmd], capture_output=True, text=True)
+    if result.returncode != 0 and not result.stdout:
+        print(f"{RED}❌ Could not list remote files: {result.stderr.strip()}{RESET}")
+        return []
+
+    items = []
+    for line in result.stdout.splitlines():
+        parts = line.split("\t", 2)
+        if len(parts) != 3:
+            continue
+        size, start, relative = parts
+        start = start.rstrip("/")
+        name = os.path.basename(start)
+        source = f"{start}/{relative}" if relative else start
+        items.append(TransferItem(source, f"{name}/{relative}" if relative else name, int(size)))
+    return items
+
+def plan_batches(items, workers, small_threshold=SMALL_FILE_THRESHOLD):
+    """Split items into tar bundles of small files and individual large files
+
+    Small files are spread over at most `workers` bundles of similar total
+    size so each bundle pays the SSH handshake once; large files go one per
+    scp so they can use the workers in parallel.
+    """
+    small = sorted((i for i in items if i.size < small_threshold), key=lambda i: i.size, reverse=True)
+    large = sorted((i for i in items if i.size >= small_threshold), key=lambda i: i.size, reverse=True)
+
+    bundles = [[] for _ in range(min(workers, len(small)))]
+    totals = [0] * len(bundles)
+    for item in small:
+        slot = totals.index(min(totals))
+        bundles[slot].append(item)
+        totals[slot] += item.size
+
+    return [b for b in bundles if b], large
+
+def upload_bundle(username, host, port, bundle, remote_dir, compress=False):
+    """Stream many small local files to remote_dir as one tar over one ssh"""
+    remote_cmd = f"mkdir -p {remote_glob_quote(remote_dir)} && tar -xf - -C {remote_glob_quote(remote_dir)}"
+    process = subprocess.Popen(ssh_command(username, host, port, compress) + [remote_cmd],
+                               stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        with tarfile.open(fileobj=process.stdin, mode="w|") as tar:
+            for item in bundle:
+                tar.add(item.source, arcname=item.relative)
+        process.stdin.close()
+    except (BrokenPipeError, OSError):
+        pass
+    stderr = process.stderr.read().decode(errors="replace")
+    process.wait()
+    return process.returncode, stderr
+
+def download_bundle(username, host, port, bundle, local_dir, compress=False):
+    """Pull many small remote files into local_dir as one tar over one ssh"""
+    args = []
+    for item in bundle:
+        base = item.source[:len(item.source) - len(item.relative)]
+        base = (base.rstrip("/") or "/") if base else "."
+        args.append(f"-C {shlex.quote(base)} {shlex.quote(item.relative)}")
+    remote_cmd = "tar -cf - " + " ".join(args)
+
+    os.makedirs(local_dir, exist_ok=True)
+    process = subprocess.Popen(ssh_command(username, host, port, compress) + [remote_cmd],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        with tarfile.open(fileobj=process.stdout, mode="r|") as tar:
+            if hasattr(tarfile, "data_filter"):
+                tar.extractall(local_dir, filter="data")
+            else:
+                tar.extractall(local_dir)
+    except tarfile.TarError as e:
+        process.kill()
+        process.wait()
+        return 1, str(e)
+    stderr = process.stderr.read().decode(errors="replace")
+    process.wait()
+    return process.returncode, stderr
+
+def transfer_large(username, host, port, item, target_dir, direction, compress=False):
+    """Copy one large file with its own scp process"""
+    if direction == "upload":
+        destination = f"{username}@{host}:{target_dir.rstrip('/')}/{item.relative}"
+        command = scp_command(username, host, port, compress) + ["-q", "-p", item.source, destination]
+    else:
+        destination = os.path.join(target_dir, item.relative)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        command = scp_command(username, host, port, compress) + ["-q", "-p", f"{username}@{host}:{item.source}", destination]
+    result = subprocess.run(command, capture_output=True, text=True)
+    return result.returncode, result.stderr
+
+def run_batch_transfer(username, host, port, paths, target_dir, direction, workers=DEFAULT_WORKERS,
+                       small_threshold=SMALL_FILE_THRESHOLD):
+    """Transfer many files/globs/directories in parallel and report aggregate throughput
+
+    direction is "upload" (local paths -> remote target_dir) or "download"
+    (remote paths -> local target_dir). Returns a dict with files, bytes,
+    seconds, throughput (bytes/s) and the list of failures.
+    """
+    CONNECTION_POOL.warm(username, host, port)
+
+    if direction == "upload":
+        items = collect_local_files(paths)
+    else:
+        items = collect_remote_files(username, host, port, paths)
+
+    if not items:
+        print(f"{YELLOW}⚠️  No files to transfer.{RESET}")
+        return {'files': 0, 'bytes': 0, 'seconds': 0.0, 'throughput': 0.0, 'failures': []}
+
+    return transfer_items(username, host, port, items, target_dir, direction, workers, small_threshold)
+
+def transfer_items(username, host, port, items, target_dir, direction, workers=DEFAULT_WORKERS,
+                   small_threshold=SMALL_FILE_THRESHOLD):
+    """Move already collected TransferItems using tar bundles and parallel scp"""
+    bundles, large = plan_batches(items, workers, small_threshold)
+    total_bytes = sum(item.size for item in items)
+
+    # Sample the biggest files: they dominate the bytes on the wire
+    sample = [item.source for item in sorted(items, key=lambda i: i.size, reverse=True)[:8]]
+    if direction == "upload":
+        ratio = sample_local_files(sample)
+    else:
+        ratio = sample_remote_files(username, host, port, sample)
+    compress = HOST_PROFILES.should_compress(username, host, port, ratio)
+    if compress:
+        # Compressed links use their own control path; open that master before the workers race for it
+        CONNECTION_POOL.warm(username, host, port, compress=True)
+
+    print(f"\n{CYAN}🔄 Transferring {len(items)} files ({format_size(total_bytes)}) with {workers} workers: "
+          f"{len(bundles)} bundle(s) of small files, {len(large)} large file(s){RESET}")
+    describe_link(ratio, compress)
+    print_separator()
+
+    started = time.monotonic()
+
+    if direction == "upload":
+        # Large files are copied straight to their final path, so create every
+        # directory they need up front in a single remote call
+        directories = sorted({os.path.dirname(f"{target_dir.rstrip('/')}/{item.relative}") for item in large})
+        if directories:
+            subprocess.run(ssh_command(username, host, port) + ["mkdir -p " + " ".join(remote_glob_quote(d) for d in directories)],
+                           capture_output=True)
+
+    failures = []
+    done_bytes = 0
+    lock = threading.Lock()
+    tracker = ProgressTracker(f"{len(items)} files", total_bytes, direction)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for bundle in bundles:
+            if direction == "upload":
+                future = pool.submit(upload_bundle, username, host, port, bundle, target_dir, compress)
+            else:
+                future = pool.submit(download_bundle, username, host, port, bundle, target_dir, compress)
+            futures[future] = bundle
+        for item in large:
+            futures[pool.submit(transfer_large, username, host, port, item, target_dir, direction, compress)] = [item]
+
+        for future in as_completed(futures):
+            group = futures[future]
+            returncode, stderr = future.result()
+            size = sum(item.size for item in group)
+            with lock:
+                if returncode == 0:
+                    done_bytes += size
+                    label = group[0].relative if len(group) == 1 else f"{len(group)} small files"
+                    tracker.log(f"{GREEN}✔{RESET} {label} {GRAY}({format_size(size)}){RESET}")
+                else:
+                    failures.extend(item.relative for item in group)
+                    tracker.log(f"{RED}✘ {len(group)} file(s) failed: {stderr.strip()}{RESET}")
+                tracker.update(done_bytes)
+
+    tracker.finish(not failures)
+    seconds = time.monotonic() - started
+    throughput = done_bytes / seconds if seconds > 0 else 0.0
+    HOST_PROFILES.record(username, host, port, ratio, compress, done_bytes, seconds)
+
+    print_separator()
+    print(f"{MAGENTA}📊 {len(items) - len(failures)}/{len(items)} files, {format_size(done_bytes)} in {seconds:.2f}s "
+          f"→ {format_size(throughput)}/s{RESET}")
+    if failures:
+        print(f"{RED}❌ {len(failures)} file(s) failed.{RESET}")
+    else:
+        print(f"{GREEN}✅ Batch transfer completed successfully!{RESET}")
+
+    return {'files': len(items), 'bytes': done_bytes, 'seconds': seconds, 'throughput': throughput, 'failures': failures,
+            'compressed': compress}
+
+# Resumable transfers move files in fixed-size chunks. Every chunk is hashed
+# as it streams past, progress is kept in a sidecar file next to the local
+# copy, and success is only reported once the remote side's chunk hashes
+# (computed in one streaming pass) match ours.
+CHUNK_SIZE = 8 * 1024 * 1024
+RESUMABLE_THRESHOLD = 64 * 1024 * 1024
+STATE_SUFFIX = ".powerwsl-transfer"
+
+class TransferState:
+    """Sidecar record of a chunked transfer: which chunks were sent and which verified"""
+
+    def __init__(self, path, identity):
+        self.path = path
+        self.identity = identity
+        self.digests = []
+        self.verified = 0
+
+    @classmethod
+    def load(cls, path, identity):
+        """Load the sidecar if it belongs to this exact transfer, else start fresh"""
+        state = cls(path, identity)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return state
+
+        if data.get("identity") == identity:
+            state.digests = list(data.get("digests", []))
+            state.verified = min(int(data.get("verified", 0)), len(state.digests))
+        return state
+
+    def save(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"identity": self.identity, "digests": self.digests, "verified": self.verified}, f)
+        os.replace(temp_path, self.path)
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def keep(self, chunks):
+        """Forget everything past the first `chunks` chunks"""
+        del self.digests[chunks:]
+        self.verified = min(self.verified, chunks)
+
+def manifest_digest(digests):
+    """End-to-end checksum of a file: SHA-256 over its ordered chunk digests"""
+    return hashlib.sha256("".join(digests).encode()).hexdigest()
+
+def probe_remote_file(username, host, port, remote_path, name=None):
+    """Resolve a remote path (a directory means <dir>/<name>) and return (path, size or -1)"""
+    script = (
+        f"p={remote_glob_quote(remote_path)}; "
+        + (f"if [ -d \"$p\" ]; then p=\"${{p%/}}\"/{shlex.quote(name)}; fi; " if name else "")
+        + "printf '%s\\n' \"$p\"; stat -c %s \"$p\" 2>/dev/null || echo -1"
+    )
+    result = subprocess.run(ssh_command(username, host, port) + [script], capture_output=True, text=True)
+    lines = result.stdout.splitlines()
+    if result.returncode != 0 or len(lines) < 2:
+        return None, -1
+    try:
+        return lines[0], int(lines[1])
+    except ValueError:
+        return lines[0], -1
+
+def remote_chunk_digests(username, host, port, remote_path, chunk_size, start, end):
+    """Yield SHA-256 hex digests of remote chunks [start, end) as the remote computes them"""
+    script = (
+        f"f={shlex.quote(remote_path)}; i={int(start)}; n={int(end)}; "
+        f"while [ \"$i\" -lt \"$n\" ]; do "
+        f"dd if=\"$f\" bs={int(chunk_size)} skip=\"$i\" count=1 2>/dev/null | sha256sum | cut -d' ' -f1; "
+        f"i=$((i+1)); done"
+    )
+    process = subprocess.Popen(ssh_command(username, host, port) + [script],
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        for line in process.stdout:
+            yield line.strip()
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+
+def verify_chunks(username, host, port, remote_path, state, chunk_size):
+    """Compare unverified chunks with the remote copy; returns True if all match
+
+    Stops at the first mismatch and trims the state there, so the next run
+    resumes from the last chunk known to be good.
+    """
+    start, end = state.verified, len(state.digests)
+    index = start
+    for digest in remote_chunk_digests(username, host, port, remote_path, chunk_size, start, end):
+        if index >= end or digest != state.digests[index]:
+            break
+        index += 1
+        state.verified = index
+
+    if index != end:
+        state.keep(index)
+        state.save()
+        return False
+
+    state.save()
+    return True
+
+def read_chunk(stream, chunk_size):
+    """Read exactly chunk_size bytes unless the stream ends first"""
+    parts = []
+    remaining = chunk_size
+    while remaining > 0:
+        data = stream.read(remaining)
+        if not data:
+            break
+        parts.append(data)
+        remaining -= len(data)
+    return b"".join(parts)
+
+def resumable_upload(username, host, port, local_path, remote_path, chunk_size=CHUNK_SIZE, compress=False):
+    """Upload one file in verified chunks, resuming a previous interrupted attempt
+
+    Returns a dict with ok, bytes (sent this run), size, seconds,
+    resumed_from (byte offset) and digest (end-to-end checksum).
+    """
+    size = os.path.getsize(local_path)
+    remote_file, remote_size = probe_remote_file(username, host, port, remote_path, os.path.basename(local_path))
+    if remote_file is None:
+        print(f"{RED}❌ Could not reach {host} to prepare the upload.{RESET}")
+        return {'ok': False, 'bytes': 0, 'size': size, 'seconds': 0.0, 'resumed_from': 0, 'digest': None}
+
+    identity = {
+        "direction": "upload", "remote": f"{username}@{host}:{port}:{remote_file}",
+        "size": size, "mtime": os.path.getmtime(local_path), "chunk_size": chunk_size
+    }
+    state = TransferState.load(local_path + STATE_SUFFIX, identity)
+
+    # Chunks recorded as sent count only if the remote file still holds them whole
+    state.keep(min(len(state.digests), max(remote_size, 0) // chunk_size))
+    offset = len(state.digests) * chunk_size
+    total_chunks = (size + chunk_size - 1) // chunk_size
+
+    if offset:
+        print(f"{CYAN}↻ Resuming upload at {format_size(offset)} of {format_size(size)}{RESET}")
+
+    started = time.monotonic()
+    sent = 0
+    tracker = ProgressTracker(os.path.basename(local_path), size, "upload", done=offset)
+    remote_cmd = f"truncate -s {offset} {shlex.quote(remote_file)} && cat >> {shlex.quote(remote_file)}"
+    process = subprocess.Popen(ssh_command(username, host, port, compress) + [remote_cmd],
+                               stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        with open(local_path, "rb") as f:
+            f.seek(offset)
+            while len(state.digests) < total_chunks:
+                chunk = tracker.read(read_chunk, f, chunk_size)
+                if not chunk:
+                    break
+                tracker.write(process.stdin.write, chunk)
+                state.digests.append(hashlib.sha256(chunk).hexdigest())
+                state.save()
+                sent += len(chunk)
+                tracker.advance(len(chunk))
+        process.stdin.close()
+    except KeyboardInterrupt:
+        process.kill()
+        process.wait()
+        state.save()
+        tracker.finish(False)
+        print(f"\n{YELLOW}⚠️  Upload interrupted; run it again to resume.{RESET}")
+        raise
+    except (BrokenPipeError, OSError):
+        pass
+
+    stderr = process.stderr.read().decode(errors="replace")
+    process.wait()
+    tracker.finish(process.returncode == 0)
+    if process.returncode != 0:
+        state.save()
+        print(f"{RED}❌ Upload stream failed: {stderr.strip()}{RESET}")
+        return {'ok': False, 'bytes': sent, 'size': size, 'seconds': time.monotonic() - started,
+                'resumed_from': offset, 'digest': None}
+
+    ok = verify_chunks(username, host, port, remote_file, state, chunk_size)
+    return finish_resumable(state, ok, sent, size, started, offset)
+
+def resumable_download(username, host, port, remote_path, local_path, chunk_size=CHUNK_SIZE, compress=False):
+    """Download one file in verified chunks, resuming a previous interrupted attempt"""
+    remote_file, size = probe_remote_file(username, host, port, remote_path)
+    if remote_file is None or size < 0:
+        print(f"{RED}❌ Remote file '{remote_path}' is not available.{RESET}")
+        return {'ok': False, 'bytes': 0, 'size': 0, 'seconds': 0.0, 'resumed_from': 0, 'digest': None}
+
+    if os.path.isdir(local_path):
+        local_path = os.path.join(local_path, os.path.basename(remote_file))
+
+    identity = {
+        "direction": "download", "remote": f"{username}@{host}:{port}:{remote_file}",
+        "size": size, "chunk_size": chunk_size
+    }
+    state = TransferState.load(local_path + STATE_SUFFIX, identity)
+
+    local_size = os.path.getsize(local_path) if os.path.exists(local_path) else 0
+    state.keep(min(len(state.digests), local_size // chunk_size))
+    offset = len(state.digests) * chunk_size
+    total_chunks = (size + chunk_size - 1) // chunk_size
+
+    if offset:
+        print(f"{CYAN}↻ Resuming download at {format_size(offset)} of {format_size(size)}{RESET}")
+
+    started = time.monotonic()
+    received = 0
+    tracker = ProgressTracker(os.path.basename(remote_file), size, "download", done=offset)
+    process = subprocess.Popen(ssh_command(username, host, port, compress) + [f"tail -c +{offset + 1} {shlex.quote(remote_file)}"],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        with open(local_path, "r+b" if os.path.exists(local_path) else "wb") as f:
+            f.truncate(offset)
+            f.seek(offset)
+            while len(state.digests) < total_chunks:
+                chunk = tracker.read(read_chunk, process.stdout, chunk_size)
+                if not chunk:
+                    break
+                tracker.write(f.write, chunk)
+                state.digests.append(hashlib.sha256(chunk).hexdigest())
+                state.save()
+                received += len(chunk)
+                tracker.advance(len(chunk))
+    except KeyboardInterrupt:
+        process.kill()
+        process.wait()
+        state.save()
+        tracker.finish(False)
+        print(f"\n{YELLOW}⚠️  Download interrupted; run it again to resume.{RESET}")
+        raise
+
+    stderr = process.stderr.read().decode(errors="replace")
+    process.wait()
+    tracker.finish(process.returncode == 0 and len(state.digests) >= total_chunks)
+    if process.returncode != 0 or len(state.digests) < total_chunks:
+        state.save()
+        print(f"{RED}❌ Download stream failed: {stderr.strip() or 'remote file ended early'}{RESET}")
+        return {'ok': False, 'bytes': received, 'size': size, 'seconds': time.monotonic() - started,
+                'resumed_from': offset, 'digest': None}
+
+    ok = verify_chunks(username, host, port, remote_file, state, chunk_size)
+    return finish_resumable(state, ok, received, size, started, offset)
+
+def finish_resumable(state, ok, moved, size, started, offset):
+    seconds = time.monotonic() - started
+    digest = manifest_digest(state.digests) if ok else None
+
+    if ok:
+        state.discard()
+        print(f"{GREEN}✅ Verified {len(state.digests)} chunk(s), checksum {digest[:16]}…{RESET}")
+    else:
+        print(f"{RED}❌ Checksum mismatch after chunk {state.verified}; run again to resend from there.{RESET}")
+
+    return {'ok': ok, 'bytes': moved, 'size': size, 'seconds': seconds, 'resumed_from': offset, 'digest': digest}
+
+# Sync keeps a manifest (size, mtime, optional hash) of both sides per
+# (local dir, remote dir) pair, so unchanged files are recognised from a
+# stat alone and hashes are only computed for files whose stat changed.
+MANIFEST_DIR = os.path.expanduser("~/.cache/powerwsl/manifests")
+DELTA_THRESHOLD = 16 * 1024 * 1024
+
+def manifest_cache_path(username, host, port, local_root, remote_root):
+    key = f"{os.path.abspath(local_root)}|{username}@{host}:{port}:{remote_root}"
+    return os.path.join(MANIFEST_DIR, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+def load_manifest_cache(path):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        return data.get("local", {}), data.get("remote", {})
+    except (OSError, ValueError):
+        return {}, {}
+
+def save_manifest_cache(path, local, remote):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump({"local": local, "remote": remote}, f)
+    os.replace(temp_path, path)
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def scan_local_tree(root, cached):
+    """Stat every file under root; carry cached hashes over when size and mtime still match"""
+    manifest = {}
+    for directory, _, files in os.walk(root):
+        for name in files:
+            full = os.path.join(directory, name)
+            try:
+                info = os.stat(full)
+            except OSError:
+                continue
+            relative = os.path.relpath(full, root).replace(os.sep, "/")
+            entry = {"size": info.st_size, "mtime": int(info.st_mtime)}
+            previous = cached.get(relative)
+            if previous and previous.get("size") == entry["size"] and previous.get("mtime") == entry["mtime"]:
+                entry["hash"] = previous.get("hash")
+            manifest[relative] = entry
+    return manifest
+
+def scan_remote_tree(username, host, port, remote_root, cached):
+    """List size and mtime of every remote file under remote_root with one find call"""
+    script = f"find {remote_glob_quote(remote_root)} -type f -printf '%P\\t%s\\t%T@\\n' 2>/dev/null; true"
+    result = subprocess.run(ssh_command(username, host, port) + [script], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+
+    manifest = {}
+    for line in result.stdout.splitlines():
+        parts = line.rsplit("\t", 2)
+        if len(parts) != 3:
+            continue
+        relative, size, mtime = parts
+        entry = {"size": int(size), "mtime": int(float(mtime))}
+        previous = cached.get(relative)
+        if previous and previous.get("size") == entry["size"] and previous.get("mtime") == entry["mtime"]:
+            entry["hash"] = previous.get("hash")
+        manifest[relative] = entry
+    return manifest
+
+def remote_file_hashes(username, host, port, remote_root, relatives):
+    """sha256sum a set of remote files in one call"""
+    if not relatives:
+        return {}
+    script = f"cd {remote_glob_quote(remote_root)} && sha256sum -- " + " ".join(shlex.quote(r) for r in relatives)
+    result = subprocess.run(ssh_command(username, host, port) + [script], capture_output=True, text=True)
+    hashes = {}
+    for line in result.stdout.splitlines():
+        digest, _, relative = line.partition("  ")
+        if relative:
+            hashes[relative] = digest
+    return hashes
+
+def local_chunk_digests(path, chunk_size):
+    with open(path, "rb") as f:
+        return [hashlib.sha256(chunk).hexdigest() for chunk in iter(lambda: f.read(chunk_size), b"")]
+
+def delta_upload(username, host, port, local_path, remote_file, chunk_size=CHUNK_SIZE, compress=False):
+    """Update a large remote file in place, sending only the chunks that differ
+
+    Chunks are compared at fixed offsets, which catches in-place edits and
+    appends (the common case for logs, images and build outputs); content
+    that shifted by an insertion is resent from that point on.
+    """
+    size = os.path.getsize(local_path)
+    local_digests = local_chunk_digests(local_path, chunk_size)
+    remote_digests = list(remote_chunk_digests(username, host, port, remote_file, chunk_size, 0, len(local_digests)))
+
+    changed = [i for i, digest in enumerate(local_digests)
+               if i >= len(remote_digests) or remote_digests[i] != digest]
+
+    mtime = int(os.path.getmtime(local_path))
+    quoted = shlex.quote(remote_file)
+    script = (
+        f"for i in {' '.join(str(i) for i in changed)}; do "
+        f"dd of={quoted} bs={int(chunk_size)} seek=\"$i\" count=1 conv=notrunc iflag=fullblock 2>/dev/null || exit 1; done; "
+        f"truncate -s {size} {quoted} && touch -d @{mtime} {quoted}"
+    )
+    process = subprocess.Popen(ssh_command(username, host, port, compress) + [script],
+                               stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    sent = 0
+    changed_bytes = sum(min(chunk_size, size - i * chunk_size) for i in changed)
+    tracker = ProgressTracker(f"{os.path.basename(local_path)} (delta)", changed_bytes, "upload")
+    try:
+        with open(local_path, "rb") as f:
+            for index in changed:
+                f.seek(index * chunk_size)
+                chunk = tracker.read(f.read, chunk_size)
+                tracker.write(process.stdin.write, chunk)
+                sent += len(chunk)
+                tracker.advance(len(chunk))
+        process.stdin.close()
+    except (BrokenPipeError, OSError):
+        pass
+    stderr = process.stderr.read().decode(errors="replace")
+    process.wait()
+    tracker.finish(process.returncode == 0)
+    if process.returncode != 0:
+        return False, sent, stderr
+
+    updated = list(remote_chunk_digests(username, host, port, remote_file, chunk_size, 0, len(local_digests)))
+    if updated != local_digests:
+        return False, sent, "chunk checksum mismatch after delta update"
+    return True, sent, ""
+
+def run_sync(username, host, port, local_root, remote_root, use_hash=False, delta=True, workers=DEFAULT_WORKERS):
+    """Upload only new or changed files from local_root into remote_root
+
+    A file is unchanged when size and mtime match the remote copy. With
+    use_hash, files whose size matches but mtime differs are compared by
+    SHA-256 instead of being resent. Changed files of DELTA_THRESHOLD or
+    more that already exist remotely are updated chunk by chunk when delta
+    is on. Returns a dict of counts, bytes sent, seconds and failures.
+    """
+    local_root = os.path.abspath(expand_path(local_root))
+    if not os.path.isdir(local_root):
+        print(f"{RED}❌ '{local_root}' is not a directory.{RESET}")
+        return {'scanned': 0, 'sent': 0, 'delta': 0, 'unchanged': 0, 'bytes': 0, 'seconds': 0.0, 'failures': []}
+
+    started = time.monotonic()
+    CONNECTION_POOL.warm(username, host, port)
+
+    cache_path = manifest_cache_path(username, host, port, local_root, remote_root)
+    cached_local, cached_remote = load_manifest_cache(cache_path)
+    local = scan_local_tree(local_root, cached_local)
+    remote = scan_remote_tree(username, host, port, remote_root, cached_remote)
+    if remote is None:
+        print(f"{RED}❌ Could not list '{remote_root}' on {host}.{RESET}")
+        return {'scanned': len(local), 'sent': 0, 'delta': 0, 'unchanged': 0, 'bytes': 0, 'seconds': 0.0, 'failures': []}
+
+    changed = []
+    undecided = []
+    for relative, entry in local.items():
+        other = remote.get(relative)
+        if other is None or other["size"] != entry["size"]:
+            changed.append(relative)
+        elif other["mtime"] != entry["mtime"]:
+            (undecided if use_hash else changed).append(relative)
+
+    if undecided:
+        # Same size, different mtime: let content decide, hashing only what the caches lack
+        for relative in undecided:
+            if not local[relative].get("hash"):
+                local[relative]["hash"] = hash_file(os.path.join(local_root, relative))
+        missing = [r for r in undecided if not remote[r].get("hash")]
+        for relative, digest in remote_file_hashes(username, host, port, remote_root, missing).items():
+            if relative in remote:
+                remote[relative]["hash"] = digest
+        changed.extend(r for r in undecided if local[r]["hash"] != remote[r].get("hash"))
+
+    unchanged = len(local) - len(changed)
+    print(f"\n{CYAN}🔍 {len(local)} local files: {len(changed)} new or changed, {unchanged} unchanged{RESET}")
+
+    delta_files = [r for r in changed if delta and r in remote and local[r]["size"] >= DELTA_THRESHOLD]
+    full_files = [r for r in changed if r not in delta_files]
+
+    failures = []
+    sent_bytes = 0
+    if full_files:
+        items = [TransferItem(os.path.join(local_root, r), r, local[r]["size"]) for r in full_files]
+        result = transfer_items(username, host, port, items, remote_root, "upload", workers)
+        failures.extend(result['failures'])
+        sent_bytes += result['bytes']
+
+    for relative in delta_files:
+        local_path = os.path.join(local_root, relative)
+        compress = HOST_PROFILES.should_compress(username, host, port, sample_local_files([local_path]))
+        ok, sent, error = delta_upload(username, host, port, local_path, f"{remote_root.rstrip('/')}/{relative}",
+                                       compress=compress)
+        sent_bytes += sent
+        if ok:
+            print(f"{GREEN}✔{RESET} {relative} {GRAY}(delta: {format_size(sent)} of {format_size(local[relative]['size'])}){RESET}")
+        else:
+            failures.append(relative)
+            print(f"{RED}✘ {relative}: {error.strip()}{RESET}")
+
+    # Whatever arrived now matches the local entry; record it so the next run only stats
+    for relative in changed:
+        if relative not in failures:
+            remote[relative] = dict(local[relative])
+    save_manifest_cache(cache_path, local, remote)
+
+    seconds = time.monotonic() - started
+    print(f"{MAGENTA}📊 Sync sent {format_size(sent_bytes)} in {seconds:.2f}s "
+          f"({len(full_files)} full, {len(delta_files)} delta, {unchanged} unchanged){RESET}")
+
+    return {'scanned': len(local), 'sent': len(full_files), 'delta': len(delta_files), 'unchanged': unchanged,
+            'bytes': sent_bytes, 'seconds': seconds, 'failures': failures}
+
+GLOB_CHARS = "*?["
+
+class Transfer:
+    """Scriptable transfers to and from one SSH host
+
+    Each method runs without prompts and returns a result dict with at least
+    operation, ok, files, bytes, seconds and failures, plus whatever the
+    underlying engine reports (resumed_from/digest for chunked files,
+    unchanged/delta counts for sync). quiet=True swallows the progress
+    output so results can be consumed as data.
+    """
+
+    def __init__(self, username, host, port=22, workers=DEFAULT_WORKERS, quiet=False):
+        self.username = username
+        self.host = host
+        self.port = str(port)
+        self.workers = workers
+        self.quiet = quiet
+
+    def output(self):
+        return contextlib.redirect_stdout(io.StringIO()) if self.quiet else contextlib.nullcontext()
+
+    def download(self, remote_paths, local_path="."):
+        """Download one remote file (a str) or many files/globs/directories (a list) into local_path"""
+        local_path = expand_path(local_path)
+        with self.output():
+            if isinstance(remote_paths, str):
+                return self.download_single(remote_paths, local_path)
+            result = run_batch_transfer(self.username, self.host, self.port, list(remote_paths), local_path,
+                                        "download", workers=self.workers)
+        return batch_result("download", result)
+
+    def upload(self, local_paths, remote_path):
+        """Upload one local file (a str) or many files/globs/directories (a list) into remote_path"""
+        with self.output():
+            if isinstance(local_paths, str):
+                return self.upload_single(expand_path(local_paths), remote_path)
+            result = run_batch_transfer(self.username, self.host, self.port, list(local_paths), remote_path,
+                                        "upload", workers=self.workers)
+        return batch_result("upload", result)
+
+    def sync(self, local_root, remote_root, use_hash=False, delta=True):
+        """Upload only the new or changed files under local_root into remote_root"""
+        with self.output():
+            result = run_sync(self.username, self.host, self.port, local_root, remote_root,
+                              use_hash=use_hash, delta=delta, workers=self.workers)
+        files = result['sent'] + result['delta']
+        return dict(result, operation="sync", ok=not result['failures'] and result['scanned'] > 0, files=files)
+
+    def download_single(self, remote_path, local_path):
+        started = time.monotonic()
+        remote_file, remote_size = probe_remote_file(self.username, self.host, self.port, remote_path)
+        ratio = sample_remote_files(self.username, self.host, self.port, [remote_file or remote_path])
+        compress = HOST_PROFILES.should_compress(self.username, self.host, self.port, ratio)
+        describe_link(ratio, compress)
+
+        if remote_size >= RESUMABLE_THRESHOLD:
+            result = resumable_download(self.username, self.host, self.port, remote_path, local_path, compress=compress)
+            return self.single_result("download", result, remote_path, ratio, compress)
+
+        command = scp_command(self.username, self.host, self.port, compress) + [
+            "-p", f"{self.username}@{self.host}:{remote_path}", local_path]
+        ok = run_scp_command(command, max(remote_size, 0), os.path.basename(remote_path), "download") == 0
+        result = {'ok': ok, 'bytes': max(remote_size, 0) if ok else 0, 'seconds': time.monotonic() - started}
+        return self.single_result("download", result, remote_path, ratio, compress)
+
+    def upload_single(self, local_path, remote_path):
+        started = time.monotonic()
+        if not os.path.isfile(local_path):
+            print(f"{RED}❌ Local file '{local_path}' does not exist.{RESET}")
+            return {'operation': "upload", 'ok': False, 'files': 0, 'bytes': 0, 'seconds': 0.0, 'failures': [local_path]}
+
+        size = os.path.getsize(local_path)
+        ratio = sample_local_files([local_path])
+        compress = HOST_PROFILES.should_compress(self.username, self.host, self.port, ratio)
+        describe_link(ratio, compress)
+
+        if size >= RESUMABLE_THRESHOLD:
+            result = resumable_upload(self.username, self.host, self.port, local_path, remote_path, compress=compress)
+            return self.single_result("upload", result, local_path, ratio, compress)
+
+        command = scp_command(self.username, self.host, self.port, compress) + [
+            "-p", local_path, f"{self.username}@{self.host}:{remote_path}"]
+        ok = run_scp_command(command, size, os.path.basename(local_path), "upload") == 0
+        result = {'ok': ok, 'bytes': size if ok else 0, 'seconds': time.monotonic() - started}
+        return self.single_result("upload", result, local_path, ratio, compress)
+
+    def single_result(self, operation, result, path, ratio, compress):
+        """Shape a single-file result like the others and feed its throughput back into the host profile"""
+        ok = result['ok']
+        if ok:
+            HOST_PROFILES.record(self.username, self.host, self.port, ratio, compress, result['bytes'], result['seconds'])
+        return dict(result, operation=operation, files=1 if ok else 0, failures=[] if ok else [path], compressed=compress)
+
+def batch_result(operation, result):
+    return dict(result, operation=operation, ok=result['files'] > 0 and not result['failures'])
+
+def parse_remote(spec):
+    """Split [user@]host:path into (user, host, path); user defaults to the local login"""
+    location, separator, path = spec.partition(":")
+    if not separator or not location:
+        raise ValueError(f"expected [user@]host:path, got '{spec}'")
+    username, _, host = location.rpartition("@")
+    return username or getpass.getuser(), host, path or "."
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Transfer files over SSH. Run without arguments for the interactive menu.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-P", "--port", default="22", help="SSH port (default 22)")
+    common.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS, help="Parallel workers for batches")
+    common.add_argument("--json", action="store_true", help="Print the result as JSON instead of progress output")
+    common.add_argument("--metrics", metavar="FILE",
+                        help="Append JSON-lines progress metrics to FILE ('-' for stderr)")
+
+    download = subparsers.add_parser("download", parents=[common], help="Copy remote files to this machine")
+    download.add_argument("source", nargs="+", help="[user@]host:path; more paths on the same host may follow as plain paths")
+    download.add_argument("destination", help="Local file or directory")
+    download.add_argument("-r", "--batch", action="store_true",
+                          help="Treat a single source as a batch (directories, globs)")
+
+    upload = subparsers.add_parser("upload", parents=[common], help="Copy local files to the remote host")
+    upload.add_argument("source", nargs="+", help="Local files, globs or directories")
+    upload.add_argument("destination", help="[user@]host:path")
+    upload.add_argument("-r", "--batch", action="store_true",
+                        help="Treat a single source as a batch (directories, globs)")
+
+    sync = subparsers.add_parser("sync", parents=[common], help="Upload only new or changed files in a directory")
+    sync.add_argument("source", help="Local directory")
+    sync.add_argument("destination", help="[user@]host:directory")
+    sync.add_argument("--hash", action="store_true", help="Compare content when only the timestamp differs")
+    sync.add_argument("--no-delta", action="store_true", help="Resend changed large files whole")
+
+    return parser
+
+def is_batch(paths, force, local):
+    if force or len(paths) > 1 or any(c in paths[0] for c in GLOB_CHARS):
+        return True
+    return local and os.path.isdir(expand_path(paths[0]))
+
+def run_cli(argv):
+    """Run one non-interactive transfer; returns the process exit code"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.metrics:
+        set_metrics_stream(args.metrics)
+
+    try:
+        if args.command == "download":
+            username, host, first = parse_remote(args.source[0])
+            paths = [first] + args.source[1:]
+            transfer = Transfer(username, host, args.port, args.workers, quiet=args.json)
+            source = paths if is_batch(paths, args.batch, local=False) else paths[0]
+            result = transfer.download(source, args.destination)
+        elif args.command == "upload":
+            username, host, remote_path = parse_remote(args.destination)
+            transfer = Transfer(username, host, args.port, args.workers, quiet=args.json)
+            source = args.source if is_batch(args.source, args.batch, local=True) else args.source[0]
+            result = transfer.upload(source, remote_path)
+        else:
+            username, host, remote_path = parse_remote(args.destination)
+            transfer = Transfer(username, host, args.port, args.workers, quiet=args.json)
+            result = transfer.sync(args.source, remote_path, use_hash=args.hash, delta=not args.no_delta)
+    except ValueError as e:
+        parser.error(str(e))
+    except KeyboardInterrupt:
+        # The resumable and sync paths have already saved their state and said so
+        if args.json:
+            print(json.dumps({"ok": False, "error": "interrupted"}))
+        return 130
+
+    if args.json:
+        print(json.dumps(result))
+    return 0 if result['ok'] else 1
 
 def show_connection_info(username, host, port):
     """Display connection information in a formatted way"""
@@ -131,8 +1446,10 @@ def download_file():
         print(f"{YELLOW}📤 Download cancelled.{RESET}")
         return
 
-    scp_cmd = ["scp", "-P", port, f"{username}@{host}:{remote_path}", local_path]
-    run_scp_command(scp_cmd)
+    try:
+        Transfer(username, host, port).download(remote_path, local_path)
+    except KeyboardInterrupt:
+        pass
 
 def upload_file():
     print(f"\n{GREEN}{BOLD}📤 UPLOAD MODE{RESET}")
@@ -180,8 +1497,66 @@ def upload_file():
         print(f"{YELLOW}📤 Upload cancelled.{RESET}")
         return
 
-    scp_cmd = ["scp", "-P", port, local_path, f"{username}@{host}:{remote_path}"]
-    run_scp_command(scp_cmd)
+    try:
+        Transfer(username, host, port).upload(local_path, remote_path)
+    except KeyboardInterrupt:
+        pass
+
+def batch_transfer():
+    print(f"\n{GREEN}{BOLD}📦 BATCH MODE{RESET}")
+    print(f"{GRAY}Transfer many files, globs or directories in parallel{RESET}\n")
+
+    direction = get_input("Direction: (u)pload or (d)ownload", "u").lower()
+    direction = "download" if direction.startswith("d") else "upload"
+
+    username = get_input("SSH Username")
+    host = get_input("SSH Host (IP or domain)")
+    port = get_input("SSH Port", "22")
+
+    show_connection_info(username, host, port)
+
+    side = "Local" if direction == "upload" else "Remote"
+    print(f"{GRAY}Enter one {side.lower()} file, glob or directory per line; empty line to finish.{RESET}")
+    paths = []
+    while True:
+        path = input(f"{YELLOW}➤ {side} path {len(paths) + 1}: {WHITE}").strip()
+        if not path:
+            break
+        paths.append(path)
+
+    if not paths:
+        print(f"{YELLOW}📦 Nothing to transfer.{RESET}")
+        return
+
+    if direction == "upload":
+        target_dir = get_input("Remote destination directory")
+    else:
+        target_dir = expand_path(get_input("Local destination directory", "."))
+
+    workers = get_input("Parallel workers", str(DEFAULT_WORKERS))
+    workers = int(workers) if workers.isdigit() and int(workers) > 0 else DEFAULT_WORKERS
+
+    transfer = Transfer(username, host, port, workers=workers)
+    if direction == "upload":
+        transfer.upload(paths, target_dir)
+    else:
+        transfer.download(paths, target_dir)
+
+def sync_directory():
+    print(f"\n{GREEN}{BOLD}🔄 SYNC MODE{RESET}")
+    print(f"{GRAY}Upload only the files that are new or changed since the remote copy{RESET}\n")
+
+    username = get_input("SSH Username")
+    host = get_input("SSH Host (IP or domain)")
+    port = get_input("SSH Port", "22")
+
+    show_connection_info(username, host, port)
+
+    local_root = expand_path(get_input("Local directory"))
+    remote_root = get_input("Remote directory")
+    use_hash = get_input("Compare content when only the timestamp differs? (y/N)", "n", required=False).lower().startswith("y")
+
+    Transfer(username, host, port).sync(local_root, remote_root, use_hash=use_hash)
 
 def show_help():
     """Display help information"""
@@ -201,6 +1576,20 @@ def show_help():
   • Use SSH keys for passwordless authentication
   • Default SSH port is 22
 
+{WHITE}Large Files:{RESET}
+  • Files of 64 MB or more are sent in verified 8 MB chunks
+  • If such a transfer is interrupted, start it again to resume where it stopped
+
+{WHITE}Sync:{RESET}
+  • Only files whose size or modification time changed are sent
+  • Changed files of 16 MB or more only send the 8 MB chunks that differ
+  • File lists are cached in {GREEN}~/.cache/powerwsl/manifests{RESET}, so repeat syncs are fast
+
+{WHITE}Speed:{RESET}
+  • Compression is switched on only when a sample of the data compresses well
+  • Per-host throughput with and without it is kept in {GREEN}~/.cache/powerwsl/hosts.json{RESET}
+  • Fast AEAD ciphers are preferred; set {GREEN}POWERWSL_SSH_CIPHERS{RESET} to override
+
 {WHITE}File Paths:{RESET}
   • Use absolute paths when in doubt
   • For directories, ensure they exist on the destination
@@ -208,7 +1597,7 @@ def show_help():
 """)
     input(f"\n{YELLOW}Press Enter to continue...{RESET}")
 
-def main():
+def interactive_menu():
     try:
         clear_screen()
         print_ascii_banner()
@@ -217,8 +1606,10 @@ def main():
             print(f"\n{CYAN}{BOLD}🎯 Choose an option:{RESET}")
             print(f"{BLUE}  {BOLD}1.{RESET} {WHITE}📥 Download file from SSH server{RESET}")
             print(f"{BLUE}  {BOLD}2.{RESET} {WHITE}📤 Upload file to SSH server{RESET}")
-            print(f"{BLUE}  {BOLD}3.{RESET} {WHITE}📚 Show help & tips{RESET}")
-            print(f"{BLUE}  {BOLD}4.{RESET} {WHITE}❌ Exit{RESET}")
+            print(f"{BLUE}  {BOLD}3.{RESET} {WHITE}📦 Batch transfer (files, globs, directories){RESET}")
+            print(f"{BLUE}  {BOLD}4.{RESET} {WHITE}🔄 Sync directory (only changed files){RESET}")
+            print(f"{BLUE}  {BOLD}5.{RESET} {WHITE}📚 Show help & tips{RESET}")
+            print(f"{BLUE}  {BOLD}6.{RESET} {WHITE}❌ Exit{RESET}")
 
             choice = get_input("Your choice", "1", required=False)
 
@@ -227,15 +1618,19 @@ def main():
             elif choice == "2":
                 upload_file()
             elif choice == "3":
+                batch_transfer()
+            elif choice == "4":
+                sync_directory()
+            elif choice == "5":
                 show_help()
-            elif choice == "4" or choice.lower() in ['exit', 'quit', 'q']:
+            elif choice == "6" or choice.lower() in ['exit', 'quit', 'q']:
                 print(f"\n{GREEN}👋 Thanks for using SSH File Transfer Tool!{RESET}")
                 break
             else:
-                print(f"{RED}❌ Invalid choice. Please select 1-4.{RESET}")
+                print(f"{RED}❌ Invalid choice. Please select 1-6.{RESET}")
 
             # Ask if user wants to continue
-            if choice in ["1", "2"]:
+            if choice in ["1", "2", "3", "4"]:
                 print(f"\n{CYAN}Would you like to perform another transfer?{RESET}")
                 continue_choice = input(f"{YELLOW}Press Enter to continue or 'q' to quit: {RESET}").strip().lower()
                 if continue_choice == 'q':
@@ -248,5 +1643,10 @@ def main():
         print(f"\n\n{YELLOW}👋 Goodbye!{RESET}")
         sys.exit(0)
 
+def main():
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
+    interactive_menu()
+
 if __name__ == "__main__":
     main()
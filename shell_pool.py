@@ -0,0 +1,311 @@
+"""Pool of pre-started bash shells for run_via_subprocess
+
+`python3 run_via_subprocess.py --serve` (or `python3 shell_pool.py serve`)
+keeps a few bash processes running with the .env environment, DISPLAY and
+PYTHONUNBUFFERED already in place, and serves commands to them over the
+same socket protocol as gui_bridge.py. A command then costs a write to a
+warm shell rather than a Python start, a .env parse and a bash start.
+
+Each command runs in a subshell of a pooled shell, so cd, exports and
+`exit` cannot leak into the next command. Shells are replaced after
+max_uses commands, when they die, or after a signal was sent to them, and
+the environment is rebuilt only when .env's mtime changes.
+"""
+import os
+import sys
+import json
+import uuid
+import queue
+import shlex
+import signal
+import socket
+import argparse
+import threading
+import subprocess
+
+import gui_bridge
+
+try:
+    from dotenv import dotenv_values
+except ImportError:
+    dotenv_values = None
+
+DEFAULT_SIZE = 4
+DEFAULT_MAX_USES = 100
+
+def default_socket_path():
+    return os.environ.get("POWERWSL_SHELL_POOL_SOCKET") or os.path.join(gui_bridge.socket_dir(), "shells.sock")
+
+class PooledShell:
+    """One long-lived bash reading commands from its stdin"""
+
+    def __init__(self, env, generation):
+        self.generation = generation
+        self.uses = 0
+        self.tainted = False
+        self.signalled = None
+        self.process = subprocess.Popen(
+            ["bash", "--noprofile", "--norc"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            start_new_session=True
+        )
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def signal(self, signum):
+        """Signal the shell and whatever it is running; it won't be reused afterwards"""
+        self.tainted = True
+        self.signalled = signum
+        try:
+            os.killpg(self.process.pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def close(self):
+        if self.alive():
+            self.signal(signal.SIGKILL)
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            stream.close()
+
+    def run(self, cmd, cwd=None, env=None, on_output=None):
+        """Run cmd in a subshell, passing (stream name, bytes) to on_output; returns the exit code
+
+        The command writes into pipes made for it alone, opened by the shell
+        through /proc, so output from anything it leaves running in the
+        background can never turn up in a later command's stream. The shell's
+        own stdout only carries the exit code line. Returns None if the shell
+        died before the command finished.
+        """
+        token = f"__POWERWSL_{uuid.uuid4().hex}__"
+        prefix = "".join(f"export {name}={shlex.quote(value)}; " for name, value in (env or {}).items())
+        if cwd:
+            prefix += f"cd -- {shlex.quote(cwd)} && "
+
+        pipes = {"stdout": os.pipe(), "stderr": os.pipe()}
+        server = os.getpid()
+        # eval keeps a syntax error in cmd from breaking the pooled shell's own parser
+        script = (f"( {prefix}eval {shlex.quote(cmd)} ) </dev/null "
+                  f">/proc/{server}/fd/{pipes['stdout'][1]} 2>/proc/{server}/fd/{pipes['stderr'][1]}; "
+                  f"echo {token} $?\n")
+
+        def pump(fd, name):
+            with open(fd, "rb", buffering=0) as stream:
+                for chunk in iter(lambda: stream.read(65536), b""):
+                    if on_output:
+                        on_output(name, chunk)
+
+        pumps = [threading.Thread(target=pump, args=(read_fd, name), daemon=True) for name, (read_fd, _) in pipes.items()]
+        for thread in pumps:
+            thread.start()
+
+        returncode = None
+        try:
+            self.process.stdin.write(script.encode())
+            self.process.stdin.flush()
+            for line in self.process.stdout:
+                marker, _, code = line.decode(errors="replace").partition(" ")
+                if marker == token:
+                    returncode = int(code)
+                    break
+        except (OSError, ValueError):
+            pass
+        finally:
+            # Output ends once the command and anything it left running close the pipes
+            for _, write_fd in pipes.values():
+                os.close(write_fd)
+            for thread in pumps:
+                thread.join()
+
+        if returncode is not None:
+            self.uses += 1
+        return returncode
+
+class ShellPool:
+    """Idle shells ready to run commands, rebuilt when .env changes"""
+
+    def __init__(self, size=DEFAULT_SIZE, max_uses=DEFAULT_MAX_USES, env_file=".env", display=":0"):
+        self.size = size
+        self.max_uses = max_uses
+        self.env_file = os.path.abspath(env_file)
+        self.display = display
+        self.base_env = dict(os.environ)
+        self.env = None
+        self.env_mtime = None
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.idle = queue.Queue()
+
+        self.refresh_env()
+        for _ in range(size):
+            self.idle.put(self.spawn())
+
+    def refresh_env(self):
+        """Re-read .env only when its mtime differs from the snapshot the shells were started with"""
+        try:
+            mtime = os.stat(self.env_file).st_mtime
+        except OSError:
+            mtime = None
+
+        with self.lock:
+            if self.env is not None and mtime == self.env_mtime:
+                return
+            values = {}
+            if mtime is not None and dotenv_values is not None:
+                values = {name: value for name, value in dotenv_values(self.env_file).items() if value is not None}
+            self.env = {**self.base_env, **values, "DISPLAY": self.display, "PYTHONUNBUFFERED": "1"}
+            self.env_mtime = mtime
+            self.generation += 1
+
+    def spawn(self):
+        return PooledShell(self.env, self.generation)
+
+    def checkout(self):
+        """An idle shell started from the current environment
+
+        When every shell is busy (a long-running GUI app holds one until it
+        exits) an extra shell is started rather than making the command wait.
+        """
+        self.refresh_env()
+        try:
+            shell = self.idle.get_nowait()
+        except queue.Empty:
+            return self.spawn()
+        if not shell.alive() or shell.generation != self.generation:
+            shell.close()
+            shell = self.spawn()
+        return shell
+
+    def checkin(self, shell):
+        """Return a shell after use, replacing it if it is worn out, dead or was signalled"""
+        if self.idle.qsize() >= self.size:
+            # An extra shell from a busy moment; the pool is already full again
+            shell.close()
+            return
+        if shell.tainted or not shell.alive() or shell.uses >= self.max_uses or shell.generation != self.generation:
+            shell.close()
+            shell = self.spawn()
+        self.idle.put(shell)
+
+    def close(self):
+        while not self.idle.empty():
+            self.idle.get_nowait().close()
+
+class ShellPoolHandler(gui_bridge.BridgeHandler):
+    """gui_bridge's protocol, with commands run on pooled shells"""
+
+    pool = None
+
+    def handle(self):
+        request = self.read_request()
+        if request is None:
+            return
+        if request.get("ping"):
+            self.send({"pong": True, "pid": os.getpid()})
+            return
+        self.run_request(request)
+
+    def read_request(self):
+        try:
+            return json.loads(self.rfile.readline() or b"{}")
+        except ValueError as e:
+            self.send({"error": f"bad request: {e}"})
+            return None
+
+    def run_request(self, request):
+        """Run request["cmd"] on a pooled shell, streaming output and then the exit code"""
+        if not request.get("cmd"):
+            self.send({"error": "request has no cmd"})
+            return
+
+        self.shell = self.pool.checkout()
+        self.running = True
+        self.send({"pid": self.shell.process.pid})
+        threading.Thread(target=self.follow_client, args=(self.shell.process,), daemon=True).start()
+
+        def forward(name, data):
+            try:
+                self.send({"stream": name, "data": gui_bridge.encode_data(data)})
+            except OSError:
+                pass
+
+        returncode = self.shell.run(request["cmd"], request.get("cwd"), request.get("env"), forward)
+        self.running = False
+        if returncode is None:
+            self.shell.tainted = True
+            returncode = -(self.shell.signalled or signal.SIGKILL)
+
+        try:
+            self.send({"exit": returncode})
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        # Any replacement shell is started after the reply went out
+        self.pool.checkin(self.shell)
+
+    def signal_group(self, process, signum):
+        # The shell outlives the command: only act while the command is still running
+        if self.running:
+            self.shell.signal(signum)
+
+def serve(socket_path=None, size=DEFAULT_SIZE, max_uses=DEFAULT_MAX_USES, env_file=".env"):
+    """Run the pool server in the foreground until interrupted"""
+    socket_path = socket_path or default_socket_path()
+    if gui_bridge.ping(socket_path):
+        print(f"Error: a server is already listening on {socket_path}")
+        return 1
+    try:
+        gui_bridge.prepare_socket(socket_path)
+    except (gui_bridge.BridgeUnavailable, OSError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    pool = ShellPool(size, max_uses, env_file)
+    handler = type("BoundShellPoolHandler", (ShellPoolHandler,), {"pool": pool})
+    server = gui_bridge.BridgeServer(socket_path, handler)
+    os.chmod(socket_path, 0o600)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Shell pool listening on {socket_path}: {size} shells, recycled every {max_uses} commands, env from {pool.env_file}")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve commands from a pool of pre-started shells")
+    parser.add_argument("--socket", default=None, help="Socket path (default: $POWERWSL_SHELL_POOL_SOCKET or shells.sock in $XDG_RUNTIME_DIR/powerwsl or /tmp/powerwsl-<uid>)")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="Number of shells kept warm")
+    parser.add_argument("--max-uses", type=int, default=DEFAULT_MAX_USES, help="Commands per shell before it is replaced")
+    parser.add_argument("--env-file", default=".env", help="dotenv file applied to the shells, reloaded when it changes")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("serve", help="Start the pool server")
+    run_parser = subparsers.add_parser("run", help="Run a command on the pool")
+    run_parser.add_argument("--cwd", default=None, help="Working directory for the command")
+    run_parser.add_argument("cmd", nargs=argparse.REMAINDER, help="Command line")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        return serve(args.socket, max(args.size, 1), max(args.max_uses, 1), args.env_file)
+
+    cmd = " ".join(args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd)
+    try:
+        return gui_bridge.run_command(cmd, cwd=args.cwd, socket_path=args.socket or default_socket_path())
+    except gui_bridge.BridgeUnavailable as e:
+        print(f"Error: {e}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import io
+import os
+import sys
+import time
+import subprocess
+
+import pytest
+
+import gui_bridge
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture
+def agent(tmp_path):
+    """A gui_bridge agent started from / with its socket in a private directory"""
+    socket_path = str(tmp_path / "sockets" / "gui.sock")
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "gui_bridge.py"), "--socket", socket_path, "serve"],
+        cwd="/", stdout=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 10
+    while not gui_bridge.ping(socket_path):
+        assert process.poll() is None, "agent exited"
+        assert time.monotonic() < deadline, "agent did not start"
+        time.sleep(0.05)
+    yield socket_path
+    process.terminate()
+    process.wait()
+
+def run(socket_path, cmd, cwd=None):
+    stdout, stderr = io.BytesIO(), io.BytesIO()
+    returncode = gui_bridge.run_command(cmd, cwd=cwd, socket_path=socket_path, stdout=stdout, stderr=stderr)
+    return returncode, stdout.getvalue().decode(), stderr.getvalue().decode()
+
+def test_run_streams_output_and_exit_code(agent):
+    assert run(agent, "echo out; echo err >&2; exit 3") == (3, "out\n", "err\n")
+
+def test_relative_cwd_is_resolved_against_the_client(agent, tmp_path, monkeypatch):
+    client_dir = tmp_path / "clientdir"
+    (client_dir / "sub").mkdir(parents=True)
+    monkeypatch.chdir(client_dir)
+
+    assert run(agent, "pwd", cwd=".")[1] == f"{client_dir}\n"
+    assert run(agent, "pwd", cwd="sub")[1] == f"{client_dir / 'sub'}\n"
+
+def test_refuses_a_socket_directory_other_users_can_write(tmp_path):
+    directory = tmp_path / "shared"
+    directory.mkdir(mode=0o777)
+    os.chmod(directory, 0o777)
+    with pytest.raises(gui_bridge.UnsafeSocketDirectory):
+        gui_bridge.connect(str(directory / "gui.sock"))
@@ -0,0 +1,54 @@
+import os
+import json
+import asyncio
+
+import pytest
+
+from job_runner import Job, JobRunner, parse_jobs
+
+def jobs_from(*specs):
+    return parse_jobs(json.dumps(spec) for spec in specs)
+
+def run(jobs, log_dir, **options):
+    return asyncio.run(JobRunner(log_dir=str(log_dir), quiet=True, **options).run(jobs))
+
+def test_parses_tab_and_json_lines():
+    jobs = parse_jobs(["# comment", "", "/tmp\techo hi", '{"cwd": "/", "cmd": "ls", "name": "list", "timeout": 5}'])
+    assert [(job.cwd, job.cmd, job.name, job.timeout) for job in jobs] == [
+        ("/tmp", "echo hi", "01-echo", None),
+        ("/", "ls", "list", 5)
+    ]
+
+def test_relative_cwd_is_made_absolute(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert Job(1, None, "pwd").cwd == str(tmp_path)
+    assert Job(1, "sub", "pwd").cwd == str(tmp_path / "sub")
+
+def test_names_cannot_leave_the_log_directory():
+    assert jobs_from({"cmd": "true", "name": "../../etc/x"})[0].name == ".._.._etc_x"
+    with pytest.raises(ValueError, match="line 1: invalid job name"):
+        jobs_from({"cmd": "true", "name": ".."})
+
+def test_repeated_names_get_the_index(tmp_path):
+    jobs = run(jobs_from({"cmd": "echo a", "name": "dup"}, {"cmd": "echo b", "name": "dup"}), tmp_path)
+    assert [job.name for job in jobs] == ["dup", "02-dup"]
+    assert sorted(os.listdir(tmp_path)) == ["02-dup.log", "dup.log"]
+
+def test_unopenable_log_ends_as_error(tmp_path):
+    job = Job(1, None, "true", name="missing/dir")
+    run([job], tmp_path)
+    assert (job.status, job.log_path) == ("error", None)
+
+def test_status_exit_code_and_long_lines(tmp_path):
+    jobs = jobs_from(
+        {"cmd": "exit 0", "name": "ok"},
+        {"cmd": "exit 3", "name": "failed"},
+        {"cmd": "sleep 5", "name": "slow", "timeout": 0.2},
+        {"cmd": "head -c 200000 /dev/zero | tr '\\0' x; echo; printf tail", "name": "long"}
+    )
+    run(jobs, tmp_path)
+    assert [(job.status, job.returncode) for job in jobs][:3] == [("ok", 0), ("failed", 3), ("timeout", -9)]
+    assert jobs[3].status == "ok"
+    lines = open(jobs[3].log_path).read().splitlines()
+    assert lines[3].endswith(" out| " + "x" * 200000)
+    assert lines[4].endswith(" out| tail")
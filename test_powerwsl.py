@@ -0,0 +1,60 @@
+import io
+import os
+import sys
+import time
+import subprocess
+
+import pytest
+
+import gui_bridge
+import powerwsl
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture
+def daemon(tmp_path):
+    """A powerwsl daemon started from /, driving fake_powershell.py"""
+    socket_path = str(tmp_path / "sockets" / "powerwsl.sock")
+    env = dict(os.environ, FAKE_PS_STARTUP_MS="0", FAKE_PS_INTEROP_MS="0", FAKE_PS_ENUM_MS="0", FAKE_PS_ACTION_MS="0")
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "powerwsl.py"), "--socket", socket_path, "serve",
+         "--powershell", os.path.join(HERE, "fake_powershell.py"), "--size", "1"],
+        cwd="/", env=env, stdout=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 10
+    while not gui_bridge.ping(socket_path):
+        assert process.poll() is None, "daemon exited"
+        assert time.monotonic() < deadline, "daemon did not start"
+        time.sleep(0.05)
+    yield socket_path
+    process.terminate()
+    process.wait()
+
+def test_windows_and_errors_are_json_replies(daemon):
+    reply = powerwsl.request("windows.list", daemon)
+    assert reply["ok"] and len(reply["windows"]) == 30
+    assert powerwsl.request("nope", daemon)["ok"] is False
+
+def test_run_uses_the_client_directory(daemon, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stdout = io.BytesIO()
+    assert gui_bridge.run_command("pwd", cwd=".", socket_path=daemon, stdout=stdout, stderr=io.BytesIO()) == 0
+    assert stdout.getvalue().decode() == f"{tmp_path}\n"
+
+def test_transfer_start_rejects_a_relative_cwd(daemon):
+    reply = powerwsl.request("transfer.start", daemon, args=["upload", "f", "me@host:/tmp"], cwd="relative")
+    assert reply == {"ok": False, "error": "ValueError: transfer.start cwd must be an absolute path"}
+
+def test_transfer_runs_in_the_client_directory(tmp_path, monkeypatch):
+    script = tmp_path / "fake_transfer.py"
+    script.write_text("import os, json\nprint(json.dumps({'ok': True, 'cwd': os.getcwd()}))\n")
+    monkeypatch.setattr(powerwsl, "SCP_TRANSFER", str(script))
+    client_dir = tmp_path / "client"
+    client_dir.mkdir()
+
+    job = powerwsl.TransferJob("1", ["upload", "big.iso", "me@host:/data"], str(tmp_path), str(client_dir))
+    job.process.wait()
+    deadline = time.monotonic() + 5
+    while job.state == "running" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert (job.state, job.result["cwd"], job.status()["cwd"]) == ("ok", str(client_dir), str(client_dir))
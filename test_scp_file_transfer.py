@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+import scp_file_transfer
+
+@pytest.fixture
+def interrupted(monkeypatch):
+    def interrupt(self, *args, **kwargs):
+        raise KeyboardInterrupt
+    for operation in ("upload", "download", "sync"):
+        monkeypatch.setattr(scp_file_transfer.Transfer, operation, interrupt)
+
+@pytest.mark.parametrize("argv", [
+    ["upload", "big.iso", "me@host:/data"],
+    ["download", "me@host:/data/big.iso", "."],
+    ["sync", "project", "me@host:/data"]
+])
+def test_interrupt_exits_130_with_a_json_result(interrupted, capsys, argv):
+    assert scp_file_transfer.run_cli(argv + ["--json"]) == 130
+    assert json.loads(capsys.readouterr().out.splitlines()[-1]) == {"ok": False, "error": "interrupted"}
+
+def test_interrupt_without_json_prints_no_result(interrupted, capsys):
+    assert scp_file_transfer.run_cli(["upload", "big.iso", "me@host:/data"]) == 130
+    assert '"ok"' not in capsys.readouterr().out
@@ -0,0 +1,41 @@
+import io
+import os
+import sys
+import time
+import subprocess
+
+import pytest
+
+import gui_bridge
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture
+def pool(tmp_path):
+    """A shell pool server started from / with its socket in a private directory"""
+    socket_path = str(tmp_path / "sockets" / "shells.sock")
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "shell_pool.py"), "--socket", socket_path, "--size", "1", "serve"],
+        cwd="/", stdout=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 10
+    while not gui_bridge.ping(socket_path):
+        assert process.poll() is None, "pool exited"
+        assert time.monotonic() < deadline, "pool did not start"
+        time.sleep(0.05)
+    yield socket_path
+    process.terminate()
+    process.wait()
+
+def run(socket_path, cmd, cwd=None):
+    stdout = io.BytesIO()
+    returncode = gui_bridge.run_command(cmd, cwd=cwd, socket_path=socket_path, stdout=stdout, stderr=io.BytesIO())
+    return returncode, stdout.getvalue().decode()
+
+def test_relative_cwd_matches_the_subprocess_fallback(pool, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert run(pool, "pwd", cwd=".") == (0, f"{tmp_path}\n")
+
+def test_commands_do_not_leak_state_into_the_next_one(pool, tmp_path):
+    assert run(pool, "cd /tmp; export POOL_LEAK=1; exit 4") == (4, "")
+    assert run(pool, 'pwd; echo "${POOL_LEAK:-unset}"') == (0, "/\nunset\n")
@@ -0,0 +1,92 @@
+import os
+import json
+
+import pytest
+
+from window_manager import WindowController, PowerShellHost
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FAKE_POWERSHELL = os.path.join(HERE, "fake_powershell.py")
+
+@pytest.fixture(autouse=True)
+def instant_fake(monkeypatch):
+    """fake_powershell.py without its simulated startup, interop and Win32 delays"""
+    for name in ("FAKE_PS_STARTUP_MS", "FAKE_PS_INTEROP_MS", "FAKE_PS_ENUM_MS", "FAKE_PS_ACTION_MS"):
+        monkeypatch.setenv(name, "0")
+    monkeypatch.setenv("FAKE_PS_WINDOWS", "5")
+
+@pytest.fixture(params=[False, True], ids=["spawn", "persistent"])
+def controller(request):
+    with WindowController(persistent=request.param, powershell_path=FAKE_POWERSHELL) as controller:
+        yield controller
+
+def test_batch_actions_encode_every_target_form():
+    controller = WindowController(powershell_path=FAKE_POWERSHELL)
+    operations = [
+        ("minimize", 3),
+        ("restore", {"index": 4}),
+        ("maximize", {"handle": 65552}),
+        ("focus", {"pid": 4001}),
+        ("close", "5")
+    ]
+    assert controller.batch_actions(operations) == ["minimize:3", "restore:4", "maximize:h65552", "focus:p4001", "close:5"]
+
+def test_batch_actions_index_uses_the_cached_handle():
+    controller = WindowController(powershell_path=FAKE_POWERSHELL)
+    controller.snapshot = [{"index": 2, "handle": 65552}]
+    controller.snapshot_time = float("inf")
+    assert controller.batch_actions([("minimize", 2), ("minimize", {"index": 2})]) == ["minimize:h65552"] * 2
+
+@pytest.mark.parametrize("target", [{}, {"hnadle": 65552}, None])
+def test_batch_actions_reject_an_empty_target(target):
+    controller = WindowController(powershell_path=FAKE_POWERSHELL)
+    with pytest.raises(ValueError, match="has no index, handle or pid"):
+        controller.batch_actions([("minimize", target)])
+
+def test_serve_protocol_answers_each_request_by_id():
+    host = PowerShellHost(FAKE_POWERSHELL, "window_manager.ps1")
+    try:
+        first = host.request({"action": "list", "format": "json"})
+        second = host.request({"action": "minimize", "window_index": 2})
+    finally:
+        host.stop()
+    assert (first["id"], first["returncode"], len(json.loads(first["stdout"]))) == (1, 0, 5)
+    assert "total" in first["timings"]
+    assert (second["id"], second["stdout"]) == (2, "SUCCESS: Minimized 'Simulated window 2'\n")
+
+def test_serve_mode_restarts_a_dead_host():
+    host = PowerShellHost(FAKE_POWERSHELL, "window_manager.ps1")
+    try:
+        first_pid = json.loads(host.request({"action": "diag"})["stdout"])["ProcessId"]
+        host.process.kill()
+        host.process.wait()
+        response = host.request({"action": "diag"})
+    finally:
+        host.stop()
+    assert response["returncode"] == 0
+    assert json.loads(response["stdout"])["ProcessId"] != first_pid
+
+def test_list_decodes_json_and_fills_the_snapshot(controller):
+    windows = controller.list_windows(show=False)
+    assert [window["index"] for window in windows] == [1, 2, 3, 4, 5]
+    assert windows[0] == {"index": 1, "title": "Simulated window 1", "process": "app0",
+                          "state": "Normal", "pid": 4000, "handle": 65536}
+    assert controller.cached_windows() == windows
+
+def test_batch_decodes_results_in_order(controller):
+    results = controller.apply([("minimize", 1), ("maximize", {"handle": 65552}), ("restore", 9)], show=False)
+    assert [(r["action"], r["index"], r["success"]) for r in results] == [
+        ("minimize", 1, True), ("maximize", 2, True), ("restore", 0, False)
+    ]
+    assert results[2]["message"].startswith("ERROR: Window index 9 is out of range")
+
+def test_batch_drops_the_snapshot_when_a_window_is_gone(controller):
+    controller.list_windows(show=False)
+    results = controller.apply([("minimize", {"handle": 1})], show=False)
+    assert results[0]["message"].startswith("ERROR: Window gone")
+    assert controller.cached_windows() is None
+
+def test_timings_are_recorded_per_phase(controller):
+    controller.list_windows(show=False)
+    summary = controller.timing_summary()
+    assert {"round_trip", "enumerate", "powershell_total"} <= set(summary)
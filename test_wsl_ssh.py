@@ -0,0 +1,79 @@
+import pytest
+
+import wsl_ssh
+from execution import CommandResult
+
+OLD, NEW = "172.20.0.2", "172.20.0.9"
+
+@pytest.fixture
+def windows(tmp_path, monkeypatch):
+    """Stored state under tmp_path and an in-memory portproxy table behind netsh"""
+    for name, filename in (("IP_STORE", "ip"), ("PORTS_FILE", "ports"), ("MANAGED_PORTS_STORE", "managed")):
+        monkeypatch.setattr(wsl_ssh, name, str(tmp_path / filename))
+    state = {"rules": {}, "fail": False, "scripts": []}
+    monkeypatch.setattr(wsl_ssh, "show_portproxy", lambda: dict(state["rules"]))
+    monkeypatch.setattr(wsl_ssh, "powershell_argv", lambda script, powershell: script)
+    monkeypatch.setattr(wsl_ssh, "ensure_ssh", lambda ip: None)
+    monkeypatch.setattr(wsl_ssh, "get_current_wsl_ip", lambda: NEW)
+
+    def run_result(script, input=None):
+        state["scripts"].append(script)
+        if state["fail"]:
+            return CommandResult(script, 1, "The parameter is incorrect.", "", 0)
+        for command in script.split("; "):
+            if command.startswith("netsh interface portproxy"):
+                fields = dict(field.split("=") for field in command.split()[5:])
+                key = (fields["listenaddress"], int(fields["listenport"]))
+                if "delete" in command:
+                    state["rules"].pop(key, None)
+                else:
+                    state["rules"][key] = (fields["connectaddress"], int(fields["connectport"]))
+        return CommandResult(script, 0, "", "", 0)
+
+    monkeypatch.setattr(wsl_ssh, "run_result", run_result)
+    return state
+
+def test_plan_touches_only_what_differs_and_what_we_own():
+    current = {
+        ("0.0.0.0", 2222): (OLD, 2222),
+        ("0.0.0.0", 8080): (NEW, 8080),
+        ("0.0.0.0", 9000): (NEW, 9000),
+        ("127.0.0.1", 9000): (NEW, 9000),
+        ("0.0.0.0", 5000): (OLD, 5000)
+    }
+    desired = {("0.0.0.0", 2222): (NEW, 2222), ("0.0.0.0", 8080): (NEW, 8080)}
+    commands = wsl_ssh.plan_portproxy(current, desired, {2222, 9000}, [OLD])
+    assert commands == [
+        f"netsh interface portproxy set v4tov4 listenport=2222 listenaddress=0.0.0.0 connectport=2222 connectaddress={NEW}",
+        "netsh interface portproxy delete v4tov4 listenport=9000 listenaddress=0.0.0.0",
+        "netsh interface portproxy delete v4tov4 listenport=5000 listenaddress=0.0.0.0"
+    ]
+
+def test_apply_stops_at_the_first_failing_netsh_call(windows):
+    assert wsl_ssh.apply_portproxy(["netsh a", "netsh b"])
+    assert windows["scripts"] == ["netsh a; if ($LASTEXITCODE) { exit $LASTEXITCODE }; "
+                                  "netsh b; if ($LASTEXITCODE) { exit $LASTEXITCODE }"]
+    windows["fail"] = True
+    assert not wsl_ssh.apply_portproxy(["netsh a"])
+
+def test_failed_update_leaves_the_stored_ip_for_a_retry(windows):
+    wsl_ssh.save_ip(OLD)
+    windows["fail"] = True
+    assert wsl_ssh.update_portproxy() is False
+    assert (wsl_ssh.read_stored_ip(), wsl_ssh.read_managed_ports()) == (OLD, set())
+
+    windows["fail"] = False
+    assert wsl_ssh.update_portproxy() is True
+    assert (wsl_ssh.read_stored_ip(), wsl_ssh.read_managed_ports()) == (NEW, {2222})
+    assert windows["rules"] == {("0.0.0.0", 2222): (NEW, 2222)}
+
+def test_unchanged_ip_spawns_nothing_unless_repairing(windows, monkeypatch):
+    wsl_ssh.save_ip(NEW)
+    listed = []
+    monkeypatch.setattr(wsl_ssh, "show_portproxy", lambda: listed.append(True) or dict(windows["rules"]))
+    assert wsl_ssh.update_portproxy() is False
+    assert (listed, windows["scripts"]) == ([], [])
+
+    assert wsl_ssh.update_portproxy(repair=True) is True
+    assert len(listed) == 1
+    assert windows["rules"] == {("0.0.0.0", 2222): (NEW, 2222)}
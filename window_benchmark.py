@@ -0,0 +1,86 @@
+import sys
+import os
+import io
+import json
+import time
+import argparse
+import contextlib
+
+from window_manager import WindowController
+
+MODES = ("spawn", "persistent", "batched")
+
+def build_operations(count):
+    """Alternate minimize/restore over the first few window indexes"""
+    return [("minimize" if i % 2 == 0 else "restore", i % 5 + 1) for i in range(count)]
+
+def run_mode(mode, powershell_path, operations):
+    """Run the operations one way and return wall time plus per-phase stats"""
+    # cache_ttl=0 keeps every mode addressing windows by index, like a cold caller
+    wc = WindowController(persistent=(mode == "persistent"), powershell_path=powershell_path, cache_ttl=0)
+    failures = 0
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "batched":
+            failures = sum(1 for result in wc.apply(operations) if not result['success'])
+        else:
+            for action, index in operations:
+                if not wc.control_window(action, index):
+                    failures += 1
+    wall_ms = (time.perf_counter() - started) * 1000
+    wc.close()
+
+    return {
+        'mode': mode,
+        'operations': len(operations),
+        'failures': failures,
+        'wall_ms': round(wall_ms, 3),
+        'ms_per_operation': round(wall_ms / max(len(operations), 1), 3),
+        'phases': wc.timing_summary()
+    }
+
+def print_report(results):
+    print("{0:<12} {1:>6} {2:>12} {3:>10} {4:>9}".format("Mode", "Ops", "Wall ms", "ms/op", "Failures"))
+    print("-" * 53)
+    for result in results:
+        print("{0:<12} {1:>6} {2:>12.1f} {3:>10.1f} {4:>9}".format(
+            result['mode'], result['operations'], result['wall_ms'], result['ms_per_operation'], result['failures']))
+
+    for result in results:
+        print(f"\n{result['mode']} phases (ms):")
+        print("  {0:<18} {1:>6} {2:>10} {3:>10} {4:>10}".format("Phase", "Count", "p50", "p95", "Max"))
+        for phase, stats in sorted(result['phases'].items()):
+            print("  {0:<18} {1:>6} {2:>10.2f} {3:>10.2f} {4:>10.2f}".format(
+                phase, stats['count'], stats['p50'], stats['p95'], stats['max']))
+
+def main():
+    default_powershell = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_powershell.py")
+
+    parser = argparse.ArgumentParser(description="Compare spawn-per-call, persistent-host and batched window operations")
+    parser.add_argument("--powershell", default=default_powershell,
+                        help="powershell.exe to drive (defaults to the fake_powershell.py stand-in)")
+    parser.add_argument("--operations", type=int, default=20, help="Window operations per mode")
+    parser.add_argument("--modes", default=",".join(MODES), help="Comma-separated subset of: " + ", ".join(MODES))
+    parser.add_argument("--json", action="store_true", help="Print results as JSON for pipelines")
+    args = parser.parse_args()
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        print(f"Error: unknown mode(s): {', '.join(unknown)}")
+        sys.exit(2)
+
+    operations = build_operations(args.operations)
+    results = [run_mode(mode, args.powershell, operations) for mode in modes]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+    if any(result['failures'] for result in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import sys
+import os
+import re
+import json
+import heapq
+import argparse
+
+from window_manager import WindowController
+
+try:
+    import yaml
+    YAMLError = yaml.YAMLError
+except ImportError:
+    yaml = None
+    YAMLError = ValueError
+
+ACTIONS = ("minimize", "maximize", "restore", "show", "close", "focus", "toggle")
+
+def normalize_process(name):
+    """Compare process names case-insensitively and without a .exe suffix"""
+    name = (name or "").lower()
+    return name[:-4] if name.endswith(".exe") else name
+
+class Rule:
+    def __init__(self, order, action, process=None, title=None):
+        self.order = order
+        self.action = action
+        self.process = normalize_process(process) if process else None
+        self.title = re.compile(title, re.IGNORECASE) if title else None
+
+    def matches(self, window):
+        if self.process and normalize_process(window['process']) != self.process:
+            return False
+        if self.title and not self.title.search(window['title']):
+            return False
+        return True
+
+    def describe(self):
+        parts = []
+        if self.process:
+            parts.append(f"process={self.process}")
+        if self.title:
+            parts.append(f"title~{self.title.pattern}")
+        return " ".join(parts) + f" -> {self.action}"
+
+    def __lt__(self, other):
+        return self.order < other.order
+
+class LayoutProfile:
+    """A set of window rules compiled for fast matching
+
+    Rules that name a process are indexed by process name, so a window only
+    ever looks at the rules for its own process plus the title-only rules.
+    The first matching rule, in profile order, decides a window's action.
+    """
+
+    def __init__(self, rules):
+        self.rules = []
+        self.by_process = {}
+        self.title_only = []
+
+        if not isinstance(rules, list):
+            raise ValueError(f"'rules' must be a list of rules, got {type(rules).__name__}")
+
+        for order, spec in enumerate(rules):
+            if not isinstance(spec, dict):
+                raise ValueError(f"Rule {order + 1}: expected a mapping with 'action' and 'process'/'title', got {spec!r}")
+            for key in ('process', 'title'):
+                if spec.get(key) is not None and not isinstance(spec[key], str):
+                    raise ValueError(f"Rule {order + 1}: '{key}' must be a string, got {spec[key]!r}")
+            action = str(spec.get('action', '')).lower()
+            if action not in ACTIONS:
+                raise ValueError(f"Rule {order + 1}: unknown action '{spec.get('action')}'. Supported: {', '.join(ACTIONS)}")
+            if not spec.get('process') and not spec.get('title'):
+                raise ValueError(f"Rule {order + 1}: needs a 'process' and/or 'title' to match on")
+
+            try:
+                rule = Rule(order, action, spec.get('process'), spec.get('title'))
+            except re.error as e:
+                raise ValueError(f"Rule {order + 1}: invalid title pattern: {e}")
+
+            self.rules.append(rule)
+            if rule.process:
+                self.by_process.setdefault(rule.process, []).append(rule)
+            else:
+                self.title_only.append(rule)
+
+    @classmethod
+    def load(cls, path):
+        """Load a profile from a JSON or YAML file"""
+        with open(path, "r", encoding="utf-8") as f:
+            if path.endswith((".yml", ".yaml")):
+                if yaml is None:
+                    raise ValueError("YAML profiles need PyYAML (pip install pyyaml)")
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+
+        rules = data.get('rules', []) if isinstance(data, dict) else data
+        return cls(rules or [])
+
+    def match(self, window):
+        """Return the first rule that applies to the window, or None"""
+        candidates = heapq.merge(self.by_process.get(normalize_process(window['process']), []), self.title_only)
+        for rule in candidates:
+            if rule.matches(window):
+                return rule
+        return None
+
+    def plan(self, windows):
+        """Return [(window, rule), ...] for every window some rule applies to"""
+        planned = []
+        for window in windows:
+            rule = self.match(window)
+            if rule:
+                planned.append((window, rule))
+        return planned
+
+def print_plan(planned):
+    if not planned:
+        print("No windows matched the profile.")
+        return
+
+    print("{0:<10} {1:<12} {2:<20} {3:<40} {4}".format("Handle", "Action", "Process", "Title", "Rule"))
+    print("-" * 100)
+    for window, rule in planned:
+        title = window['title'] if len(window['title']) <= 37 else window['title'][:37] + "..."
+        print("{0:<10} {1:<12} {2:<20} {3:<40} {4}".format(window['handle'], rule.action, window['process'], title, rule.describe()))
+
+def apply_profile(wc, profile, dry_run=False):
+    """Match a profile against one window snapshot and apply it in one batch"""
+    windows = wc.list_windows(show=False)
+    planned = profile.plan(windows)
+
+    if dry_run:
+        print_plan(planned)
+        return []
+
+    operations = [(rule.action, {'handle': window['handle']}) for window, rule in planned]
+    return wc.apply(operations)
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a declarative window layout profile")
+    parser.add_argument("profile", help="JSON or YAML profile with a list of rules")
+    parser.add_argument("--dry-run", action="store_true", help="Print the planned actions without applying them")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.profile):
+        print(f"Error: profile not found at {args.profile}")
+        sys.exit(1)
+
+    try:
+        profile = LayoutProfile.load(args.profile)
+    except (ValueError, YAMLError, OSError) as e:
+        print(f"Error loading profile: {e}")
+        sys.exit(1)
+
+    results = apply_profile(WindowController(), profile, dry_run=args.dry_run)
+    if any(not result['success'] for result in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -3,16 +3,79 @@ param(
     [string]$Action,
 
     [Parameter(Mandatory=$false)]
-    [int]$WindowIndex
+    [int]$WindowIndex,
+
+    [Parameter(Mandatory=$false)]
+    [ValidateSet("text", "json")]
+    [string]$Format = "text",
+
+    [Parameter(Mandatory=$false)]
+    [string[]]$Actions,
+
+    [Parameter(Mandatory=$false)]
+    [long]$Handle,
+
+    [Parameter(Mandatory=$false)]
+    [int]$ProcessId,
+
+    [Parameter(Mandatory=$false)]
+    [int]$Iterations = 10,
+
+    [Parameter(Mandatory=$false)]
+    [int]$IntervalMs = 250,
+
+    [Parameter(Mandatory=$false)]
+    [switch]$Timings
 )
 
+# Per-phase timings (ms) for the current invocation or host request
+$script:ScriptStopwatch = [System.Diagnostics.Stopwatch]::StartNew()
+$script:PhaseTimings = [ordered]@{}
+
+function Add-PhaseTime {
+    param(
+        [string]$Phase,
+        [System.Diagnostics.Stopwatch]$Stopwatch
+    )
+
+    $elapsed = $Stopwatch.Elapsed.TotalMilliseconds
+    if ($script:PhaseTimings.Contains($Phase)) {
+        $script:PhaseTimings[$Phase] += $elapsed
+    } else {
+        $script:PhaseTimings[$Phase] = $elapsed
+    }
+}
+
+function Get-PhaseTimings {
+    param([System.Diagnostics.Stopwatch]$Total)
+
+    $result = [ordered]@{}
+    foreach ($phase in $script:PhaseTimings.Keys) {
+        $result[$phase] = [math]::Round($script:PhaseTimings[$phase], 3)
+    }
+    $result["total"] = [math]::Round($Total.Elapsed.TotalMilliseconds, 3)
+    return $result
+}
+
+# Window titles are arbitrary Unicode; emit UTF-8 regardless of the console code page
+[Console]::OutputEncoding = [System.Text.Encoding]::UTF8
+
 # Add necessary types for window management
-Add-Type @"
+$Win32Source = @"
     using System;
+    using System.Collections.Generic;
     using System.Runtime.InteropServices;
     using System.Text;
 
     public class Win32 {
+        public delegate bool EnumWindowsProc(IntPtr hWnd, IntPtr lParam);
+
+        [DllImport("user32.dll")]
+        public static extern bool EnumWindows(EnumWindowsProc lpEnumFunc, IntPtr lParam);
+
+        [DllImport("dwmapi.dll")]
+        public static extern int DwmGetWindowAttribute(IntPtr hWnd, int dwAttribute, out int pvAttribute, int cbAttribute);
+
         [DllImport("user32.dll")]
         public static extern bool ShowWindow(IntPtr hWnd, int nCmdShow);
 
@@ -22,6 +85,9 @@ Add-Type @"
         [DllImport("user32.dll")]
         public static extern bool IsWindowVisible(IntPtr hWnd);
 
+        [DllImport("user32.dll")]
+        public static extern bool IsWindow(IntPtr hWnd);
+
         [DllImport("user32.dll")]
         public static extern bool IsIconic(IntPtr hWnd);
 
@@ -81,9 +147,80 @@ Add-Type @"
         public static readonly IntPtr HWND_TOP = new IntPtr(0);
         public static readonly IntPtr HWND_TOPMOST = new IntPtr(-1);
         public static readonly IntPtr HWND_NOTOPMOST = new IntPtr(-2);
+        public const int DWMWA_CLOAKED = 14;
+
+        public static bool IsCloaked(IntPtr hWnd) {
+            int cloaked = 0;
+            try {
+                return DwmGetWindowAttribute(hWnd, DWMWA_CLOAKED, out cloaked, sizeof(int)) == 0 && cloaked != 0;
+            } catch (DllNotFoundException) {
+                return false;
+            }
+        }
+
+        // Every visible, titled, non-cloaked top-level window in Z-order.
+        // Runs entirely in native code so PowerShell never touches Process objects.
+        public static List<IntPtr> GetVisibleTopLevelWindows() {
+            List<IntPtr> handles = new List<IntPtr>();
+            EnumWindows(delegate (IntPtr hWnd, IntPtr lParam) {
+                if (IsWindowVisible(hWnd) && GetWindowTextLength(hWnd) > 0 && !IsCloaked(hWnd)) {
+                    handles.Add(hWnd);
+                }
+                return true;
+            }, IntPtr.Zero);
+            return handles;
+        }
     }
 "@
 
+function Import-Win32Interop {
+    # Compiling $Win32Source dominates cold start, so the compiled assembly is
+    # cached under %LOCALAPPDATA%\PowerWSL keyed by a hash of the source (and
+    # PowerShell edition). A source change produces a new key and a recompile.
+    $stopwatch = [System.Diagnostics.Stopwatch]::StartNew()
+    $source = "inline"
+    $assemblyPath = $null
+
+    try {
+        $sha = [System.Security.Cryptography.SHA256]::Create()
+        $bytes = [System.Text.Encoding]::UTF8.GetBytes($PSVersionTable.PSEdition + $Win32Source)
+        $hash = -join ($sha.ComputeHash($bytes)[0..7] | ForEach-Object { $_.ToString("x2") })
+        $cacheDir = Join-Path $env:LOCALAPPDATA "PowerWSL"
+        $assemblyPath = Join-Path $cacheDir "Win32Interop-$hash.dll"
+
+        if (Test-Path $assemblyPath) {
+            $source = "cache"
+        } else {
+            New-Item -ItemType Directory -Force -Path $cacheDir | Out-Null
+            Add-Type -TypeDefinition $Win32Source -OutputAssembly $assemblyPath -OutputType Library
+            $source = "compiled"
+        }
+
+        if (-not ("Win32" -as [type])) {
+            Add-Type -Path $assemblyPath
+        }
+    } catch {
+        # A truncated or locked cache file must not break every later run
+        if ($source -eq "cache" -and $assemblyPath) {
+            Remove-Item -Path $assemblyPath -Force -ErrorAction SilentlyContinue
+        }
+        if (-not ("Win32" -as [type])) {
+            Add-Type -TypeDefinition $Win32Source
+        }
+        $source = "inline"
+    }
+
+    $stopwatch.Stop()
+    Add-PhaseTime -Phase "interop" -Stopwatch $stopwatch
+    $script:InteropLoad = [ordered]@{
+        Source = $source
+        Milliseconds = [math]::Round($stopwatch.Elapsed.TotalMilliseconds, 2)
+        AssemblyPath = $assemblyPath
+    }
+}
+
+Import-Win32Interop
+
 function Get-WindowTitle {
     param([IntPtr]$hwnd)
 
@@ -111,6 +248,44 @@ function Get-WindowState {
 }
 
 function Get-ActiveWindows {
+    $stopwatch = [System.Diagnostics.Stopwatch]::StartNew()
+    $windows = New-Object System.Collections.Generic.List[object]
+    $processNames = @{}
+
+    foreach ($hwnd in [Win32]::GetVisibleTopLevelWindows()) {
+        $title = Get-WindowTitle -hwnd $hwnd
+        if (-not $title -or $title.Trim() -eq "") {
+            continue
+        }
+
+        $processId = 0
+        [Win32]::GetWindowThreadProcessId($hwnd, [ref]$processId) | Out-Null
+
+        # One process lookup per owning process, not per window
+        if (-not $processNames.ContainsKey($processId)) {
+            try {
+                $processNames[$processId] = [System.Diagnostics.Process]::GetProcessById($processId).ProcessName
+            } catch {
+                $processNames[$processId] = ""
+            }
+        }
+
+        $windows.Add([PSCustomObject]@{
+            Index = $windows.Count + 1
+            Title = $title
+            ProcessName = $processNames[$processId]
+            ProcessId = $processId
+            Handle = $hwnd
+            State = Get-WindowState -hwnd $hwnd
+        })
+    }
+
+    Add-PhaseTime -Phase "enumerate" -Stopwatch $stopwatch
+    return $windows
+}
+
+function Get-ActiveWindowsLegacy {
+    # Previous Get-Process based enumerator, kept only as the bench-enum baseline
     $windows = @()
     $processes = Get-Process | Where-Object { $_.MainWindowTitle -ne "" }
 
@@ -136,9 +311,33 @@ function Get-ActiveWindows {
     return $windows
 }
 
+function ConvertTo-WindowJson {
+    param($windows)
+
+    $records = foreach ($window in $windows) {
+        [ordered]@{
+            Index = $window.Index
+            Title = $window.Title
+            ProcessName = $window.ProcessName
+            ProcessId = $window.ProcessId
+            Handle = ([IntPtr]$window.Handle).ToInt64()
+            State = $window.State
+        }
+    }
+
+    return (ConvertTo-Json -InputObject @($records) -Compress)
+}
+
 function List-Windows {
+    param([string]$Format = "text")
+
     $windows = Get-ActiveWindows
 
+    if ($Format -eq "json") {
+        Write-Output (ConvertTo-WindowJson -windows $windows)
+        return
+    }
+
     if ($windows.Count -eq 0) {
         Write-Output "No active windows found."
         return
@@ -238,78 +437,85 @@ function Force-FocusWindow {
     }
 }
 
-function Control-Window {
+function New-ActionResult {
     param(
         [string]$Action,
-        [int]$WindowIndex
+        [int]$Index,
+        [long]$Handle,
+        [bool]$Success,
+        [string]$Message
     )
 
-    $windows = Get-ActiveWindows
-
-    if ($windows.Count -eq 0) {
-        Write-Output "ERROR: No active windows found."
-        return
+    return [PSCustomObject]@{
+        Action = $Action
+        Index = $Index
+        Handle = $Handle
+        Success = $Success
+        Message = $Message
     }
+}
 
-    # Find window by index
-    if ($WindowIndex -gt 0 -and $WindowIndex -le $windows.Count) {
-        $targetWindow = $windows[$WindowIndex - 1]
-    } else {
-        Write-Output "ERROR: Window index $WindowIndex is out of range (1-$($windows.Count))."
-        return
-    }
+function Invoke-WindowAction {
+    param(
+        [string]$Action,
+        $Window
+    )
 
-    $hwnd = $targetWindow.Handle
-    $title = $targetWindow.Title
+    $stopwatch = [System.Diagnostics.Stopwatch]::StartNew()
+    $hwnd = $Window.Handle
+    $title = $Window.Title
     $success = $false
+    $message = ""
 
     switch ($Action.ToLower()) {
         "minimize" {
             $success = [Win32]::ShowWindow($hwnd, [Win32]::SW_MINIMIZE)
             if ($success) {
-                Write-Output "SUCCESS: Minimized '$title'"
+                $message = "SUCCESS: Minimized '$title'"
             } else {
-                Write-Output "ERROR: Failed to minimize '$title'"
+                $message = "ERROR: Failed to minimize '$title'"
             }
         }
         "maximize" {
             $success = [Win32]::ShowWindow($hwnd, [Win32]::SW_SHOWMAXIMIZED)
             if ($success) {
-                Write-Output "SUCCESS: Maximized '$title'"
+                $message = "SUCCESS: Maximized '$title'"
             } else {
-                Write-Output "ERROR: Failed to maximize '$title'"
+                $message = "ERROR: Failed to maximize '$title'"
             }
         }
         "restore" {
             $success = [Win32]::ShowWindow($hwnd, [Win32]::SW_RESTORE)
             if ($success) {
-                Write-Output "SUCCESS: Restored '$title'"
+                $message = "SUCCESS: Restored '$title'"
             } else {
-                Write-Output "ERROR: Failed to restore '$title'"
+                $message = "ERROR: Failed to restore '$title'"
             }
         }
         "show" {
             $success = [Win32]::ShowWindow($hwnd, [Win32]::SW_SHOW)
             if ($success) {
-                Write-Output "SUCCESS: Showed '$title'"
+                $message = "SUCCESS: Showed '$title'"
             } else {
-                Write-Output "ERROR: Failed to show '$title'"
+                $message = "ERROR: Failed to show '$title'"
             }
         }
         "close" {
             $success = [Win32]::PostMessage($hwnd, [Win32]::WM_CLOSE, [IntPtr]::Zero, [IntPtr]::Zero)
             if ($success) {
-                Write-Output "SUCCESS: Sent close message to '$title'"
+                $message = "SUCCESS: Sent close message to '$title'"
             } else {
-                Write-Output "ERROR: Failed to close '$title'"
+                $message = "ERROR: Failed to close '$title'"
             }
         }
         "focus" {
-            $success = Force-FocusWindow -hwnd $hwnd
+            # Force-FocusWindow may emit DEBUG lines ahead of its result; keep only the result
+            $focused = @(Force-FocusWindow -hwnd $hwnd)
+            $success = [bool]$focused[-1]
             if ($success) {
-                Write-Output "SUCCESS: Focused '$title'"
+                $message = "SUCCESS: Focused '$title'"
             } else {
-                Write-Output "WARNING: Attempted to focus '$title' - it may be blinking in taskbar due to Windows focus restrictions"
+                $message = "WARNING: Attempted to focus '$title' - it may be blinking in taskbar due to Windows focus restrictions"
             }
         }
         "toggle" {
@@ -318,9 +524,9 @@ function Control-Window {
             if ($currentState -eq "Maximized") {
                 $success = [Win32]::ShowWindow($hwnd, [Win32]::SW_RESTORE)
                 if ($success) {
-                    Write-Output "SUCCESS: Restored '$title' (was maximized)"
+                    $message = "SUCCESS: Restored '$title' (was maximized)"
                 } else {
-                    Write-Output "ERROR: Failed to restore '$title'"
+                    $message = "ERROR: Failed to restore '$title'"
                 }
             } else {
                 # If minimized, restore first, then maximize
@@ -330,43 +536,426 @@ function Control-Window {
                 }
                 $success = [Win32]::ShowWindow($hwnd, [Win32]::SW_SHOWMAXIMIZED)
                 if ($success) {
-                    Write-Output "SUCCESS: Maximized '$title' (was $($currentState.ToLower()))"
+                    $message = "SUCCESS: Maximized '$title' (was $($currentState.ToLower()))"
                 } else {
-                    Write-Output "ERROR: Failed to maximize '$title'"
+                    $message = "ERROR: Failed to maximize '$title'"
+                }
+            }
+        }
+        default {
+            $message = "ERROR: Unknown action '$Action'. Supported actions: list, minimize, maximize, restore, show, close, focus, toggle"
+        }
+    }
+
+    Add-PhaseTime -Phase "action" -Stopwatch $stopwatch
+    return New-ActionResult -Action $Action -Index $Window.Index -Handle ([IntPtr]$hwnd).ToInt64() -Success $success -Message $message
+}
+
+function Resolve-WindowByIndex {
+    param(
+        $windows,
+        [int]$WindowIndex
+    )
+
+    if ($windows.Count -eq 0) {
+        return "ERROR: No active windows found."
+    }
+    if ($WindowIndex -gt 0 -and $WindowIndex -le $windows.Count) {
+        return $windows[$WindowIndex - 1]
+    }
+    return "ERROR: Window index $WindowIndex is out of range (1-$($windows.Count))."
+}
+
+function Resolve-WindowByHandle {
+    param([long]$Handle)
+
+    # Addressed directly by HWND: no enumeration, just check the window still exists
+    $hwnd = [IntPtr]$Handle
+    if ($Handle -eq 0 -or -not [Win32]::IsWindow($hwnd)) {
+        return "ERROR: Window gone (handle $Handle no longer exists)."
+    }
+
+    $processId = 0
+    [Win32]::GetWindowThreadProcessId($hwnd, [ref]$processId) | Out-Null
+
+    return [PSCustomObject]@{
+        Index = 0
+        Title = Get-WindowTitle -hwnd $hwnd
+        ProcessName = ""
+        ProcessId = $processId
+        Handle = $hwnd
+        State = Get-WindowState -hwnd $hwnd
+    }
+}
+
+function Resolve-WindowByProcessId {
+    param([int]$ProcessId)
+
+    $process = Get-Process -Id $ProcessId -ErrorAction SilentlyContinue
+    if (-not $process -or $process.MainWindowHandle -eq [IntPtr]::Zero) {
+        return "ERROR: Window gone (process $ProcessId has no main window)."
+    }
+
+    return Resolve-WindowByHandle -Handle $process.MainWindowHandle.ToInt64()
+}
+
+function Control-Window {
+    param(
+        [string]$Action,
+        [int]$WindowIndex,
+        [long]$Handle,
+        [int]$ProcessId
+    )
+
+    if ($Handle) {
+        $targetWindow = Resolve-WindowByHandle -Handle $Handle
+    } elseif ($ProcessId) {
+        $targetWindow = Resolve-WindowByProcessId -ProcessId $ProcessId
+    } else {
+        $windows = @(Get-ActiveWindows)
+        $targetWindow = Resolve-WindowByIndex -windows $windows -WindowIndex $WindowIndex
+    }
+    if ($targetWindow -is [string]) {
+        Write-Output $targetWindow
+        return
+    }
+
+    $result = Invoke-WindowAction -Action $Action -Window $targetWindow
+    Write-Output $result.Message
+}
+
+function Invoke-Batch {
+    param(
+        [string[]]$Actions,
+        [string]$Format = "text"
+    )
+
+    # Entries are <action>:<index>, <action>:h<handle> or <action>:p<pid>.
+    # Indexes share one enumeration, taken only if some entry needs it.
+    $windows = $null
+    $specs = @($Actions | ForEach-Object { $_ -split "," } | ForEach-Object { $_.Trim() } | Where-Object { $_ -ne "" })
+
+    $results = foreach ($spec in $specs) {
+        $parts = $spec -split ":", 2
+        $target = if ($parts.Count -eq 2) { $parts[1] } else { "" }
+        $index = 0
+        [long]$number = 0
+
+        if ($target -match "^[hH](\d+)$" -and [long]::TryParse($Matches[1], [ref]$number)) {
+            $targetWindow = Resolve-WindowByHandle -Handle $number
+        } elseif ($target -match "^[pP](\d+)$" -and [long]::TryParse($Matches[1], [ref]$number)) {
+            $targetWindow = Resolve-WindowByProcessId -ProcessId $number
+        } elseif ([int]::TryParse($target, [ref]$index)) {
+            if ($null -eq $windows) {
+                $windows = @(Get-ActiveWindows)
+            }
+            $targetWindow = Resolve-WindowByIndex -windows $windows -WindowIndex $index
+        } else {
+            New-ActionResult -Action $parts[0] -Index 0 -Success $false -Message "ERROR: Invalid batch entry '$spec'. Use <action>:<index>, <action>:h<handle> or <action>:p<pid>"
+            continue
+        }
+
+        if ($targetWindow -is [string]) {
+            New-ActionResult -Action $parts[0] -Index $index -Success $false -Message $targetWindow
+            continue
+        }
+
+        Invoke-WindowAction -Action $parts[0] -Window $targetWindow
+    }
+
+    if ($Format -eq "json") {
+        Write-Output (ConvertTo-Json -InputObject @($results) -Compress)
+        return
+    }
+
+    foreach ($result in $results) {
+        Write-Output $result.Message
+    }
+}
+
+function Write-WatchEvent {
+    param(
+        [string]$Kind,
+        [long]$Handle,
+        $Window,
+        $Previous
+    )
+
+    $record = [ordered]@{
+        Event = $Kind
+        Handle = $Handle
+        Title = $Window.Title
+        ProcessName = $Window.ProcessName
+        ProcessId = $Window.ProcessId
+        State = $Window.State
+    }
+    if ($Previous) {
+        $record.PreviousTitle = $Previous.Title
+        $record.PreviousState = $Previous.State
+    }
+
+    [Console]::Out.WriteLine((ConvertTo-Json -InputObject $record -Compress))
+}
+
+function Watch-Windows {
+    param([int]$IntervalMs = 250)
+
+    # One long-lived process diffing cheap snapshots: each tick only reads
+    # handles, titles and states; process names are resolved once per new pid.
+    # Events are JSON lines: created, destroyed, state-changed, title-changed,
+    # plus a single "ready" once the initial windows have been reported.
+    $previous = @{}
+    $processNames = @{}
+    $ready = $false
+
+    while ($true) {
+        $current = @{}
+        foreach ($hwnd in [Win32]::GetVisibleTopLevelWindows()) {
+            $key = $hwnd.ToInt64()
+            $title = Get-WindowTitle -hwnd $hwnd
+            $state = Get-WindowState -hwnd $hwnd
+
+            if ($previous.ContainsKey($key)) {
+                $known = $previous[$key]
+                $current[$key] = [PSCustomObject]@{
+                    Title = $title
+                    ProcessName = $known.ProcessName
+                    ProcessId = $known.ProcessId
+                    State = $state
+                }
+                continue
+            }
+
+            $processId = 0
+            [Win32]::GetWindowThreadProcessId($hwnd, [ref]$processId) | Out-Null
+            if (-not $processNames.ContainsKey($processId)) {
+                try {
+                    $processNames[$processId] = [System.Diagnostics.Process]::GetProcessById($processId).ProcessName
+                } catch {
+                    $processNames[$processId] = ""
                 }
             }
+
+            $current[$key] = [PSCustomObject]@{
+                Title = $title
+                ProcessName = $processNames[$processId]
+                ProcessId = $processId
+                State = $state
+            }
+        }
+
+        foreach ($key in $current.Keys) {
+            $window = $current[$key]
+            if (-not $previous.ContainsKey($key)) {
+                Write-WatchEvent -Kind "created" -Handle $key -Window $window
+                continue
+            }
+
+            $old = $previous[$key]
+            if ($old.State -ne $window.State) {
+                Write-WatchEvent -Kind "state-changed" -Handle $key -Window $window -Previous $old
+            }
+            if ($old.Title -ne $window.Title) {
+                Write-WatchEvent -Kind "title-changed" -Handle $key -Window $window -Previous $old
+            }
+        }
+
+        foreach ($key in $previous.Keys) {
+            if (-not $current.ContainsKey($key)) {
+                Write-WatchEvent -Kind "destroyed" -Handle $key -Window $previous[$key]
+            }
+        }
+
+        if (-not $ready) {
+            [Console]::Out.WriteLine('{"Event":"ready"}')
+            $ready = $true
+        }
+        [Console]::Out.Flush()
+
+        $previous = $current
+        Start-Sleep -Milliseconds $IntervalMs
+    }
+}
+
+function Get-Diagnostics {
+    $diagnostics = [ordered]@{
+        InteropSource = $script:InteropLoad.Source
+        InteropMs = $script:InteropLoad.Milliseconds
+        AssemblyPath = $script:InteropLoad.AssemblyPath
+        PSVersion = $PSVersionTable.PSVersion.ToString()
+        ProcessId = $PID
+    }
+    return (ConvertTo-Json -InputObject $diagnostics -Compress)
+}
+
+function Measure-Enumeration {
+    param(
+        [int]$Iterations = 10,
+        [string]$Format = "text"
+    )
+
+    $results = foreach ($enumerator in @("Get-ActiveWindows", "Get-ActiveWindowsLegacy")) {
+        & $enumerator | Out-Null  # warm-up
+        $count = 0
+        $stopwatch = [System.Diagnostics.Stopwatch]::StartNew()
+        for ($i = 0; $i -lt $Iterations; $i++) {
+            $count = @(& $enumerator).Count
+        }
+        $stopwatch.Stop()
+
+        [PSCustomObject]@{
+            Enumerator = $enumerator
+            Windows = $count
+            Iterations = $Iterations
+            MeanMs = [math]::Round($stopwatch.Elapsed.TotalMilliseconds / [math]::Max($Iterations, 1), 2)
+        }
+    }
+
+    if ($Format -eq "json") {
+        Write-Output (ConvertTo-Json -InputObject @($results) -Compress)
+        return
+    }
+
+    foreach ($result in $results) {
+        Write-Output ("{0,-26} {1,6} windows {2,10} ms/enumeration" -f $result.Enumerator, $result.Windows, $result.MeanMs)
+    }
+}
+
+function Invoke-Action {
+    param(
+        [string]$Action,
+        [int]$WindowIndex,
+        [string]$Format = "text",
+        [string[]]$Actions,
+        [long]$Handle,
+        [int]$ProcessId,
+        [int]$Iterations = 10,
+        [int]$IntervalMs = 250
+    )
+
+    switch ($Action.ToLower()) {
+        "list" {
+            List-Windows -Format $Format
+        }
+        { $_ -in @("minimize", "maximize", "restore", "show", "close", "focus", "toggle") } {
+            Control-Window -Action $Action -WindowIndex $WindowIndex -Handle $Handle -ProcessId $ProcessId
+        }
+        "batch" {
+            Invoke-Batch -Actions $Actions -Format $Format
+        }
+        "bench-enum" {
+            Measure-Enumeration -Iterations $Iterations -Format $Format
+        }
+        "diag" {
+            Get-Diagnostics
+        }
+        "watch" {
+            Watch-Windows -IntervalMs $IntervalMs
         }
         default {
-            Write-Output "ERROR: Unknown action '$Action'. Supported actions: list, minimize, maximize, restore, show, close, focus, toggle"
+            Write-Output "ERROR: Unknown action '$Action'"
+            Write-Output ""
+            Write-Output "Supported actions:"
+            Write-Output "  list                           - List all active windows"
+            Write-Output "  list -Format json              - List all active windows as JSON"
+            Write-Output "  minimize -WindowIndex <number> - Minimize window by index"
+            Write-Output "  maximize -WindowIndex <number> - Maximize window by index"
+            Write-Output "  restore -WindowIndex <number>  - Restore window by index"
+            Write-Output "  show -WindowIndex <number>     - Show window by index"
+            Write-Output "  close -WindowIndex <number>    - Close window by index"
+            Write-Output "  focus -WindowIndex <number>    - Focus window by index"
+            Write-Output "  toggle -WindowIndex <number>   - Toggle maximize/restore window by index"
+            Write-Output "  batch -Actions <action:index,...> - Run several actions against one window snapshot"
+            Write-Output "  <action> -Handle <hwnd>        - Act on a window by handle, without enumerating"
+            Write-Output "  <action> -ProcessId <pid>      - Act on the main window of a process"
+            Write-Output "  bench-enum -Iterations <n>     - Time EnumWindows enumeration against the Get-Process one"
+            Write-Output "  diag                           - Report how the Win32 interop type was loaded (JSON)"
+            Write-Output "  watch -IntervalMs <ms>         - Stream window created/destroyed/changed events as JSON lines"
+            Write-Output "  serve                          - Read JSON requests from stdin, one per line"
+            Write-Output ""
+            Write-Output "Add -Timings to any one-shot action to append a __TIMINGS__ line with per-phase milliseconds."
+            Write-Output ""
+            Write-Output "Examples:"
+            Write-Output "  powershell.exe -File window_manager.ps1 -Action list"
+            Write-Output "  powershell.exe -File window_manager.ps1 -Action list -Format json"
+            Write-Output "  powershell.exe -File window_manager.ps1 -Action minimize -WindowIndex 1"
+            Write-Output "  powershell.exe -File window_manager.ps1 -Action maximize -WindowIndex 2"
+            Write-Output "  powershell.exe -File window_manager.ps1 -Action toggle -WindowIndex 1"
+            Write-Output "  powershell.exe -File window_manager.ps1 -Action batch -Actions minimize:3,focus:7"
+            Write-Output "  powershell.exe -File window_manager.ps1 -Action focus -Handle 133956"
         }
     }
 }
 
+function Start-Server {
+    # Persistent host mode: the Win32 type above is compiled once and every
+    # request reuses it. Protocol (one JSON object per line):
+    #   request:  {"id": 1, "action": "minimize", "window_index": 3, "format": "text"}
+    #             {"id": 2, "action": "batch", "actions": ["minimize:3", "focus:h133956"], "format": "json"}
+    #             {"id": 3, "action": "close", "handle": 133956, "pid": null}
+    #   response: {"id": 1, "stdout": "...", "stderr": "", "returncode": 0, "timings": {...}}
+    # Timings cover one request; "interop" only appears on the first one.
+    # The loop ends when stdin is closed.
+    [Console]::InputEncoding = [System.Text.Encoding]::UTF8
+
+    while ($true) {
+        $line = [Console]::In.ReadLine()
+        if ($line -eq $null) {
+            break
+        }
+        if ($line.Trim() -eq "") {
+            continue
+        }
+
+        $requestStopwatch = [System.Diagnostics.Stopwatch]::StartNew()
+        $response = [ordered]@{ id = $null; stdout = ""; stderr = ""; returncode = 0; timings = $null }
+        try {
+            $request = $line | ConvertFrom-Json
+            $response.id = $request.id
+            if ($request.action -eq "watch") {
+                throw "watch streams forever; run it in its own process"
+            }
+            $index = 0
+            if ($request.window_index) {
+                $index = [int]$request.window_index
+            }
+            $format = "text"
+            if ($request.format) {
+                $format = [string]$request.format
+            }
+            $handle = 0
+            if ($request.handle) {
+                $handle = [long]$request.handle
+            }
+            $processId = 0
+            if ($request.pid) {
+                $processId = [int]$request.pid
+            }
+            $iterations = 10
+            if ($request.iterations) {
+                $iterations = [int]$request.iterations
+            }
+            $response.stdout = (Invoke-Action -Action $request.action -WindowIndex $index -Format $format -Actions @($request.actions) -Handle $handle -ProcessId $processId -Iterations $iterations | Out-String)
+        } catch {
+            $response.stderr = $_.Exception.Message
+            $response.returncode = 1
+        }
+
+        $response.timings = Get-PhaseTimings -Total $requestStopwatch
+        $script:PhaseTimings = [ordered]@{}
+
+        [Console]::Out.WriteLine(($response | ConvertTo-Json -Compress))
+        [Console]::Out.Flush()
+    }
+}
+
 # Main execution logic
-switch ($Action.ToLower()) {
-    "list" {
-        List-Windows
-    }
-    { $_ -in @("minimize", "maximize", "restore", "show", "close", "focus", "toggle") } {
-        Control-Window -Action $Action -WindowIndex $WindowIndex
-    }
-    default {
-        Write-Output "ERROR: Unknown action '$Action'"
-        Write-Output ""
-        Write-Output "Supported actions:"
-        Write-Output "  list                           - List all active windows"
-        Write-Output "  minimize -WindowIndex <number> - Minimize window by index"
-        Write-Output "  maximize -WindowIndex <number> - Maximize window by index"
-        Write-Output "  restore -WindowIndex <number>  - Restore window by index"
-        Write-Output "  show -WindowIndex <number>     - Show window by index"
-        Write-Output "  close -WindowIndex <number>    - Close window by index"
-        Write-Output "  focus -WindowIndex <number>    - Focus window by index"
-        Write-Output "  toggle -WindowIndex <number>   - Toggle maximize/restore window by index"
-        Write-Output ""
-        Write-Output "Examples:"
-        Write-Output "  powershell.exe -File window_manager.ps1 -Action list"
-        Write-Output "  powershell.exe -File window_manager.ps1 -Action minimize -WindowIndex 1"
-        Write-Output "  powershell.exe -File window_manager.ps1 -Action maximize -WindowIndex 2"
-        Write-Output "  powershell.exe -File window_manager.ps1 -Action toggle -WindowIndex 1"
+if ($Action.ToLower() -eq "serve") {
+    Start-Server
+} else {
+    Invoke-Action -Action $Action -WindowIndex $WindowIndex -Format $Format -Actions $Actions -Handle $Handle -ProcessId $ProcessId -Iterations $Iterations -IntervalMs $IntervalMs
+    if ($Timings) {
+        # Last line of output; WindowController strips it before parsing
+        Write-Output ("__TIMINGS__ " + (ConvertTo-Json -InputObject (Get-PhaseTimings -Total $script:ScriptStopwatch) -Compress))
     }
 }
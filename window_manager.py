@@ -1,12 +1,205 @@
 import subprocess
 import sys
 import os
-import re
+import json
+import math
+import queue
+import threading
+import time
+import asyncio
+import signal
+from collections import deque
+
+class PowerShellHost:
+    """Long-lived window_manager.ps1 process fed line-delimited JSON requests"""
+
+    def __init__(self, powershell_path, ps_script, timeout=30):
+        self.powershell_path = powershell_path
+        self.ps_script = ps_script
+        self.timeout = timeout
+        self.process = None
+        self.lines = None
+        self.stderr_tail = deque(maxlen=20)
+        self.request_id = 0
+        self.lock = threading.Lock()
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """Start the PowerShell process in serve mode"""
+        cmd = [
+            self.powershell_path,
+            "-NoProfile",
+            "-ExecutionPolicy", "Bypass",
+            "-File", self.ps_script,
+            "-Action", "serve"
+        ]
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1
+        )
+        self.lines = queue.Queue()
+        self.stderr_tail.clear()
+        threading.Thread(target=self._pump_stdout, args=(self.process, self.lines), daemon=True).start()
+        threading.Thread(target=self._pump_stderr, args=(self.process,), daemon=True).start()
+
+    def _pump_stdout(self, process, lines):
+        for line in process.stdout:
+            lines.put(line)
+        lines.put(None)
+
+    def _pump_stderr(self, process):
+        for line in process.stderr:
+            self.stderr_tail.append(line.rstrip())
+
+    def stop(self):
+        """Close stdin and wait for the host to exit, killing it if needed"""
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+            process.wait(timeout=2)
+        except Exception:
+            process.kill()
+            process.wait()
+
+    def _error(self, message):
+        details = "\n".join(self.stderr_tail)
+        if details:
+            message = f"{message}\n{details}"
+        return {"stdout": "", "stderr": message, "returncode": 1}
+
+    def request(self, payload):
+        """Send one request and wait for its response, restarting the host if it died"""
+        with self.lock:
+            # A request is only retried when it could not be delivered at all;
+            # once the host has read it we must not replay it (close, toggle).
+            for _ in range(2):
+                if not self.is_alive():
+                    try:
+                        self.start()
+                    except OSError as e:
+                        return self._error(f"Failed to start PowerShell host: {e}")
+
+                self.request_id += 1
+                message = dict(payload, id=self.request_id)
+                try:
+                    self.process.stdin.write(json.dumps(message) + "\n")
+                    self.process.stdin.flush()
+                except (BrokenPipeError, OSError):
+                    self.stop()
+                    continue
+
+                return self._read_response(self.request_id)
+
+            return self._error("PowerShell host is not accepting requests")
+
+    def _read_response(self, request_id):
+        while True:
+            try:
+                line = self.lines.get(timeout=self.timeout)
+            except queue.Empty:
+                self.stop()
+                return self._error(f"PowerShell host timed out after {self.timeout}s")
+
+            if line is None:
+                self.stop()
+                return self._error("PowerShell host exited unexpectedly")
+
+            try:
+                response = json.loads(line)
+            except ValueError:
+                # Stray output that escaped the request capture
+                continue
+
+            if response.get("id") == request_id:
+                return response
+
+# Prefix window_manager.ps1 uses when a handle or pid no longer has a window
+WINDOW_GONE = "ERROR: Window gone"
+
+# Marker of the per-phase timing line appended by window_manager.ps1 -Timings
+TIMINGS_MARKER = "__TIMINGS__ "
+
+class LatencyStats:
+    """Rolling per-phase latency samples (ms) with p50/p95 summaries"""
+
+    def __init__(self, max_samples=1000):
+        self.max_samples = max_samples
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def record(self, phase, milliseconds):
+        with self.lock:
+            self.samples.setdefault(phase, deque(maxlen=self.max_samples)).append(milliseconds)
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+
+    @staticmethod
+    def percentile(ordered, fraction):
+        # Nearest-rank percentile on an already sorted list
+        rank = max(1, math.ceil(fraction * len(ordered)))
+        return ordered[rank - 1]
+
+    def summary(self):
+        """Return {phase: {count, mean, p50, p95, max}} over the kept samples"""
+        with self.lock:
+            snapshot = {phase: sorted(values) for phase, values in self.samples.items() if values}
+
+        return {
+            phase: {
+                'count': len(values),
+                'mean': round(sum(values) / len(values), 3),
+                'p50': round(self.percentile(values, 0.50), 3),
+                'p95': round(self.percentile(values, 0.95), 3),
+                'max': round(values[-1], 3)
+            }
+            for phase, values in snapshot.items()
+        }
+
+def format_windows_table(windows):
+    """Render decoded windows the way List-Windows prints its text table"""
+    if not windows:
+        return "No active windows found."
+
+    lines = [
+        "=" * 100,
+        "Active Windows List",
+        "=" * 100,
+        "{0:<3} {1:<50} {2:<20} {3:<12}".format("#", "Title", "Process", "State"),
+        "-" * 100
+    ]
+    for window in windows:
+        title = window['title'] if len(window['title']) <= 47 else window['title'][:47] + "..."
+        process = window['process'] if len(window['process']) <= 17 else window['process'][:17] + "..."
+        lines.append("{0:<3} {1:<50} {2:<20} {3:<12}".format(window['index'], title, process, window['state']))
+
+    return "\n".join(lines)
 
 class WindowController:
-    def __init__(self, custom_env=None):
-        """Initialize the window controller with PowerShell path"""
-        if custom_env and hasattr(custom_env, 'POWERSHELL'):
+    def __init__(self, custom_env=None, persistent=False, powershell_path=None, cache_ttl=10.0):
+        """Initialize the window controller with PowerShell path
+
+        With persistent=True a single PowerShell process is kept alive and
+        reused for every command instead of spawning one per action.
+
+        The last window list is cached for cache_ttl seconds; while it is
+        fresh, index-based actions are sent by window handle so PowerShell
+        does not re-enumerate and the index keeps meaning what was listed.
+        """
+        if powershell_path:
+            self.powershell_path = powershell_path
+        elif custom_env and hasattr(custom_env, 'POWERSHELL'):
             self.powershell_path = custom_env.POWERSHELL
         else:
             # Default PowerShell path for WSL
@@ -22,8 +215,124 @@ class WindowController:
             print("Please ensure window_manager.ps1 is in the same directory as this Python script.")
             sys.exit(1)
 
-    def run_powershell_command(self, action, window_index=None):
+        self.host = PowerShellHost(self.powershell_path, self.ps_script) if persistent else None
+
+        self.cache_ttl = cache_ttl
+        self.snapshot = None
+        self.snapshot_time = 0.0
+
+        # Interop load time per source ("compiled", "cache", "inline") seen so far
+        self.interop_timings = {}
+
+        # Where time goes per call: process startup (or host IPC), interop
+        # compile/load, enumeration, the Win32 calls and the full round trip
+        self.stats = LatencyStats()
+
+    def close(self):
+        """Shut down the persistent PowerShell host, if any"""
+        if self.host:
+            self.host.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def invalidate_cache(self):
+        """Forget the cached window snapshot"""
+        self.snapshot = None
+        self.snapshot_time = 0.0
+
+    def cached_windows(self):
+        """Return the cached window snapshot if it is still fresh, else None"""
+        if self.snapshot is None or time.monotonic() - self.snapshot_time > self.cache_ttl:
+            return None
+        return self.snapshot
+
+    def get_windows(self, refresh=False):
+        """Return the window snapshot, enumerating only when the cache is stale"""
+        windows = None if refresh else self.cached_windows()
+        if windows is None:
+            windows = self.list_windows(show=False)
+        return windows
+
+    def resolve_target(self, window_index=None, handle=None, pid=None):
+        """Turn an index into a handle via the cached snapshot when possible"""
+        if handle or pid:
+            return None, handle, pid
+
+        windows = self.cached_windows()
+        if windows and window_index:
+            for window in windows:
+                if window['index'] == int(window_index):
+                    return None, window['handle'], None
+
+        return window_index, None, None
+
+    def run_powershell_command(self, action, window_index=None, output_format=None, actions=None,
+                               handle=None, pid=None, iterations=None):
         """Execute PowerShell command with the given parameters"""
+        started = time.perf_counter()
+
+        if self.host:
+            response = self.host.request({
+                "action": action,
+                "window_index": window_index,
+                "format": output_format,
+                "actions": actions,
+                "handle": handle,
+                "pid": pid,
+                "iterations": iterations
+            })
+            self.record_timings(response.get("timings"), started, "ipc")
+            return response.get("stdout", ""), response.get("stderr", ""), response.get("returncode", 1)
+
+        cmd = self.build_command(action, window_index, output_format, actions, handle, pid, iterations, timings=True)
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8", errors="replace", check=False)
+        except Exception as e:
+            return "", str(e), 1
+
+        stdout, timings = self.split_timings(result.stdout)
+        self.record_timings(timings, started, "startup")
+        return stdout, result.stderr, result.returncode
+
+    def split_timings(self, stdout):
+        """Separate the -Timings line from the command output"""
+        lines = stdout.rstrip("\r\n").split("\n")
+        if lines and lines[-1].startswith(TIMINGS_MARKER):
+            try:
+                timings = json.loads(lines[-1][len(TIMINGS_MARKER):])
+            except ValueError:
+                timings = None
+            return "\n".join(lines[:-1]) + "\n", timings
+        return stdout, None
+
+    def record_timings(self, timings, started, overhead_phase):
+        """Fold one call's PowerShell phase timings into self.stats
+
+        overhead_phase names whatever the round trip spent outside the
+        script itself: process startup when spawning, IPC for the host.
+        """
+        round_trip = (time.perf_counter() - started) * 1000
+        self.stats.record("round_trip", round_trip)
+        if not timings:
+            return
+
+        for phase, milliseconds in timings.items():
+            self.stats.record("powershell_total" if phase == "total" else phase, milliseconds)
+        if "total" in timings:
+            self.stats.record(overhead_phase, max(0.0, round_trip - timings["total"]))
+
+    def timing_summary(self):
+        """p50/p95 per phase over the calls made by this controller"""
+        return self.stats.summary()
+
+    def build_command(self, action, window_index=None, output_format=None, actions=None,
+                      handle=None, pid=None, iterations=None, interval_ms=None, timings=False):
+        """Build the powershell.exe argv for a one-shot window_manager.ps1 call"""
         cmd = [
             self.powershell_path,
             "-ExecutionPolicy", "Bypass",
@@ -34,121 +343,440 @@ class WindowController:
         if window_index:
             cmd.extend(["-WindowIndex", str(window_index)])
 
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            return result.stdout, result.stderr, result.returncode
-        except Exception as e:
-            return "", str(e), 1
+        if handle:
+            cmd.extend(["-Handle", str(handle)])
+
+        if pid:
+            cmd.extend(["-ProcessId", str(pid)])
+
+        if iterations:
+            cmd.extend(["-Iterations", str(iterations)])
+
+        if interval_ms:
+            cmd.extend(["-IntervalMs", str(interval_ms)])
 
-    def list_windows(self):
+        if output_format:
+            cmd.extend(["-Format", output_format])
+
+        if actions:
+            cmd.extend(["-Actions", ",".join(actions)])
+
+        if timings:
+            cmd.append("-Timings")
+
+        return cmd
+
+    def list_windows(self, show=True):
         """List all active windows"""
-        stdout, stderr, returncode = self.run_powershell_command("list")
+        stdout, stderr, returncode = self.run_powershell_command("list", output_format="json")
+        return self.process_window_list(stdout, stderr, returncode, show)
 
+    def process_window_list(self, stdout, stderr, returncode, show):
+        """Decode list output, refresh the snapshot cache and optionally print it"""
         if returncode != 0:
             print(f"Error listing windows: {stderr}")
             return []
 
-        print(stdout)
+        try:
+            records = json.loads(stdout) if stdout.strip() else []
+        except ValueError as e:
+            print(f"Error decoding window list: {e}")
+            return []
+
+        windows = [
+            {
+                'index': record['Index'],
+                'title': record['Title'],
+                'process': record['ProcessName'],
+                'state': record['State'],
+                'pid': record['ProcessId'],
+                'handle': record['Handle']
+            }
+            for record in records
+        ]
 
-        # Parse the output to extract window information for programmatic use
-        windows = []
-        lines = stdout.split('\n')
-        in_table = False
+        self.snapshot = windows
+        self.snapshot_time = time.monotonic()
 
-        for line in lines:
-            if line.startswith('---'):
-                in_table = True
-                continue
-            elif in_table and line.strip():
-                # Parse table rows
-                parts = line.split()
-                if parts and parts[0].isdigit():
-                    index = int(parts[0])
-                    # Extract title, process, and state (handle spaces in titles)
-                    match = re.match(r'^(\d+)\s+(.+?)\s+(\w+)\s+(\w+)\s*$', line)
-                    if match:
-                        windows.append({
-                            'index': index,
-                            'title': match.group(2).strip(),
-                            'process': match.group(3),
-                            'state': match.group(4)
-                        })
-            elif line.startswith('Usage Examples:'):
-                break
+        if show:
+            print(format_windows_table(windows))
 
         return windows
 
-    def minimize_window(self, window_index):
-        """Minimize a window by index"""
-        stdout, stderr, returncode = self.run_powershell_command("minimize", window_index)
+    def diagnostics(self):
+        """Report how window_manager.ps1 loaded its Win32 interop type and what it cost
 
+        'interop_ms_by_source' accumulates the load time observed for each
+        source, so a cold compile and a cached load can be compared side by side.
+        """
+        started = time.perf_counter()
+        stdout, stderr, returncode = self.run_powershell_command("diag")
+        round_trip_ms = round((time.perf_counter() - started) * 1000, 2)
+        return self.process_diagnostics(stdout, stderr, returncode, round_trip_ms)
+
+    def process_diagnostics(self, stdout, stderr, returncode, round_trip_ms):
+        """Decode diag output and fold it into the per-source interop timings"""
         if returncode != 0:
             print(f"Error: {stderr}")
-        else:
-            print(stdout.strip())
+            return {}
 
-        return returncode == 0
-
-    def maximize_window(self, window_index):
-        """Maximize a window by index"""
-        stdout, stderr, returncode = self.run_powershell_command("maximize", window_index)
+        try:
+            report = json.loads(stdout)
+        except ValueError as e:
+            print(f"Error decoding diagnostics: {e}")
+            return {}
+
+        source = report.get('InteropSource')
+        self.interop_timings.setdefault(source, []).append(report.get('InteropMs'))
+
+        return {
+            'persistent': self.host is not None,
+            'round_trip_ms': round_trip_ms,
+            'interop_source': source,
+            'interop_ms': report.get('InteropMs'),
+            'assembly_path': report.get('AssemblyPath'),
+            'powershell_version': report.get('PSVersion'),
+            'interop_ms_by_source': {
+                name: round(sum(values) / len(values), 2)
+                for name, values in self.interop_timings.items()
+            }
+        }
+
+    def watch(self, interval_ms=250, callback=None):
+        """Stream window events from one long-lived PowerShell process
+
+        Without a callback this returns a generator of event dicts; closing
+        it stops the watcher. With a callback, events are passed to it until
+        it returns False. Event kinds: created, destroyed, state-changed,
+        title-changed, and a single ready after the initial windows.
+        """
+        events = self.watch_events(interval_ms)
+        if callback is None:
+            return events
 
+        try:
+            for event in events:
+                if callback(event) is False:
+                    break
+        finally:
+            events.close()
+
+    def watch_events(self, interval_ms=250):
+        """Generator behind watch(): one event dict per line of watch output"""
+        cmd = self.build_command("watch", interval_ms=interval_ms)
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1
+        )
+        try:
+            for line in process.stdout:
+                event = self.process_watch_event(line)
+                if event:
+                    yield event
+        finally:
+            process.kill()
+            process.wait()
+
+    def process_watch_event(self, line):
+        """Decode one watch line; window set changes invalidate the snapshot"""
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+
+        event = {
+            'event': record.get('Event'),
+            'handle': record.get('Handle'),
+            'title': record.get('Title'),
+            'process': record.get('ProcessName'),
+            'pid': record.get('ProcessId'),
+            'state': record.get('State')
+        }
+        if 'PreviousTitle' in record:
+            event['previous_title'] = record['PreviousTitle']
+            event['previous_state'] = record['PreviousState']
+
+        if event['event'] in ('created', 'destroyed'):
+            self.invalidate_cache()
+
+        return event
+
+    def benchmark_enumeration(self, iterations=10):
+        """Time the EnumWindows enumerator against the old Get-Process one"""
+        stdout, stderr, returncode = self.run_powershell_command("bench-enum", output_format="json", iterations=iterations)
+        return self.process_json_output(stdout, stderr, returncode, "benchmark results")
+
+    def process_json_output(self, stdout, stderr, returncode, what):
+        """Decode a JSON array response, reporting errors the way the other commands do"""
         if returncode != 0:
             print(f"Error: {stderr}")
-        else:
-            print(stdout.strip())
+            return []
 
-        return returncode == 0
+        try:
+            return json.loads(stdout) if stdout.strip() else []
+        except ValueError as e:
+            print(f"Error decoding {what}: {e}")
+            return []
 
-    def restore_window(self, window_index):
-        """Restore a window by index"""
-        stdout, stderr, returncode = self.run_powershell_command("restore", window_index)
+    def apply(self, operations, show=True):
+        """Run several (action, target) operations in a single PowerShell call
 
-        if returncode != 0:
-            print(f"Error: {stderr}")
-        else:
-            print(stdout.strip())
+        A target is a window index, or a dict with a 'handle' or 'pid' key.
+        All indexes refer to one window enumeration taken at the start of the
+        batch (or to the cached snapshot, if fresh). Returns one result dict
+        per operation, in order.
+        """
+        actions = self.batch_actions(operations)
+        if not actions:
+            return []
+
+        stdout, stderr, returncode = self.run_powershell_command("batch", output_format="json", actions=actions)
+        return self.process_batch_results(operations, stdout, stderr, returncode, show)
 
-        return returncode == 0
+    def batch_actions(self, operations):
+        """Encode (action, target) operations as window_manager.ps1 -Actions entries
+
+        A target is an index or a dict with 'index', 'handle' or 'pid'; one
+        with none of them raises ValueError.
+        """
+        actions = []
+        for action, target in operations:
+            if isinstance(target, dict):
+                window_index, handle, pid = self.resolve_target(target.get('index'), target.get('handle'), target.get('pid'))
+            else:
+                window_index, handle, pid = self.resolve_target(window_index=target)
+
+            if handle:
+                actions.append(f"{action}:h{int(handle)}")
+            elif pid:
+                actions.append(f"{action}:p{int(pid)}")
+            elif window_index is not None:
+                actions.append(f"{action}:{int(window_index)}")
+            else:
+                raise ValueError(f"{action}: target {target!r} has no index, handle or pid")
 
-    def close_window(self, window_index):
-        """Close a window by index"""
-        stdout, stderr, returncode = self.run_powershell_command("close", window_index)
+        return actions
 
+    def process_batch_results(self, operations, stdout, stderr, returncode, show):
+        """Decode batch results and drop the snapshot if any window went away"""
         if returncode != 0:
             print(f"Error: {stderr}")
-        else:
-            print(stdout.strip())
+            return [
+                {'action': action, 'index': None, 'handle': None, 'success': False, 'message': f"ERROR: {stderr.strip()}"}
+                for action, _ in operations
+            ]
 
-        return returncode == 0
+        try:
+            records = json.loads(stdout) if stdout.strip() else []
+        except ValueError as e:
+            print(f"Error decoding batch results: {e}")
+            return []
 
-    def focus_window(self, window_index):
-        """Focus/bring to front a window by index"""
-        stdout, stderr, returncode = self.run_powershell_command("focus", window_index)
+        results = [
+            {
+                'action': record['Action'],
+                'index': record['Index'],
+                'handle': record.get('Handle'),
+                'success': bool(record['Success']),
+                'message': record['Message']
+            }
+            for record in records
+        ]
 
-        if returncode != 0:
-            print(f"Error: {stderr}")
-        else:
-            print(stdout.strip())
+        # Closed or vanished windows make the cached indexes wrong
+        if any(r['message'].startswith(WINDOW_GONE) or (r['action'] == 'close' and r['success']) for r in results):
+            self.invalidate_cache()
+
+        if show:
+            for result in results:
+                print(result['message'])
 
-        return returncode == 0
+        return results
 
-    def toggle_window(self, window_index):
-        """Toggle maximize/restore a window by index"""
-        stdout, stderr, returncode = self.run_powershell_command("toggle", window_index)
+    def control_window(self, action, window_index=None, handle=None, pid=None):
+        """Run a single window action by index, handle or process id"""
+        window_index, handle, pid = self.resolve_target(window_index, handle, pid)
+        stdout, stderr, returncode = self.run_powershell_command(action, window_index, handle=handle, pid=pid)
+        return self.process_action_output(action, stdout, stderr, returncode)
 
+    def process_action_output(self, action, stdout, stderr, returncode):
+        """Print a single action's outcome and return whether it succeeded"""
         if returncode != 0:
             print(f"Error: {stderr}")
         else:
             print(stdout.strip())
 
-        return returncode == 0
+        if stdout.startswith(WINDOW_GONE) or action == "close":
+            self.invalidate_cache()
+
+        return returncode == 0 and not stdout.startswith("ERROR")
+
+    def minimize_window(self, window_index=None, handle=None, pid=None):
+        """Minimize a window by index, handle or process id"""
+        return self.control_window("minimize", window_index, handle, pid)
+
+    def maximize_window(self, window_index=None, handle=None, pid=None):
+        """Maximize a window by index, handle or process id"""
+        return self.control_window("maximize", window_index, handle, pid)
+
+    def restore_window(self, window_index=None, handle=None, pid=None):
+        """Restore a window by index, handle or process id"""
+        return self.control_window("restore", window_index, handle, pid)
+
+    def close_window(self, window_index=None, handle=None, pid=None):
+        """Close a window by index, handle or process id"""
+        return self.control_window("close", window_index, handle, pid)
+
+    def focus_window(self, window_index=None, handle=None, pid=None):
+        """Focus/bring to front a window by index, handle or process id"""
+        return self.control_window("focus", window_index, handle, pid)
+
+    def toggle_window(self, window_index=None, handle=None, pid=None):
+        """Toggle maximize/restore a window by index, handle or process id"""
+        return self.control_window("toggle", window_index, handle, pid)
+
+class AsyncWindowController(WindowController):
+    """asyncio flavour of WindowController built on asyncio subprocesses
+
+    Offers the same methods as WindowController as coroutines. At most
+    max_concurrency PowerShell processes run at once; each call is bounded by
+    timeout seconds, and a cancelled or timed out call kills its process.
+    """
+
+    def __init__(self, custom_env=None, powershell_path=None, cache_ttl=10.0, max_concurrency=4, timeout=30):
+        super().__init__(custom_env, persistent=False, powershell_path=powershell_path, cache_ttl=cache_ttl)
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_powershell_command(self, action, window_index=None, output_format=None, actions=None,
+                                     handle=None, pid=None, iterations=None):
+        """Execute PowerShell command with the given parameters"""
+        cmd = self.build_command(action, window_index, output_format, actions, handle, pid, iterations, timings=True)
+
+        async with self.semaphore:
+            started = time.perf_counter()
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                    start_new_session=True
+                )
+            except Exception as e:
+                return "", str(e), 1
+
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), self.timeout)
+            except asyncio.TimeoutError:
+                await self._kill(process)
+                return "", f"PowerShell timed out after {self.timeout}s", 1
+            except asyncio.CancelledError:
+                await self._kill(process)
+                raise
+
+        stdout, timings = self.split_timings(stdout.decode("utf-8", errors="replace"))
+        self.record_timings(timings, started, "startup")
+        return stdout, stderr.decode("utf-8", errors="replace"), process.returncode
+
+    async def _kill(self, process):
+        # Kill the whole session so helpers spawned by the interop launcher
+        # cannot keep the pipes (and therefore communicate()) open
+        if process.returncode is None:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except OSError:
+                process.kill()
+            await process.wait()
+
+    async def list_windows(self, show=True):
+        """List all active windows"""
+        stdout, stderr, returncode = await self.run_powershell_command("list", output_format="json")
+        return self.process_window_list(stdout, stderr, returncode, show)
+
+    async def get_windows(self, refresh=False):
+        """Return the window snapshot, enumerating only when the cache is stale"""
+        windows = None if refresh else self.cached_windows()
+        if windows is None:
+            windows = await self.list_windows(show=False)
+        return windows
+
+    async def diagnostics(self):
+        """Report how window_manager.ps1 loaded its Win32 interop type and what it cost"""
+        started = time.perf_counter()
+        stdout, stderr, returncode = await self.run_powershell_command("diag")
+        round_trip_ms = round((time.perf_counter() - started) * 1000, 2)
+        return self.process_diagnostics(stdout, stderr, returncode, round_trip_ms)
+
+    async def watch(self, interval_ms=250):
+        """Async generator of window events from one long-lived PowerShell process"""
+        cmd = self.build_command("watch", interval_ms=interval_ms)
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=True
+        )
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                event = self.process_watch_event(line.decode("utf-8", errors="replace"))
+                if event:
+                    yield event
+        finally:
+            await self._kill(process)
+
+    async def benchmark_enumeration(self, iterations=10):
+        """Time the EnumWindows enumerator against the old Get-Process one"""
+        stdout, stderr, returncode = await self.run_powershell_command("bench-enum", output_format="json", iterations=iterations)
+        return self.process_json_output(stdout, stderr, returncode, "benchmark results")
+
+    async def apply(self, operations, show=True):
+        """Run several (action, target) operations in a single PowerShell call"""
+        actions = self.batch_actions(operations)
+        if not actions:
+            return []
+
+        stdout, stderr, returncode = await self.run_powershell_command("batch", output_format="json", actions=actions)
+        return self.process_batch_results(operations, stdout, stderr, returncode, show)
+
+    async def control_window(self, action, window_index=None, handle=None, pid=None):
+        """Run a single window action by index, handle or process id"""
+        window_index, handle, pid = self.resolve_target(window_index, handle, pid)
+        stdout, stderr, returncode = await self.run_powershell_command(action, window_index, handle=handle, pid=pid)
+        return self.process_action_output(action, stdout, stderr, returncode)
+
+    async def minimize_window(self, window_index=None, handle=None, pid=None):
+        """Minimize a window by index, handle or process id"""
+        return await self.control_window("minimize", window_index, handle, pid)
+
+    async def maximize_window(self, window_index=None, handle=None, pid=None):
+        """Maximize a window by index, handle or process id"""
+        return await self.control_window("maximize", window_index, handle, pid)
+
+    async def restore_window(self, window_index=None, handle=None, pid=None):
+        """Restore a window by index, handle or process id"""
+        return await self.control_window("restore", window_index, handle, pid)
+
+    async def close_window(self, window_index=None, handle=None, pid=None):
+        """Close a window by index, handle or process id"""
+        return await self.control_window("close", window_index, handle, pid)
+
+    async def focus_window(self, window_index=None, handle=None, pid=None):
+        """Focus/bring to front a window by index, handle or process id"""
+        return await self.control_window("focus", window_index, handle, pid)
+
+    async def toggle_window(self, window_index=None, handle=None, pid=None):
+        """Toggle maximize/restore a window by index, handle or process id"""
+        return await self.control_window("toggle", window_index, handle, pid)
 
 def main():
     """Interactive command-line interface"""
     # You can pass your custom_env here if you have it
     # wc = WindowController(custom_env)
-    wc = WindowController()
+    wc = WindowController(persistent="--persistent" in sys.argv)
 
     print("Windows Controller - WSL Edition")
     print("=" * 40)
@@ -162,7 +790,8 @@ def main():
         print("5. close <index> - Close window by index")
         print("6. focus <index> - Focus window by index")
         print("7. toggle <index> - Toggle maximize/restore window by index")
-        print("8. quit - Exit")
+        print("8. watch - Print window events until Ctrl+C")
+        print("9. quit - Exit")
 
         try:
             command = input("\nEnter command: ").strip()
@@ -171,6 +800,13 @@ def main():
                 break
             elif command.lower() == 'list':
                 wc.list_windows()
+            elif command.lower() == 'watch':
+                try:
+                    for event in wc.watch():
+                        if event['event'] != 'ready':
+                            print(f"{event['event']:<14} {event['handle']:<10} {event['process']:<20} {event['title']}")
+                except KeyboardInterrupt:
+                    print()
             elif command.startswith('min '):
                 parts = command.split()
                 if len(parts) == 2 and parts[1].isdigit():
@@ -216,6 +852,8 @@ def main():
         except Exception as e:
             print(f"Error: {e}")
 
+    wc.close()
+
 # Example usage functions similar to your minimize_active_window
 def minimize_window_by_index(index, custom_env=None):
     """Function to minimize a window by index - similar to your minimize_active_window"""
@@ -247,5 +885,45 @@ def toggle_window_by_index(index, custom_env=None):
     wc = WindowController(custom_env)
     return wc.toggle_window(window_index=index)
 
+def apply_window_actions(operations, custom_env=None):
+    """Function to run several (action, index) operations in one PowerShell call"""
+    wc = WindowController(custom_env)
+    return wc.apply(operations)
+
+async def minimize_window_by_index_async(index, custom_env=None):
+    """Async twin of minimize_window_by_index"""
+    wc = AsyncWindowController(custom_env)
+    return await wc.minimize_window(window_index=index)
+
+async def maximize_window_by_index_async(index, custom_env=None):
+    """Async twin of maximize_window_by_index"""
+    wc = AsyncWindowController(custom_env)
+    return await wc.maximize_window(window_index=index)
+
+async def restore_window_by_index_async(index, custom_env=None):
+    """Async twin of restore_window_by_index"""
+    wc = AsyncWindowController(custom_env)
+    return await wc.restore_window(window_index=index)
+
+async def close_window_by_index_async(index, custom_env=None):
+    """Async twin of close_window_by_index"""
+    wc = AsyncWindowController(custom_env)
+    return await wc.close_window(window_index=index)
+
+async def list_active_windows_async(custom_env=None):
+    """Async twin of list_active_windows"""
+    wc = AsyncWindowController(custom_env)
+    return await wc.list_windows()
+
+async def toggle_window_by_index_async(index, custom_env=None):
+    """Async twin of toggle_window_by_index"""
+    wc = AsyncWindowController(custom_env)
+    return await wc.toggle_window(window_index=index)
+
+async def apply_window_actions_async(operations, custom_env=None):
+    """Async twin of apply_window_actions"""
+    wc = AsyncWindowController(custom_env)
+    return await wc.apply(operations)
+
 if __name__ == "__main__":
     main()
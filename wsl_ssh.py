@@ -1,25 +1,74 @@
-import subprocess
 import os
 import sys
+import time
+import select
+import socket
+import struct
 from datetime import datetime
 
+from execution import run as execute, powershell_argv, format_argv
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 IP_STORE = os.path.expanduser("~/.wsl_ssh_ip")
 LISTEN_PORT = 2222
 LISTEN_ADDRESS = "0.0.0.0"
+# Extra forwarded ports, one "listen[:connect]" per line; SSH on LISTEN_PORT is always forwarded
+PORTS_FILE = os.path.expanduser("~/.wsl_ssh_ports")
+# Listen ports the last reconcile forwarded, so ports dropped from PORTS_FILE are removed too
+MANAGED_PORTS_STORE = os.path.expanduser("~/.wsl_ssh_managed_ports")
+
+# Watch mode: netlink multicast group for IPv4 address add/remove events
+RTMGRP_IPV4_IFADDR = 0x10
+DEBOUNCE_SECONDS = 0.3
+MAX_SETTLE_SECONDS = 0.8
+POLL_INTERVAL = 2.0
+FIB_TRIE = "/proc/net/fib_trie"
+
+SIOCGIFADDR = 0x8915
+SSH_PROBE_TIMEOUT = 2.0
 
 def log(msg):
     timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
     print(f"{timestamp} {msg}")
 
-def run(cmd, shell=True):
-    log(f"[>] {cmd}")
-    result = subprocess.run(cmd, shell=shell, capture_output=True, text=True)
+def run_result(cmd, input=None):
+    """Run an argv list without a shell and return the CommandResult; input is fed to stdin, never logged"""
+    log(f"[>] {format_argv(cmd)}")
+    result = execute(cmd, input=input)
     if result.returncode != 0:
         log(f"[!] Error:\n{result.stderr.strip()}")
-    return result.stdout.strip()
+    return result
+
+def run(cmd, input=None):
+    """run_result() for callers that only need stdout"""
+    return run_result(cmd, input).stdout.strip()
+
+def interface_addresses():
+    """[(interface, ipv4), ...] in interface order, read with ioctl instead of a subprocess"""
+    if fcntl is None or not hasattr(socket, "if_nameindex"):
+        return []
+    addresses = []
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for _, name in socket.if_nameindex():
+            try:
+                request = struct.pack("256s", name.encode()[:15])
+                packed = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, request)
+            except OSError:
+                # Down or no IPv4 address
+                continue
+            addresses.append((name, socket.inet_ntoa(packed[20:24])))
+    return addresses
 
 def get_current_wsl_ip():
-    return run("hostname -I").split()[0]
+    # Same pick as `hostname -I`: the first non-loopback address
+    for _, address in interface_addresses():
+        if not address.startswith("127."):
+            return address
+    return run(["hostname", "-I"]).split()[0]
 
 def read_stored_ip():
     if os.path.exists(IP_STORE):
@@ -28,73 +77,301 @@ def read_stored_ip():
     return None
 
 def save_ip(ip):
-    with open(IP_STORE, "w") as f:
+    # Write-then-rename so concurrent --auto runs never see a torn or empty file
+    temp_path = f"{IP_STORE}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as f:
         f.write(ip)
+    os.replace(temp_path, IP_STORE)
+
+def ssh_reachable(ip, port=LISTEN_PORT, timeout=SSH_PROBE_TIMEOUT):
+    """True if something answering with an SSH banner listens on ip:port"""
+    try:
+        with socket.create_connection((ip, port), timeout=timeout) as sock:
+            return sock.recv(4).startswith(b"SSH-")
+    except OSError:
+        return False
+
+def ensure_ssh(ip):
+    """Restart sshd only if it doesn't answer on the forwarded port; live sessions survive otherwise"""
+    if ssh_reachable(ip):
+        log(f"[✓] sshd answers on {ip}:{LISTEN_PORT}; no restart needed.")
+        return
+    restart_ssh()
+
+def load_forwarded_ports():
+    """[(listen_port, connect_port), ...]: SSH plus whatever PORTS_FILE declares"""
+    ports = [(LISTEN_PORT, LISTEN_PORT)]
+    if os.path.exists(PORTS_FILE):
+        with open(PORTS_FILE, "r") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if not line:
+                    continue
+                listen, _, connect = line.partition(":")
+                try:
+                    entry = (int(listen), int(connect or listen))
+                except ValueError:
+                    log(f"[!] Ignoring invalid port entry '{line}' in {PORTS_FILE}")
+                    continue
+                if entry[0] not in (port for port, _ in ports):
+                    ports.append(entry)
+    return ports
 
-def delete_portproxy(ip):
-    log(f"[+] Removing portproxy to {ip}...")
-    run(f'powershell.exe -Command "netsh interface portproxy delete v4tov4 listenport={LISTEN_PORT} listenaddress={LISTEN_ADDRESS}"')
+def read_managed_ports():
+    try:
+        with open(MANAGED_PORTS_STORE, "r") as f:
+            return {int(port) for port in f.read().split()}
+    except (OSError, ValueError):
+        return set()
 
-def add_portproxy(ip):
-    log(f"[+] Adding portproxy to {ip}...")
-    run(f'powershell.exe -Command "netsh interface portproxy add v4tov4 listenport={LISTEN_PORT} listenaddress={LISTEN_ADDRESS} connectport={LISTEN_PORT} connectaddress={ip}"')
+def save_managed_ports(ports):
+    temp_path = f"{MANAGED_PORTS_STORE}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as f:
+        f.write("\n".join(str(port) for port in sorted(ports)))
+    os.replace(temp_path, MANAGED_PORTS_STORE)
+
+def show_portproxy():
+    """Current v4tov4 rules as {(listen_address, listen_port): (connect_address, connect_port)}"""
+    rules = {}
+    for line in run(["netsh.exe", "interface", "portproxy", "show", "v4tov4"]).splitlines():
+        parts = line.split()
+        if len(parts) == 4 and parts[1].isdigit() and parts[3].isdigit():
+            rules[(parts[0], int(parts[1]))] = (parts[2], int(parts[3]))
+    return rules
+
+def plan_portproxy(current, desired, managed_ports, stale_ips=()):
+    """netsh commands that turn the current rules into the desired ones, touching only what differs
+
+    Rules not in desired are deleted only if we own them: they listen on
+    LISTEN_ADDRESS at a port we manage, or they still point at a previous
+    WSL IP.
+    """
+    commands = []
+    for (address, port), (connect_address, connect_port) in desired.items():
+        existing = current.get((address, port))
+        if existing == (connect_address, connect_port):
+            continue
+        verb = "set" if existing else "add"
+        commands.append(f"netsh interface portproxy {verb} v4tov4 listenport={port} listenaddress={address} "
+                        f"connectport={connect_port} connectaddress={connect_address}")
+
+    for (address, port), (connect_address, _) in current.items():
+        if (address, port) in desired:
+            continue
+        if (address == LISTEN_ADDRESS and port in managed_ports) or connect_address in stale_ips:
+            commands.append(f"netsh interface portproxy delete v4tov4 listenport={port} listenaddress={address}")
+    return commands
+
+def apply_portproxy(commands):
+    """Run every netsh change in a single PowerShell process; True if all of them succeeded"""
+    if not commands:
+        return True
+    for command in commands:
+        log(f"[+] {command}")
+    # Stop at the first failing netsh call and hand its exit code back
+    script = "; ".join(f"{command}; if ($LASTEXITCODE) {{ exit $LASTEXITCODE }}" for command in commands)
+    result = run_result(powershell_argv(script, powershell="powershell.exe"))
+    if not result.ok:
+        # netsh reports its errors on stdout
+        log(f"[!] netsh failed; portproxy is only partly updated: {result.stdout.strip()}")
+        return False
+    return True
+
+def reconcile_portproxy(ip, stale_ips=()):
+    """Make the forwarded ports point at ip; returns the number of rules changed, or None if netsh failed"""
+    ports = load_forwarded_ports()
+    desired = {(LISTEN_ADDRESS, listen): (ip, connect) for listen, connect in ports}
+    commands = plan_portproxy(show_portproxy(), desired, read_managed_ports(), [i for i in stale_ips if i])
+    if not apply_portproxy(commands):
+        # Keep the old managed ports so the next run still deletes what was dropped
+        return None
+    save_managed_ports({listen for listen, _ in ports})
+    return len(commands)
+
+def remove_portproxy():
+    """Delete every forwarded-port rule we manage; returns the number removed, or None if netsh failed"""
+    ports = {listen for listen, _ in load_forwarded_ports()} | read_managed_ports()
+    commands = plan_portproxy(show_portproxy(), {}, ports)
+    if not apply_portproxy(commands):
+        return None
+    if os.path.exists(MANAGED_PORTS_STORE):
+        os.remove(MANAGED_PORTS_STORE)
+    return len(commands)
 
 def restart_ssh():
     log("[+] Restarting SSH service...")
-    run("sudo service ssh restart")
+    run(["sudo", "service", "ssh", "restart"])
 
 def install_ssh(username, password):
     log("[+] Installing openssh-server...")
-    run("sudo apt update && sudo apt install -y openssh-server")
+    # Same short-circuit as `apt update && apt install`: don't install from stale package lists
+    if not run_result(["sudo", "apt", "update"]).ok:
+        log("[!] apt update failed; not installing openssh-server.")
+        return False
+    if not run_result(["sudo", "apt", "install", "-y", "openssh-server"]).ok:
+        log("[!] Installing openssh-server failed.")
+        return False
 
     log("[+] Setting user password...")
-    run(f"echo '{username}:{password}' | sudo chpasswd")
+    # Over stdin, so the password never appears in a process list or the log
+    run(["sudo", "chpasswd"], input=f"{username}:{password}\n")
 
     log("[+] Configuring SSH settings...")
-    run("sudo sed -i 's/^#*Port .*/Port 2222/' /etc/ssh/sshd_config")
-    run("sudo sed -i 's/^#*PasswordAuthentication .*/PasswordAuthentication yes/' /etc/ssh/sshd_config")
-    run("sudo sed -i 's/^#*PermitRootLogin .*/PermitRootLogin yes/' /etc/ssh/sshd_config")
+    run(["sudo", "sed", "-i",
+         "-e", f"s/^#*Port .*/Port {LISTEN_PORT}/",
+         "-e", "s/^#*PasswordAuthentication .*/PasswordAuthentication yes/",
+         "-e", "s/^#*PermitRootLogin .*/PermitRootLogin yes/",
+         "/etc/ssh/sshd_config"])
 
     restart_ssh()
     current_ip = get_current_wsl_ip()
+    if reconcile_portproxy(current_ip) is None:
+        log("[!] Forwarding the ports failed; run --auto to retry.")
+        return False
     save_ip(current_ip)
-    add_portproxy(current_ip)
 
     log("[✓] SSH is set up and forwarded!")
     log(f"    ➤ WSL IP: {current_ip}")
-    log(f"    ➤ Windows Port: {LISTEN_PORT} → WSL {LISTEN_PORT}")
+    for listen, connect in load_forwarded_ports():
+        log(f"    ➤ Windows Port: {listen} → WSL {connect}")
     log("    ➤ Test: ssh youruser@localhost -p 2222")
     log("    ➤ Or from iPhone via Tailscale IP")
+    return True
+
+def update_portproxy(repair=False):
+    """Re-point the forwarded ports when the WSL IP changed; repair also re-checks them when it didn't
 
-def update_portproxy():
+    An unchanged IP costs no Windows process unless repair is set, since
+    even listing the rules means a netsh.exe spawn.
+    """
     current_ip = get_current_wsl_ip()
     saved_ip = read_stored_ip()
 
-    if saved_ip == current_ip:
+    if saved_ip == current_ip and not repair:
         log(f"[✓] WSL IP unchanged ({current_ip}) — nothing to update.")
-    else:
+        return False
+    if saved_ip != current_ip:
         log(f"[!] WSL IP changed: {saved_ip or 'None'} → {current_ip}")
-        if saved_ip:
-            delete_portproxy(saved_ip)
-        add_portproxy(current_ip)
-        save_ip(current_ip)
-        restart_ssh()
-        log("[✓] Portproxy re-bound to new IP.")
+    # Only a previous IP is stale; rules pointing at the live one that we don't declare aren't ours
+    changed = reconcile_portproxy(current_ip, stale_ips=[saved_ip] if saved_ip and saved_ip != current_ip else [])
+    if changed is None:
+        # Leave the stored IP alone so the next --auto or watch cycle tries again
+        log("[!] Portproxy update failed; will retry on the next run.")
+        return False
+
+    if saved_ip == current_ip:
+        if changed:
+            log(f"[✓] Repaired {changed} portproxy rule(s) for {current_ip}.")
+        else:
+            log(f"[✓] Forwarded ports for {current_ip} are already in place.")
+        return bool(changed)
+
+    save_ip(current_ip)
+    ensure_ssh(current_ip)
+    log("[✓] Portproxy re-bound to new IP.")
+    return True
 
 def cleanup_all():
     saved_ip = read_stored_ip()
+    removed = remove_portproxy()
+    if removed is None:
+        log("[!] Removing the portproxy rules failed; keeping the stored IP.")
+        saved_ip = None
+    elif removed:
+        log("[✓] Portproxy removed.")
     if saved_ip:
-        delete_portproxy(saved_ip)
         os.remove(IP_STORE)
-        log("[✓] Portproxy removed.")
 
     log("[+] Stopping SSH service...")
-    run("sudo service ssh stop")
+    run(["sudo", "service", "ssh", "stop"])
     log("[✓] Cleanup complete.")
 
-def auto_mode():
+def auto_mode(repair=False):
     log("[✓] Auto mode: Checking and updating portproxy if needed...")
-    update_portproxy()
+    update_portproxy(repair)
+
+def open_address_monitor():
+    """Netlink socket that becomes readable whenever an IPv4 address is added or removed"""
+    if not hasattr(socket, "AF_NETLINK"):
+        return None
+    try:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+        sock.bind((0, RTMGRP_IPV4_IFADDR))
+    except OSError:
+        return None
+    return sock
+
+def drain_events(sock):
+    while True:
+        try:
+            sock.recv(65536, socket.MSG_DONTWAIT)
+        except BlockingIOError:
+            return
+        except OSError:
+            # ENOBUFS: the kernel dropped events; the re-check that follows covers them
+            return
+
+def settle(sock):
+    """Swallow a burst of events: wait until it goes quiet, but never past MAX_SETTLE_SECONDS"""
+    deadline = time.monotonic() + MAX_SETTLE_SECONDS
+    drain_events(sock)
+    while True:
+        remaining = min(DEBOUNCE_SECONDS, deadline - time.monotonic())
+        if remaining <= 0:
+            return
+        ready, _, _ = select.select([sock], [], [], remaining)
+        if not ready:
+            return
+        drain_events(sock)
+
+def address_fingerprint():
+    """Kernel view of local addresses, read in-process; None where /proc isn't available"""
+    try:
+        with open(FIB_TRIE, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def watch_mode(poll_interval=POLL_INTERVAL, repair=False):
+    log("[✓] Watch mode: rebinding portproxy whenever the WSL IP changes (Ctrl+C to stop)")
+
+    # Subscribe before the initial sync so a change during it still produces an event
+    sock = open_address_monitor()
+    fingerprint = None
+    if sock:
+        log("[✓] Listening for address changes via netlink.")
+    else:
+        fingerprint = address_fingerprint()
+        if fingerprint is None:
+            log("[!] Neither netlink nor /proc/net is available; use --auto from a scheduler instead.")
+            return
+        log(f"[✓] Netlink unavailable; checking {FIB_TRIE} every {poll_interval:g}s.")
+
+    try:
+        update_portproxy(repair)
+        while True:
+            # Nothing below spawns a process until the kernel reports a change
+            if sock:
+                select.select([sock], [], [])
+                settle(sock)
+            else:
+                time.sleep(poll_interval)
+                current = address_fingerprint()
+                if current == fingerprint:
+                    continue
+                time.sleep(DEBOUNCE_SECONDS)
+                fingerprint = address_fingerprint()
+
+            # docker/veth churn fires events too; only a new WSL IP is worth a netsh spawn
+            if get_current_wsl_ip() == read_stored_ip():
+                continue
+            log("[>] Address change detected.")
+            update_portproxy()
+    except KeyboardInterrupt:
+        log("Watch mode stopped.")
+    finally:
+        if sock:
+            sock.close()
 
 def main_menu():
     while True:
@@ -103,6 +380,7 @@ def main_menu():
         print("1. Install & configure SSH (with portproxy)")
         print("2. Rebind portproxy if WSL IP has changed")
         print("3. Remove SSH & portproxy configuration")
+        print("4. Watch for WSL IP changes and rebind automatically")
         print("0. Exit")
         choice = input("Choose an option: ")
 
@@ -114,6 +392,8 @@ def main_menu():
             update_portproxy()
         elif choice == "3":
             cleanup_all()
+        elif choice == "4":
+            watch_mode()
         elif choice == "0":
             log("Exiting.")
             sys.exit(0)
@@ -121,7 +401,10 @@ def main_menu():
             log("Invalid option. Try again.")
 
 if __name__ == "__main__":
+    # --repair: also re-check the forwarded ports when the IP is unchanged (e.g. after editing PORTS_FILE)
     if "--auto" in sys.argv:
-        auto_mode()
+        auto_mode("--repair" in sys.argv)
+    elif "--watch" in sys.argv:
+        watch_mode(repair="--repair" in sys.argv)
     else:
         main_menu()